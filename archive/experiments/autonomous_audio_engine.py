@@ -8,10 +8,10 @@ Provides beat detection, key analysis, energy monitoring, and structure analysis
 import librosa
 import numpy as np
 from scipy import signal
+import scipy.fft
 from typing import Dict, List, Optional, Tuple, NamedTuple
 import threading
 import time
-import queue
 from dataclasses import dataclass
 from pathlib import Path
 import warnings
@@ -58,17 +58,138 @@ class AudioFeatures:
     beats_until_phrase: int = 0
     optimal_mix_points: List[float] = None
 
+class SpectralFluxState:
+    """
+    Spectral-flux history of one frame stream.
+
+    Row 0 of `magnitudes` holds the previous frame's magnitude so flux is
+    continuous across batches; rows 1..n receive the current batch.
+    """
+
+    def __init__(self, max_frames: int, n_bins: int):
+        self.magnitudes = np.zeros((max_frames + 1, n_bins), dtype=np.float32)
+        self.flux_work = np.zeros((max_frames, n_bins), dtype=np.float32)
+        self.has_prev_frame = False
+
+    def reset(self):
+        self.has_prev_frame = False
+
+class FrameRingBuffer:
+    """
+    Preallocated ring of fixed-size audio frames.
+
+    The producer copies frames into a single float32 block; when the ring is
+    full the oldest frame is overwritten (and counted as dropped). The
+    consumer copies out contiguous batches into a caller-provided array.
+    """
+
+    def __init__(self, capacity: int, frame_size: int):
+        self.capacity = capacity
+        self.frame_size = frame_size
+        self.frames = np.zeros((capacity, frame_size), dtype=np.float32)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.read_index = 0
+        self.count = 0
+        self.dropped_frames = 0
+        self.condition = threading.Condition()
+
+    def push(self, frame: np.ndarray, timestamp: float):
+        with self.condition:
+            if self.count == self.capacity:
+                # Overwrite oldest frame
+                self.read_index = (self.read_index + 1) % self.capacity
+                self.count -= 1
+                self.dropped_frames += 1
+
+            slot = (self.read_index + self.count) % self.capacity
+            n = min(len(frame), self.frame_size)
+            self.frames[slot, :n] = frame[-n:]
+            if n < self.frame_size:
+                self.frames[slot, n:] = 0.0
+            self.timestamps[slot] = timestamp
+            self.count += 1
+            self.condition.notify()
+
+    def pop_batch(self, out: np.ndarray, out_timestamps: np.ndarray, timeout: float) -> int:
+        """Copy up to len(out) frames into out; blocks up to timeout when empty"""
+        with self.condition:
+            if self.count == 0:
+                self.condition.wait(timeout)
+            n = min(self.count, len(out))
+            if n == 0:
+                return 0
+
+            first = min(n, self.capacity - self.read_index)
+            out[:first] = self.frames[self.read_index:self.read_index + first]
+            out_timestamps[:first] = self.timestamps[self.read_index:self.read_index + first]
+            if first < n:
+                out[first:n] = self.frames[:n - first]
+                out_timestamps[first:n] = self.timestamps[:n - first]
+
+            self.read_index = (self.read_index + n) % self.capacity
+            self.count -= n
+            return n
+
+    def wake(self):
+        with self.condition:
+            self.condition.notify_all()
+
 class RealTimeAnalyzer:
     """Real-time audio analysis for live mixing decisions"""
 
-    def __init__(self, sample_rate: int = 44100, frame_size: int = 2048):
+    # Columns of the preallocated real-time results ring
+    RESULT_FIELDS = ('timestamp', 'energy', 'spectral_centroid', 'beat_strength', 'rms')
+
+    # Bump when analysis output changes so cached features get recomputed
+    ANALYZER_VERSION = "1.1"
+
+    # Analysis profiles: "bulk" for library ingestion, "full" for tracks queued for play
+    ANALYSIS_PROFILES = {
+        'bulk': {
+            'sample_rate': 22050,   # Downsampled mono decode
+            'frame_size': 1024,
+            'hop_length': 512,
+            'features': {'rms', 'onset', 'chroma'},  # BPM, key, energy, intro/outro
+        },
+        'full': {
+            'sample_rate': None,    # Native sample rate
+            'frame_size': None,     # Analyzer frame_size / hop_length
+            'hop_length': None,
+            'features': {'rms', 'onset', 'chroma', 'centroid', 'mfcc'},
+        },
+    }
+
+    def __init__(self, sample_rate: int = 44100, frame_size: int = 2048, streaming: bool = True):
         self.sample_rate = sample_rate
         self.frame_size = frame_size
         self.hop_length = frame_size // 4
 
-        # Real-time buffers
-        self.audio_buffer = queue.Queue(maxsize=100)
-        self.features_buffer = queue.Queue(maxsize=50)
+        # Block-streaming structure analysis (bounded memory per track)
+        self.streaming = streaming
+        self.stream_block_frames = 256   # STFT frames decoded per block (~3s at 44.1kHz)
+        self.segment_pool_seconds = 2.0  # MFCC pooling window for segmentation
+        self._filter_cache: Dict[Tuple[int, int], Dict[str, np.ndarray]] = {}
+
+        # Real-time buffers (preallocated, no per-frame allocations)
+        self.max_batch_frames = 32
+        self.audio_buffer = FrameRingBuffer(capacity=100, frame_size=frame_size)
+        self._batch = np.zeros((self.max_batch_frames, frame_size), dtype=np.float32)
+        self._batch_timestamps = np.zeros(self.max_batch_frames, dtype=np.float64)
+
+        # Cached analysis vectors
+        self._window = np.hanning(frame_size).astype(np.float32)
+        self._freqs = np.fft.rfftfreq(frame_size, 1 / sample_rate).astype(np.float32)
+        n_bins = len(self._freqs)
+        # Separate flux history for the streamed frames and the legacy single-frame API
+        self._stream_flux = SpectralFluxState(self.max_batch_frames, n_bins)
+        self._frame_flux = SpectralFluxState(1, n_bins)
+
+        # Results ring: one row per analysed frame
+        self.results_capacity = 50
+        self._results = np.zeros((self.results_capacity, len(self.RESULT_FIELDS)), dtype=np.float64)
+        self._results_written = 0
+        self._results_read = 0
+        self._results_lock = threading.Lock()
 
         # Analysis state
         self.is_analyzing = False
@@ -86,6 +207,12 @@ class RealTimeAnalyzer:
 
         print("🎵 Real-time Audio Analyzer initialized")
 
+    def get_analysis_version(self, profile: str = 'full') -> str:
+        """Version tag identifying the analysis output (for feature caches)"""
+        if profile == 'full' and not self.streaming:
+            return f"{self.ANALYZER_VERSION}-full-signal"
+        return f"{self.ANALYZER_VERSION}-{profile}"
+
     def start_analysis(self, track_path: Optional[str] = None):
         """Start real-time analysis thread"""
         if self.is_analyzing:
@@ -93,6 +220,7 @@ class RealTimeAnalyzer:
 
         self.is_analyzing = True
         self.stop_event.clear()
+        self._stream_flux.reset()
 
         if track_path:
             # Pre-analyze the track for structure
@@ -107,14 +235,25 @@ class RealTimeAnalyzer:
         """Stop real-time analysis"""
         self.is_analyzing = False
         self.stop_event.set()
+        self.audio_buffer.wake()
 
         if self.analysis_thread and self.analysis_thread.is_alive():
             self.analysis_thread.join(timeout=2.0)
 
         print("⏹️  Stopped real-time analysis")
 
-    def analyze_track_structure(self, track_path: str) -> AudioFeatures:
+    def analyze_track_structure(self, track_path: str, streaming: Optional[bool] = None,
+                                profile: str = 'full') -> AudioFeatures:
         """Complete structural analysis of a track"""
+        if streaming is None:
+            streaming = self.streaming
+
+        if profile != 'full' or streaming:
+            features = self._analyze_track_streaming(track_path, profile)
+            if features is not None:
+                return features
+            print("↩️  Falling back to full-signal analysis")
+
         try:
             # Load audio
             y, sr = librosa.load(track_path, sr=self.sample_rate)
@@ -182,55 +321,248 @@ class RealTimeAnalyzer:
             print(f"❌ Error analyzing track {track_path}: {e}")
             return None
 
+    def _analyze_track_streaming(self, track_path: str, profile: str = 'full') -> Optional[AudioFeatures]:
+        """
+        Structural analysis decoding the audio in fixed blocks.
+
+        One magnitude STFT per block feeds RMS, spectral centroid, chroma,
+        onset envelope and MFCC (as enabled by the profile); only per-frame
+        features are kept, so peak memory no longer scales with the decoded
+        signal. Beat tracking runs on the onset envelope and segmentation on
+        pooled MFCCs.
+        """
+        try:
+            settings = self.ANALYSIS_PROFILES[profile]
+            wanted = settings['features']
+            n_fft = settings['frame_size'] or self.frame_size
+            hop = settings['hop_length'] or self.hop_length
+
+            print(f"🔍 Analyzing track structure ({profile}, streaming): {Path(track_path).name}")
+
+            if settings['sample_rate']:
+                # Downsampled decode, then the same block pipeline over the signal
+                sr = settings['sample_rate']
+                y, _ = librosa.load(track_path, sr=sr, mono=True, res_type='soxr_lq')
+                blocks = self._iter_signal_blocks(y, n_fft, hop)
+            else:
+                sr = librosa.get_samplerate(track_path)
+                blocks = librosa.stream(
+                    track_path,
+                    block_length=self.stream_block_frames,
+                    frame_length=n_fft,
+                    hop_length=hop,
+                    mono=True,
+                    fill_value=0
+                )
+
+            filters = self._get_stream_filters(sr, n_fft)
+            rms_blocks, centroid_blocks, chroma_blocks = [], [], []
+            onset_blocks, mfcc_blocks = [], []
+            prev_mel_db = None
+            total_samples = 0
+
+            for y_block in blocks:
+                # Shared spectrogram for every spectral feature of this block
+                S = np.abs(librosa.stft(y_block, n_fft=n_fft, hop_length=hop, center=False))
+                power = S ** 2
+
+                rms_blocks.append(librosa.feature.rms(S=S, frame_length=n_fft)[0].astype(np.float32))
+
+                if 'centroid' in wanted:
+                    magnitude_sum = np.sum(S, axis=0)
+                    centroid = np.dot(filters['freqs'], S) / np.maximum(magnitude_sum, 1e-10)
+                    centroid_blocks.append(centroid.astype(np.float32))
+
+                chroma = librosa.util.normalize(np.dot(filters['chroma'], power), norm=np.inf, axis=0)
+                chroma_blocks.append(chroma.astype(np.float32))
+
+                mel_db = librosa.power_to_db(np.dot(filters['mel'], power))
+                if 'mfcc' in wanted:
+                    mfcc_blocks.append(librosa.feature.mfcc(S=mel_db, n_mfcc=13).astype(np.float32))
+
+                # Spectral flux onset envelope, continuous across block edges
+                previous = mel_db[:, :1] if prev_mel_db is None else prev_mel_db
+                flux = np.maximum(0.0, np.diff(np.hstack([previous, mel_db]), axis=1))
+                onset_blocks.append(np.mean(flux, axis=0).astype(np.float32))
+                prev_mel_db = mel_db[:, -1:]
+
+                total_samples += hop * S.shape[1]
+
+            if not rms_blocks:
+                return None
+
+            rms = np.concatenate(rms_blocks)
+            spectral_centroid = np.concatenate(centroid_blocks) if centroid_blocks else None
+            chroma = np.concatenate(chroma_blocks, axis=1)
+            onset_env = np.concatenate(onset_blocks)
+            mfcc = np.concatenate(mfcc_blocks, axis=1) if mfcc_blocks else None
+
+            try:
+                duration = librosa.get_duration(path=track_path)
+            except TypeError:
+                duration = librosa.get_duration(filename=track_path)
+            duration = duration or total_samples / sr
+
+            # Frames are uncentered: offset times by half a window
+            tempo, beat_frames = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr, hop_length=hop)
+            tempo = float(np.atleast_1d(tempo)[0])
+            beat_times = librosa.frames_to_time(beat_frames, sr=sr, hop_length=hop, n_fft=n_fft)
+
+            onset_frames = librosa.onset.onset_detect(onset_envelope=onset_env, sr=sr, hop_length=hop)
+            onset_times = librosa.frames_to_time(onset_frames, sr=sr, hop_length=hop, n_fft=n_fft)
+
+            key = self._key_from_chroma(np.mean(chroma, axis=1))
+            energy_level = self._calculate_energy_level(rms)
+
+            segment_boundaries = self._detect_segments_pooled(mfcc, sr, hop) if mfcc is not None else []
+            intro_duration, outro_duration = self._detect_intro_outro(None, sr, beat_times, duration=duration)
+            harmonic_compatibility = self._calculate_harmonic_compatibility(key)
+            optimal_mix_points = self._find_optimal_mix_points(
+                None, sr, beat_times, segment_boundaries, duration=duration
+            )
+            tempo_stability = self._calculate_tempo_stability(beat_times)
+
+            features = AudioFeatures(
+                duration=duration,
+                sample_rate=sr,
+                tempo=tempo,
+                key=key,
+                energy_level=energy_level,
+                rms_energy=rms,
+                spectral_centroid=spectral_centroid,
+                beat_times=beat_times,
+                onset_times=onset_times,
+                tempo_stability=tempo_stability,
+                chroma=chroma,
+                harmonic_compatibility=harmonic_compatibility,
+                segment_boundaries=segment_boundaries,
+                intro_duration=intro_duration,
+                outro_duration=outro_duration,
+                optimal_mix_points=optimal_mix_points
+            )
+
+            print(f"✅ Analysis complete: {tempo:.1f} BPM, Key: {key}, Energy: {energy_level:.1f}/10")
+            return features
+
+        except Exception as e:
+            print(f"⚠️  Streaming analysis unavailable for {track_path}: {e}")
+            return None
+
+    def _get_stream_filters(self, sr: int, n_fft: int) -> Dict[str, np.ndarray]:
+        """Cached frequency/mel/chroma filter banks for a sample rate"""
+        cache_key = (sr, n_fft)
+        if cache_key not in self._filter_cache:
+            self._filter_cache[cache_key] = {
+                'freqs': librosa.fft_frequencies(sr=sr, n_fft=n_fft),
+                'mel': librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=128),
+                'chroma': librosa.filters.chroma(sr=sr, n_fft=n_fft),
+            }
+        return self._filter_cache[cache_key]
+
+    def _iter_signal_blocks(self, y: np.ndarray, n_fft: int, hop: int):
+        """Yield frame-aligned blocks of an in-memory signal (same shape as librosa.stream)"""
+        block_samples = n_fft + (self.stream_block_frames - 1) * hop
+        step = self.stream_block_frames * hop
+        for start in range(0, max(1, len(y) - n_fft + hop), step):
+            block = y[start:start + block_samples]
+            if len(block) < n_fft:
+                block = np.pad(block, (0, n_fft - len(block)))
+            yield block
+
+    def _detect_segments_pooled(self, mfcc: np.ndarray, sr: int, hop: Optional[int] = None) -> List[float]:
+        """Segment boundaries from MFCCs pooled over short windows"""
+        try:
+            hop = hop or self.hop_length
+            pool = max(1, int(round(self.segment_pool_seconds * sr / hop)))
+            n_pooled = mfcc.shape[1] // pool
+            if n_pooled < 8:
+                return [0.0]
+
+            pooled = mfcc[:, :n_pooled * pool].reshape(mfcc.shape[0], n_pooled, pool).mean(axis=2)
+            boundaries = librosa.segment.agglomerative(pooled, k=8)
+            boundary_times = librosa.frames_to_time(boundaries * pool, sr=sr, hop_length=hop)
+
+            return boundary_times.tolist()
+
+        except Exception as e:
+            print(f"⚠️  Segment detection error: {e}")
+            return [0.0]
+
     def _analysis_loop(self):
         """Main real-time analysis loop"""
         while not self.stop_event.is_set():
             try:
-                # Get audio frame from buffer
-                if not self.audio_buffer.empty():
-                    audio_frame = self.audio_buffer.get_nowait()
-
-                    # Analyze frame
-                    frame_features = self._analyze_audio_frame(audio_frame)
-
-                    # Update current track position and features
-                    if self.current_track_features:
-                        self._update_position_features(frame_features)
+                # Wait for frames; take everything pending (up to a batch) at once
+                n = self.audio_buffer.pop_batch(self._batch, self._batch_timestamps, timeout=0.05)
+                if n == 0:
+                    continue
 
-                    # Store results
-                    if not self.features_buffer.full():
-                        self.features_buffer.put_nowait(frame_features)
+                results = self._analyze_frame_batch(self._batch[:n], self._batch_timestamps[:n])
+                self._store_results(results)
 
-                time.sleep(0.01)  # 10ms loop for responsiveness
+                # Update current track position and features
+                if self.current_track_features:
+                    self._update_position_features(self._result_to_dict(results[-1]), frames=n)
 
-            except queue.Empty:
-                time.sleep(0.005)
             except Exception as e:
                 print(f"⚠️  Analysis loop error: {e}")
                 time.sleep(0.1)
 
+    def _analyze_frame_batch(self, frames: np.ndarray, timestamps: np.ndarray,
+                             flux_state: Optional[SpectralFluxState] = None) -> np.ndarray:
+        """Vectorized analysis of a batch of frames (frames is modified in place)"""
+        flux_state = flux_state or self._stream_flux
+        n = len(frames)
+        results = np.empty((n, len(self.RESULT_FIELDS)), dtype=np.float64)
+        results[:, 0] = timestamps
+
+        # Basic energy analysis
+        rms = np.sqrt(np.mean(np.square(frames), axis=1))
+        results[:, 4] = rms
+        results[:, 1] = np.clip(rms * 50, 1.0, 10.0)  # Scale to 1-10
+
+        # One windowed FFT per frame, magnitudes written into the preallocated block
+        np.multiply(frames, self._window, out=frames)
+        magnitudes = flux_state.magnitudes[1:n + 1]
+        np.abs(scipy.fft.rfft(frames, axis=1, overwrite_x=True), out=magnitudes)
+
+        # Spectral centroid for brightness
+        magnitude_sums = magnitudes.sum(axis=1)
+        centroid = magnitudes @ self._freqs
+        results[:, 2] = np.where(magnitude_sums > 0, centroid / np.maximum(magnitude_sums, 1e-12), 1000.0)
+
+        # Beat strength: spectral flux against the previous frame
+        flux = flux_state.flux_work[:n]
+        np.subtract(magnitudes, flux_state.magnitudes[:n], out=flux)
+        np.maximum(flux, 0.0, out=flux)
+        results[:, 3] = np.minimum(1.0, flux.sum(axis=1) / (magnitude_sums + 1e-6))
+        if not flux_state.has_prev_frame:
+            results[0, 3] = 0.5
+            flux_state.has_prev_frame = True
+
+        flux_state.magnitudes[0] = magnitudes[-1]
+        return results
+
+    def _store_results(self, results: np.ndarray):
+        """Write analysed frames into the results ring (oldest are overwritten)"""
+        with self._results_lock:
+            for row in results[-self.results_capacity:]:
+                self._results[self._results_written % self.results_capacity] = row
+                self._results_written += 1
+            # Readers never see more than one ring of history
+            self._results_read = max(self._results_read, self._results_written - self.results_capacity)
+
+    def _result_to_dict(self, row: np.ndarray) -> Dict:
+        return {field: float(value) for field, value in zip(self.RESULT_FIELDS, row)}
+
     def _analyze_audio_frame(self, audio_frame: np.ndarray) -> Dict:
         """Analyze single audio frame for real-time features"""
         try:
-            # Basic energy analysis
-            rms = np.sqrt(np.mean(audio_frame ** 2))
-            energy = min(10.0, max(1.0, rms * 50))  # Scale to 1-10
-
-            # Spectral centroid for brightness
-            fft = np.abs(np.fft.rfft(audio_frame))
-            freqs = np.fft.rfftfreq(len(audio_frame), 1/self.sample_rate)
-            spectral_centroid = np.sum(freqs * fft) / np.sum(fft) if np.sum(fft) > 0 else 1000
-
-            # Beat detection (simplified for real-time)
-            beat_strength = self._detect_beat_strength(audio_frame)
-
-            return {
-                'timestamp': time.time(),
-                'energy': energy,
-                'spectral_centroid': spectral_centroid,
-                'beat_strength': beat_strength,
-                'rms': rms
-            }
+            frame = np.zeros((1, self.frame_size), dtype=np.float32)
+            n = min(len(audio_frame), self.frame_size)
+            frame[0, :n] = audio_frame[-n:]
+            results = self._analyze_frame_batch(frame, np.array([time.time()]), self._frame_flux)
+            return self._result_to_dict(results[0])
 
         except Exception as e:
             print(f"⚠️  Frame analysis error: {e}")
@@ -246,26 +578,33 @@ class RealTimeAnalyzer:
             else:
                 # Fallback: chroma-based key detection
                 chroma = librosa.feature.chroma_stft(y=y, sr=sr)
-                chroma_mean = np.mean(chroma, axis=1)
+                return self._key_from_chroma(np.mean(chroma, axis=1))
+
+        except Exception as e:
+            print(f"⚠️  Key detection error: {e}")
+            return "C major"
 
-                # Major keys
-                major_profiles = np.array([
-                    [1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0, 1],  # C major template
-                ])
+    def _key_from_chroma(self, chroma_mean: np.ndarray) -> str:
+        """Template-matching key estimate from a mean chroma vector"""
+        try:
+            # Major keys
+            major_profiles = np.array([
+                [1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0, 1],  # C major template
+            ])
 
-                key_names = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+            key_names = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
 
-                best_correlation = -1
-                best_key = 'C major'
+            best_correlation = -1
+            best_key = 'C major'
 
-                for shift in range(12):
-                    profile = np.roll(major_profiles[0], shift)
-                    correlation = np.corrcoef(chroma_mean, profile)[0, 1]
-                    if correlation > best_correlation:
-                        best_correlation = correlation
-                        best_key = f"{key_names[shift]} major"
+            for shift in range(12):
+                profile = np.roll(major_profiles[0], shift)
+                correlation = np.corrcoef(chroma_mean, profile)[0, 1]
+                if correlation > best_correlation:
+                    best_correlation = correlation
+                    best_key = f"{key_names[shift]} major"
 
-                return best_key
+            return best_key
 
         except Exception as e:
             print(f"⚠️  Key detection error: {e}")
@@ -306,10 +645,12 @@ class RealTimeAnalyzer:
             print(f"⚠️  Segment detection error: {e}")
             return [0.0]
 
-    def _detect_intro_outro(self, y: np.ndarray, sr: int, beat_times: np.ndarray) -> Tuple[float, float]:
+    def _detect_intro_outro(self, y: Optional[np.ndarray], sr: int, beat_times: np.ndarray,
+                            duration: Optional[float] = None) -> Tuple[float, float]:
         """Detect intro and outro durations"""
         try:
-            duration = librosa.get_duration(y=y, sr=sr)
+            if duration is None:
+                duration = librosa.get_duration(y=y, sr=sr)
 
             # Simple heuristic: intro is typically 16-32 beats
             beats_per_minute = len(beat_times) / (duration / 60)
@@ -364,14 +705,17 @@ class RealTimeAnalyzer:
             print(f"⚠️  Harmonic compatibility error: {e}")
             return {}
 
-    def _find_optimal_mix_points(self, y: np.ndarray, sr: int, beat_times: np.ndarray, segments: List[float]) -> List[float]:
+    def _find_optimal_mix_points(self, y: Optional[np.ndarray], sr: int, beat_times: np.ndarray,
+                                 segments: List[float], duration: Optional[float] = None) -> List[float]:
         """Find optimal points for mixing in/out"""
         try:
             mix_points = []
+            if duration is None:
+                duration = len(y) / sr
 
             # Add segment boundaries as potential mix points
             for segment_time in segments:
-                if 30 < segment_time < len(y)/sr - 30:  # Avoid too early/late
+                if 30 < segment_time < duration - 30:  # Avoid too early/late
                     mix_points.append(segment_time)
 
             # Add phrase boundaries (every 16 beats)
@@ -409,26 +753,7 @@ class RealTimeAnalyzer:
             print(f"⚠️  Tempo stability error: {e}")
             return 0.5
 
-    def _detect_beat_strength(self, audio_frame: np.ndarray) -> float:
-        """Detect beat strength in audio frame"""
-        try:
-            # Simple onset strength using spectral flux
-            fft = np.abs(np.fft.rfft(audio_frame))
-
-            if hasattr(self, '_prev_fft'):
-                # Spectral flux (positive differences)
-                flux = np.sum(np.maximum(0, fft - self._prev_fft))
-                beat_strength = min(1.0, flux / (np.sum(fft) + 1e-6))
-            else:
-                beat_strength = 0.5
-
-            self._prev_fft = fft
-            return beat_strength
-
-        except Exception as e:
-            return 0.5
-
-    def _update_position_features(self, frame_features: Dict):
+    def _update_position_features(self, frame_features: Dict, frames: int = 1):
         """Update current position and contextual features"""
         if not self.current_track_features:
             return
@@ -439,7 +764,7 @@ class RealTimeAnalyzer:
 
             # Estimate current position (simplified)
             # In real implementation, this would come from Traktor
-            self.current_track_features.current_position += 0.01  # Assume 10ms frames
+            self.current_track_features.current_position += 0.01 * frames  # Assume 10ms frames
 
             # Calculate beats until next phrase
             current_time = self.current_track_features.current_position
@@ -458,12 +783,22 @@ class RealTimeAnalyzer:
 
     def get_current_analysis(self) -> Optional[Dict]:
         """Get latest real-time analysis results"""
-        try:
-            if not self.features_buffer.empty():
-                return self.features_buffer.get_nowait()
-            return None
-        except queue.Empty:
-            return None
+        with self._results_lock:
+            if self._results_read >= self._results_written:
+                return None
+            row = self._results[self._results_read % self.results_capacity].copy()
+            self._results_read += 1
+        return self._result_to_dict(row)
+
+    def get_analysis_batch(self) -> Optional[np.ndarray]:
+        """All unread results as an (n, len(RESULT_FIELDS)) array, oldest first"""
+        with self._results_lock:
+            n = self._results_written - self._results_read
+            if n <= 0:
+                return None
+            indices = np.arange(self._results_read, self._results_written) % self.results_capacity
+            self._results_read = self._results_written
+            return self._results[indices]
 
     def get_track_features(self) -> Optional[AudioFeatures]:
         """Get current track's complete features"""
@@ -481,13 +816,8 @@ class RealTimeAnalyzer:
         return False
 
     def add_audio_frame(self, audio_data: np.ndarray):
-        """Add audio frame to analysis buffer"""
-        try:
-            if not self.audio_buffer.full():
-                self.audio_buffer.put_nowait(audio_data)
-        except queue.Full:
-            # Drop frame if buffer is full
-            pass
+        """Add audio frame to analysis buffer (oldest frame dropped if full)"""
+        self.audio_buffer.push(audio_data, time.time())
 
 def test_audio_engine():
     """Test the autonomous audio engine"""
@@ -19,6 +19,7 @@ from config import DJConfig, VENUE_TYPES, EVENT_TYPES, get_config
 
 # Dependency manager for autonomous components
 from core.dependency_manager import get_dependency_manager, is_autonomous_available
+from core.executor_adapter import ExecutorAdapter, LoopLagMonitor
 
 # Legacy components (enhanced)
 from music_library import MusicLibraryScanner, TrackInfo, get_music_scanner
@@ -118,6 +119,20 @@ class MixSession:
             'event_type': self.event_type,
         }
 
+@dataclass
+class LookAheadPlan:
+    """Prossimo track + piano di transizione precalcolati in background"""
+    context_key: Tuple
+    from_deck: DeckID
+    to_deck: DeckID
+    next_track: Optional[TrackInfo] = None
+    transition_plan: Optional[Any] = None  # AIResponse
+    created_at: float = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.next_track is not None
+
 class SimpleDJAgent:
     """Agente DJ AI semplificato"""
 
@@ -147,12 +162,34 @@ class SimpleDJAgent:
         self.available_tracks: List[TrackInfo] = []
         self.track_history: List[str] = []
 
+        # Look-ahead: prossimo track e transizione calcolati appena parte un track
+        self.lookahead_plan: Optional[LookAheadPlan] = None
+        self._lookahead_task: Optional[asyncio.Task] = None
+        self._on_air_deck: Optional[DeckID] = None
+        self.lookahead_stats = {
+            'computed': 0,
+            'refreshed': 0,
+            'hits': 0,
+            'misses': 0
+        }
+
+        # Chiamate bloccanti (AI, MIDI, DB) fuori dall'event loop
+        self.executors = ExecutorAdapter()
+        self.loop_lag = LoopLagMonitor()
+
         logger.info("🤖 AI DJ Agent inizializzato")
 
     async def start_session(self, venue_type: str, event_type: str, duration: int = 120) -> bool:
         """Avvia sessione DJ"""
         try:
             logger.info(f"🎵 Avvio sessione DJ: {venue_type} - {event_type} ({duration}min)")
+            self.loop_lag.start()
+
+            self._on_air_deck = None
+
+            # Pool nuovi per la sessione: stop_session chiude quelli della precedente
+            self.executors.shutdown()
+            self.executors = ExecutorAdapter()
 
             # Crea sessione
             self.current_session = MixSession(
@@ -181,42 +218,16 @@ class SimpleDJAgent:
             logger.error(f"❌ Errore avvio sessione: {e}")
             return False
 
+    async def _ai_decision(self, context: DJContext, query: str, urgent: bool = False) -> AIResponse:
+        """get_dj_decision è sincrono (HTTP): eseguito sul pool I/O"""
+        return await self.executors.io(self.ai_client.get_dj_decision, context, query, urgent=urgent)
+
     async def _load_available_tracks(self):
-        """Carica tracks disponibili per la sessione"""
+        """Carica tracks disponibili per la sessione (pool per profilo venue, in cache)"""
         try:
-            # Ottieni venue info
-            venue_info = VENUE_TYPES.get(self.current_session.venue_type, {})
-            preferred_genres = venue_info.get('typical_genres', [])
-            bpm_range = venue_info.get('bpm_range', (120, 140))
-
-            # Cerca tracks compatibili
-            all_tracks = []
-            for genre in preferred_genres:
-                tracks = self.music.search_tracks(
-                    genre=genre,
-                    bpm_range=bpm_range,
-                    limit=50
-                )
-                all_tracks.extend(tracks)
-
-            # Rimuovi duplicati e tracks senza BPM
-            seen = set()
-            self.available_tracks = []
-
-            for track in all_tracks:
-                if track.filepath not in seen and track.bpm:
-                    seen.add(track.filepath)
-                    self.available_tracks.append(track)
-
-            logger.info(f"📁 Caricati {len(self.available_tracks)} tracks per la sessione")
-
-            # Se pochi tracks, aggiungi tracks generici
-            if len(self.available_tracks) < 20:
-                generic_tracks = self.music.search_tracks(limit=100)
-                for track in generic_tracks:
-                    if track.filepath not in seen and track.bpm:
-                        self.available_tracks.append(track)
-
+            self.available_tracks = await self.executors.db(
+                self.music.build_session_pool, self.current_session.venue_type
+            )
             logger.info(f"📁 Totale tracks disponibili: {len(self.available_tracks)}")
 
         except Exception as e:
@@ -242,7 +253,7 @@ Suggerisci:
 3. Strategie di mixing specifiche
 """
 
-            response = await self.ai_client.get_dj_decision(self.dj_context, query)
+            response = await self._ai_decision(self.dj_context, query)
 
             if response.success:
                 logger.info(f"🧠 Strategia AI: {response.response[:200]}...")
@@ -261,7 +272,8 @@ Suggerisci:
 
             # Ottieni tracks compatibili con BPM corrente
             if current_context.current_bpm > 0:
-                compatible_tracks = self.music.get_compatible_tracks(
+                compatible_tracks = await self.executors.db(
+                    self.music.get_compatible_tracks,
                     current_context.current_bpm,
                     current_context.current_genre,
                     limit=10
@@ -306,7 +318,7 @@ Scegli il numero del track migliore (1-{len(track_summaries)}) e spiega il motiv
 - Momento della serata
 """
 
-            response = await self.ai_client.get_dj_decision(current_context, query)
+            response = await self._ai_decision(current_context, query)
 
             if response.success:
                 # Estrai numero del track dalla risposta
@@ -379,14 +391,10 @@ Scegli il numero del track migliore (1-{len(track_summaries)}) e spiega il motiv
         scored_tracks.sort(reverse=True)
         return scored_tracks[0][1] if scored_tracks else None
 
-    async def perform_transition(self, from_deck: DeckID, to_deck: DeckID,
-                                next_track: TrackInfo) -> bool:
-        """Esegui transizione AI tra tracks"""
-        try:
-            logger.info(f"🔄 Transizione AI: {from_deck.value} → {to_deck.value}")
-
-            # Chiedi strategia di transizione all'AI
-            query = f"""
+    async def plan_transition(self, from_deck: DeckID, to_deck: DeckID,
+                              next_track: TrackInfo) -> Optional[AIResponse]:
+        """Chiedi strategia di transizione all'AI"""
+        query = f"""
 Pianifica transizione DJ da Deck {from_deck.value} a Deck {to_deck.value}:
 
 TRACK CORRENTE (Deck {from_deck.value}):
@@ -407,8 +415,18 @@ Suggerisci:
 
 Rispondi con azioni specifiche per un mixing professionale.
 """
+        return await self._ai_decision(self.dj_context, query, urgent=True)
+
+    async def perform_transition(self, from_deck: DeckID, to_deck: DeckID,
+                                next_track: TrackInfo,
+                                transition_plan: Optional[AIResponse] = None) -> bool:
+        """Esegui transizione AI tra tracks (transition_plan precalcolato: nessuna chiamata AI)"""
+        try:
+            logger.info(f"🔄 Transizione AI: {from_deck.value} → {to_deck.value}")
 
-            response = await self.ai_client.get_dj_decision(self.dj_context, query, urgent=True)
+            response = transition_plan
+            if response is None:
+                response = await self.plan_transition(from_deck, to_deck, next_track)
 
             # Esegui transizione
             success = await self._execute_transition(from_deck, to_deck, next_track, response)
@@ -433,6 +451,75 @@ Rispondi con azioni specifiche per un mixing professionale.
             logger.error(f"❌ Errore transizione: {e}")
             return False
 
+    # ==========================================
+    # LOOK-AHEAD (fuori dal percorso critico del mix)
+    # ==========================================
+
+    def _lookahead_context_key(self, from_deck: DeckID, to_deck: DeckID) -> Tuple:
+        """Parti del contesto che invalidano il piano precalcolato"""
+        return (
+            from_deck, to_deck,
+            self.dj_context.last_track,
+            round(self.dj_context.current_bpm or 0.0),
+            self.dj_context.current_genre,
+            self.dj_context.energy_level,
+            self.dj_context.crowd_response,
+            self.dj_context.venue_type,
+            self.dj_context.event_type,
+        )
+
+    def _start_lookahead(self, from_deck: DeckID, to_deck: DeckID, refresh: bool = False):
+        """Avvia (o riavvia) il calcolo in background di prossimo track + transizione"""
+        if self._lookahead_task and not self._lookahead_task.done():
+            self._lookahead_task.cancel()
+
+        plan = LookAheadPlan(
+            context_key=self._lookahead_context_key(from_deck, to_deck),
+            from_deck=from_deck,
+            to_deck=to_deck
+        )
+        self.lookahead_plan = plan
+        self.lookahead_stats['refreshed' if refresh else 'computed'] += 1
+        self._lookahead_task = asyncio.create_task(self._compute_lookahead(plan))
+
+    async def _compute_lookahead(self, plan: LookAheadPlan):
+        try:
+            next_track = await self.suggest_next_track(self.dj_context)
+            if not next_track:
+                return
+
+            transition_plan = await self.plan_transition(plan.from_deck, plan.to_deck, next_track)
+
+            # Pubblica solo se il piano è ancora quello corrente
+            if self.lookahead_plan is plan:
+                plan.transition_plan = transition_plan
+                plan.next_track = next_track
+                plan.created_at = time.time()
+                logger.info(f"🔮 Look-ahead pronto: {next_track.title} ({plan.to_deck.value})")
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Look-ahead fallito: {e}")
+
+    def _refresh_lookahead_if_stale(self, from_deck: DeckID, to_deck: DeckID):
+        """Ricalcola il piano se il contesto è cambiato"""
+        plan = self.lookahead_plan
+        if plan is None or plan.context_key != self._lookahead_context_key(from_deck, to_deck):
+            self._start_lookahead(from_deck, to_deck, refresh=plan is not None)
+
+    def _take_lookahead(self, from_deck: DeckID, to_deck: DeckID) -> Optional[LookAheadPlan]:
+        """Piano pronto e valido per questa transizione, altrimenti None"""
+        plan = self.lookahead_plan
+        if (plan is not None and plan.ready and
+                plan.context_key == self._lookahead_context_key(from_deck, to_deck) and
+                plan.next_track.filepath not in self.track_history):
+            self.lookahead_stats['hits'] += 1
+            return plan
+
+        self.lookahead_stats['misses'] += 1
+        return None
+
     async def _execute_transition(self, from_deck: DeckID, to_deck: DeckID,
                                  next_track: TrackInfo, ai_response: AIResponse) -> bool:
         """Esegui fisicamente la transizione"""
@@ -442,21 +529,22 @@ Rispondi con azioni specifiche per un mixing professionale.
 
             # Sync BPM se abilitato
             if self.config['auto_sync_enabled'] and next_track.bpm:
-                self.traktor.sync_deck(to_deck)
+                await self.executors.midi(self.traktor.sync_deck, to_deck)
                 await asyncio.sleep(1)
 
             # 2. Imposta volumi iniziali
-            self.traktor.set_deck_volume(from_deck, 1.0)  # Corrente al massimo
-            self.traktor.set_deck_volume(to_deck, 0.0)    # Nuovo a zero
+            await self.executors.midi(self._set_volumes, from_deck, 1.0, to_deck, 0.0)
 
             # 3. Play nuovo track
-            self.traktor.play_deck(to_deck)
+            await self.executors.midi(self.traktor.play_deck, to_deck)
             await asyncio.sleep(1)
 
-            # 4. Transizione crossfader graduale
+            # 4. Transizione crossfader graduale (scadenze assolute: il lag non si accumula)
             transition_steps = 20
             transition_time = self.config['transition_time']
             step_delay = transition_time / transition_steps
+            loop = asyncio.get_running_loop()
+            start_time = loop.time()
 
             for step in range(transition_steps + 1):
                 progress = step / transition_steps
@@ -467,23 +555,20 @@ Rispondi con azioni specifiche per un mixing professionale.
                 else:
                     crossfader_pos = 1.0 - progress  # B→A
 
-                self.traktor.set_crossfader(crossfader_pos)
-
                 # Volume fade per sicurezza
                 from_volume = 1.0 - (progress * 0.2)  # Calo graduale
                 to_volume = min(1.0, progress * 1.2)   # Crescita graduale
 
-                self.traktor.set_deck_volume(from_deck, from_volume)
-                self.traktor.set_deck_volume(to_deck, to_volume)
+                await self.executors.midi(self._apply_transition_step, crossfader_pos,
+                                          from_deck, from_volume, to_deck, to_volume)
 
-                await asyncio.sleep(step_delay)
+                await asyncio.sleep(max(0.0, start_time + (step + 1) * step_delay - loop.time()))
 
             # 5. Finalizza transizione
-            self.traktor.set_deck_volume(from_deck, 0.0)
-            self.traktor.set_deck_volume(to_deck, 1.0)
+            await self.executors.midi(self._set_volumes, from_deck, 0.0, to_deck, 1.0)
 
             # Stop deck precedente
-            self.traktor.pause_deck(from_deck)
+            await self.executors.midi(self.traktor.pause_deck, from_deck)
 
             logger.info(f"✅ Transizione fisica completata")
             return True
@@ -492,6 +577,16 @@ Rispondi con azioni specifiche per un mixing professionale.
             logger.error(f"❌ Errore esecuzione transizione: {e}")
             return False
 
+    def _set_volumes(self, from_deck: DeckID, from_volume: float, to_deck: DeckID, to_volume: float):
+        self.traktor.set_deck_volume(from_deck, from_volume)
+        self.traktor.set_deck_volume(to_deck, to_volume)
+
+    def _apply_transition_step(self, crossfader_pos: float, from_deck: DeckID, from_volume: float,
+                               to_deck: DeckID, to_volume: float):
+        """Un passo di crossfade: un solo hop sul pool MIDI"""
+        self.traktor.set_crossfader(crossfader_pos)
+        self._set_volumes(from_deck, from_volume, to_deck, to_volume)
+
     async def auto_dj_loop(self):
         """Loop principale AI DJ automatico"""
         logger.info("🤖 Avvio loop AI DJ automatico")
@@ -500,21 +595,47 @@ Rispondi con azioni specifiche per un mixing professionale.
             while self.active and self.current_session:
 
                 # Ottieni stato attuale
-                status = self.traktor.get_status()
-                self.dj_context.current_bpm = status.deck_a_bpm or status.deck_b_bpm
+                status = await self.executors.midi(self.traktor.get_status)
+
+                # Ruoli dei deck dallo stato reale di play (stessi ruoli del look-ahead)
+                current_deck, target_deck = self._deck_roles(status)
+                on_air_bpm = status.deck_a_bpm if current_deck == DeckID.A else status.deck_b_bpm
+                self.dj_context.current_bpm = on_air_bpm or self.dj_context.current_bpm
                 self.dj_context.time_in_set = int((time.time() - self.current_session.session_start) / 60)
 
+                # Look-ahead: piano sempre pronto (ricalcolato se il contesto cambia)
+                self._refresh_lookahead_if_stale(current_deck, target_deck)
+
                 # Determina se è ora di una transizione
                 # (logica semplificata - in un sistema reale analizzaresti la posizione del brano)
                 if await self._should_transition():
-                    next_track = await self.suggest_next_track(self.dj_context)
+                    plan = self._take_lookahead(current_deck, target_deck)
+
+                    if plan:
+                        # Commit immediato: nessuna chiamata AI nel percorso critico
+                        next_track, transition_plan = plan.next_track, plan.transition_plan
+                    else:
+                        # Piano non pronto: selezione locale senza attendere l'AI
+                        logger.info("⚡ Look-ahead non pronto, selezione locale")
+                        candidates = [t for t in self.available_tracks if t.filepath not in self.track_history]
+                        next_track = self._smart_track_selection(candidates[:20], self.dj_context)
+                        transition_plan = None
 
                     if next_track:
-                        # Determina deck target
-                        target_deck = DeckID.B if status.deck_a_bpm > 0 else DeckID.A
-                        current_deck = DeckID.A if target_deck == DeckID.B else DeckID.B
+                        if self._lookahead_task and not self._lookahead_task.done():
+                            self._lookahead_task.cancel()
+                        self.lookahead_plan = None
+
+                        success = await self.perform_transition(
+                            current_deck, target_deck, next_track,
+                            transition_plan=transition_plan or AIResponse(success=False, response="")
+                        )
 
-                        await self.perform_transition(current_deck, target_deck, next_track)
+                        # Nuovo track partito: calcola subito il successivo
+                        # (target_deck è ora in onda, come lo vedrà _deck_roles)
+                        if success:
+                            self._on_air_deck = target_deck
+                            self._start_lookahead(target_deck, current_deck)
 
                 # Aggiorna ogni 10 secondi
                 await asyncio.sleep(10)
@@ -522,6 +643,18 @@ Rispondi con azioni specifiche per un mixing professionale.
         except Exception as e:
             logger.error(f"❌ Errore loop AI DJ: {e}")
 
+    def _deck_roles(self, status) -> Tuple[DeckID, DeckID]:
+        """(deck in onda, deck target): deck in play, altrimenti l'ultimo portato in onda"""
+        playing = [deck for deck in (DeckID.A, DeckID.B) if self.traktor.is_deck_playing(deck)]
+        if len(playing) == 1:
+            current_deck = playing[0]
+        elif self._on_air_deck is not None:
+            current_deck = self._on_air_deck
+        else:
+            current_deck = DeckID.A if status.deck_a_bpm > 0 else DeckID.B
+        target_deck = DeckID.B if current_deck == DeckID.A else DeckID.A
+        return current_deck, target_deck
+
     async def _should_transition(self) -> bool:
         """Determina se è ora di fare una transizione"""
         # Logica semplificata - in realtà controlleresti posizione track, beat phase, etc.
@@ -543,6 +676,12 @@ Rispondi con azioni specifiche per un mixing professionale.
         logger.info("🛑 Fermando sessione DJ...")
         self.active = False
 
+        if self._lookahead_task and not self._lookahead_task.done():
+            self._lookahead_task.cancel()
+        self.lookahead_plan = None
+        self.loop_lag.stop()
+        self.executors.shutdown()
+
         if self.current_session:
             stats = self.current_session.get_session_stats()
             logger.info(f"📊 Sessione terminata: {stats}")
@@ -550,7 +689,12 @@ Rispondi con azioni specifiche per un mixing professionale.
     def get_session_stats(self) -> Dict[str, Any]:
         """Ottieni statistiche sessione corrente"""
         if self.current_session:
-            return self.current_session.get_session_stats()
+            return {
+                **self.current_session.get_session_stats(),
+                'lookahead': dict(self.lookahead_stats),
+                'executors': self.executors.get_stats(),
+                'loop_lag': self.loop_lag.get_stats()
+            }
         return {}
 
 # Factory function
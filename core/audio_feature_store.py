@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+🗄️ Audio Feature Store
+Cache persistente su disco dei risultati AudioFeatures, indirizzato per contenuto
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterable
+
+# Import con fallback
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from core.dependency_manager import create_audio_features
+
+logger = logging.getLogger(__name__)
+
+# Array fields of AudioFeatures stored as individual .npy files (mmap-able)
+ARRAY_FIELDS = ('beat_times', 'onset_times', 'rms_energy', 'spectral_centroid', 'chroma')
+
+# Scalar / small fields stored in meta.json
+META_FIELDS = (
+    'duration', 'sample_rate', 'tempo', 'key', 'energy_level', 'tempo_stability',
+    'harmonic_compatibility', 'segment_boundaries', 'intro_duration',
+    'outro_duration', 'optimal_mix_points'
+)
+
+class AudioFeatureStore:
+    """
+    Feature store keyed by audio content hash + analyzer version.
+
+    Layout: <root>/<hash[:2]>/<hash>-<version>/{meta.json, <array>.npy}
+    Arrays are loaded with mmap so beat grids are available without librosa
+    and without reading whole feature matrices into memory.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def compute_content_hash(filepath: Path, chunk_size: int = 1 << 20) -> str:
+        """Hash del contenuto audio (indipendente da nome/percorso del file)"""
+        hasher = hashlib.blake2b(digest_size=20)
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def _entry_dir(self, content_hash: str, version: str) -> Path:
+        safe_version = "".join(c if c.isalnum() or c in '.-_' else '_' for c in str(version))
+        return self.root / content_hash[:2] / f"{content_hash}-{safe_version}"
+
+    def has(self, content_hash: str, version: str) -> bool:
+        return (self._entry_dir(content_hash, version) / 'meta.json').exists()
+
+    def put(self, content_hash: str, version: str, features: Any) -> bool:
+        """Salva AudioFeatures (scrittura atomica della directory)"""
+        if not NUMPY_AVAILABLE or not content_hash:
+            return False
+
+        entry_dir = self._entry_dir(content_hash, version)
+        if entry_dir.exists():
+            return True
+
+        entry_dir.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix='.tmp-', dir=entry_dir.parent))
+        try:
+            for field in ARRAY_FIELDS:
+                value = getattr(features, field, None)
+                if value is not None:
+                    np.save(tmp_dir / f"{field}.npy", np.ascontiguousarray(value))
+
+            meta = {field: self._to_json(getattr(features, field, None)) for field in META_FIELDS}
+            meta['version'] = version
+            with open(tmp_dir / 'meta.json', 'w') as f:
+                json.dump(meta, f)
+
+            os.replace(tmp_dir, entry_dir)
+            return True
+
+        except OSError as e:
+            # Another writer may have won the race for the same entry
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if entry_dir.exists():
+                return True
+            logger.warning(f"Errore salvataggio feature store {content_hash}: {e}")
+            return False
+        except Exception as e:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            logger.warning(f"Errore salvataggio feature store {content_hash}: {e}")
+            return False
+
+    def get(self, content_hash: str, version: str, mmap: bool = True) -> Optional[Any]:
+        """Carica AudioFeatures completo (array in mmap)"""
+        meta = self.get_meta(content_hash, version)
+        if meta is None:
+            return None
+
+        arrays = self.load_arrays(content_hash, version, ARRAY_FIELDS, mmap=mmap)
+        kwargs = {field: meta.get(field) for field in META_FIELDS}
+        kwargs.update({field: arrays.get(field) for field in ARRAY_FIELDS})
+        return create_audio_features(**kwargs)
+
+    def get_meta(self, content_hash: str, version: str) -> Optional[Dict[str, Any]]:
+        """Solo i campi scalari (tempo, key, intro/outro, mix points...)"""
+        meta_path = self._entry_dir(content_hash, version) / 'meta.json'
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Feature store corrotto {meta_path}: {e}")
+            return None
+
+    def load_arrays(self, content_hash: str, version: str,
+                    fields: Iterable[str], mmap: bool = True) -> Dict[str, Any]:
+        """Carica solo gli array richiesti"""
+        if not NUMPY_AVAILABLE:
+            return {}
+
+        entry_dir = self._entry_dir(content_hash, version)
+        arrays = {}
+        for field in fields:
+            path = entry_dir / f"{field}.npy"
+            if path.exists():
+                arrays[field] = np.load(path, mmap_mode='r' if mmap else None)
+        return arrays
+
+    def load_beat_grid(self, content_hash: str, version: str) -> Optional[Any]:
+        """Beat times (secondi) senza decodifica audio"""
+        return self.load_arrays(content_hash, version, ('beat_times',)).get('beat_times')
+
+    @staticmethod
+    def _to_json(value: Any) -> Any:
+        """Converte tipi numpy in tipi JSON nativi"""
+        if value is None:
+            return None
+        if hasattr(value, 'tolist'):
+            return value.tolist()
+        if isinstance(value, dict):
+            return {k: AudioFeatureStore._to_json(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [AudioFeatureStore._to_json(v) for v in value]
+        return value
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+📬 Command Acknowledgement Tracker
+Tracking di più comandi MIDI in volo, ognuno con id di correlazione, deadline e retry
+"""
+
+import time
+import heapq
+import logging
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, List
+from dataclasses import dataclass, field
+from enum import Enum
+
+logger = logging.getLogger(__name__)
+
+class CommandStatus(Enum):
+    """Stati comando semplificati"""
+    SENT = "sent"           # Comando inviato via MIDI
+    WAITING = "waiting"     # Attesa risposta Traktor
+    VERIFIED = "verified"   # State aggiornato come atteso
+    TIMEOUT = "timeout"     # Timeout - Traktor non ha risposto
+    FAILED = "failed"       # Errore invio MIDI
+
+@dataclass
+class CommandTracking:
+    """Tracking di un comando (command_id = id di correlazione)"""
+    command_name: str
+    deck_id: Optional[str] = None
+    timestamp: float = 0.0
+    status: CommandStatus = CommandStatus.SENT
+    timeout_seconds: float = 2.0
+    expected_state_change: Optional[str] = None  # es. "loaded=True"
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    # Acknowledgement automatico (opzionale)
+    command_id: int = 0
+    verify: Optional[Callable[[], bool]] = None   # True quando lo stato atteso è visibile
+    resend: Optional[Callable[[], bool]] = None   # Reinvio del comando
+    retry_after: float = 0.5                      # Attesa ack prima di un retry
+    max_attempts: int = 1
+    attempts: int = 1
+    next_retry_at: float = 0.0
+    error: str = ""
+    resolved_at: float = 0.0
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def deadline(self) -> float:
+        return self.timestamp + self.timeout_seconds
+
+    @property
+    def is_pending(self) -> bool:
+        return self.status in (CommandStatus.SENT, CommandStatus.WAITING)
+
+class AcknowledgementTracker:
+    """
+    Più comandi in volo contemporaneamente, correlati per command_id.
+
+    I comandi con `verify` vengono verificati a ogni evento di feedback
+    (process_feedback); se non confermati entro retry_after vengono reinviati
+    con `resend`, fino a max_attempts. Finiti i tentativi restano in attesa
+    fino alla deadline: tutti i comandi (anche senza verify, risolti dal
+    chiamante) scadono in TIMEOUT alla propria deadline.
+    Un solo thread timer dorme fino alla prossima deadline/retry ed esegue
+    anche le verify richieste dal feedback: nessuno sleep per comando e
+    nessuna verify sul thread MIDI.
+    """
+
+    def __init__(self, on_resolved: Optional[Callable[[CommandTracking], None]] = None):
+        self.in_flight: "OrderedDict[int, CommandTracking]" = OrderedDict()
+        self.on_resolved = on_resolved
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
+        self._timers: List[tuple] = []  # heap (when, command_id)
+        self._timer_thread: Optional[threading.Thread] = None
+        self._running = False
+        # Feedback in attesa di verifica sul thread timer (None = tutti i deck)
+        self._feedback_decks: set = set()
+        self._feedback_all = False
+
+        self.stats = {
+            'retries': 0,
+            'max_in_flight': 0
+        }
+
+    def submit(self, tracking: CommandTracking) -> int:
+        """Registra un comando già inviato; restituisce l'id di correlazione"""
+        with self._lock:
+            tracking.command_id = next(self._ids)
+            if not tracking.timestamp:
+                tracking.timestamp = time.time()
+            if tracking.verify is not None:
+                tracking.status = CommandStatus.WAITING
+                if not tracking.next_retry_at:
+                    tracking.next_retry_at = tracking.timestamp + tracking.retry_after
+                self._schedule(tracking.next_retry_at, tracking.command_id)
+            # Anche i comandi senza verify scadono da soli alla deadline
+            self._schedule(tracking.deadline, tracking.command_id)
+            self._ensure_timer_thread()
+
+            self.in_flight[tracking.command_id] = tracking
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], len(self.in_flight))
+            return tracking.command_id
+
+    def get(self, command_id: Optional[int] = None) -> Optional[CommandTracking]:
+        """Comando in volo per id (None = il più recente)"""
+        with self._lock:
+            if command_id is None:
+                return next(reversed(self.in_flight.values()), None)
+            return self.in_flight.get(command_id)
+
+    def resolve(self, command_id: int, status: CommandStatus, error: str = "") -> Optional[CommandTracking]:
+        """Chiudi un comando in volo con lo stato finale"""
+        with self._lock:
+            tracking = self.in_flight.pop(command_id, None)
+            if tracking is None:
+                return None
+            tracking.status = status
+            tracking.error = error
+            tracking.resolved_at = time.time()
+
+        tracking.done.set()
+        if self.on_resolved:
+            try:
+                self.on_resolved(tracking)
+            except Exception as e:
+                logger.warning(f"⚠️ Ack callback error: {e}")
+        return tracking
+
+    def process_feedback(self, deck_id: Optional[str] = None):
+        """
+        Evento di feedback (status Traktor aggiornato): richiede la verifica dei
+        comandi in volo del deck (o tutti). Non blocca: le verify girano sul
+        thread timer, non sul thread che riceve il feedback.
+        """
+        with self._lock:
+            if not self.in_flight:
+                return
+            if deck_id is None:
+                self._feedback_all = True
+            else:
+                self._feedback_decks.add(deck_id)
+            self._ensure_timer_thread()
+            self._wakeup.notify()
+
+    def _take_feedback_candidates_locked(self) -> List[CommandTracking]:
+        if not (self._feedback_all or self._feedback_decks):
+            return []
+        feedback_all, decks = self._feedback_all, self._feedback_decks
+        self._feedback_all, self._feedback_decks = False, set()
+        return [
+            tracking for tracking in self.in_flight.values()
+            if tracking.verify is not None and (feedback_all or tracking.deck_id is None or tracking.deck_id in decks)
+        ]
+
+    def _evaluate(self, tracking: CommandTracking, now: float):
+        if tracking.verify is None:
+            # Risolto esplicitamente dal chiamante, altrimenti timeout
+            if now >= tracking.deadline:
+                self.resolve(tracking.command_id, CommandStatus.TIMEOUT, "No acknowledgement before deadline")
+            return
+
+        try:
+            verified = tracking.verify()
+        except Exception as e:
+            logger.debug(f"Verify error for {tracking.command_name}: {e}")
+            verified = False
+
+        if verified:
+            self.resolve(tracking.command_id, CommandStatus.VERIFIED)
+        elif now >= tracking.deadline:
+            self.resolve(tracking.command_id, CommandStatus.TIMEOUT,
+                         f"No acknowledgement after {tracking.attempts} attempts")
+        elif now >= tracking.next_retry_at:
+            if tracking.attempts >= tracking.max_attempts:
+                # Tentativi esauriti: il feedback può ancora arrivare fino alla deadline
+                return
+
+            with self._lock:
+                if tracking.command_id not in self.in_flight:
+                    return
+                tracking.attempts += 1
+                tracking.next_retry_at = now + tracking.retry_after
+                self.stats['retries'] += 1
+                self._schedule(tracking.next_retry_at, tracking.command_id)
+
+            logger.info(f"🔁 Retry {tracking.attempts}/{tracking.max_attempts}: {tracking.command_name} (#{tracking.command_id})")
+            if tracking.resend is not None:
+                try:
+                    tracking.resend()
+                except Exception as e:
+                    logger.warning(f"⚠️ Resend failed for {tracking.command_name}: {e}")
+
+    def wait(self, tracking: CommandTracking, timeout: Optional[float] = None) -> bool:
+        """Attendi la risoluzione di un comando (senza polling); True se risolto"""
+        if timeout is None:
+            timeout = max(0.0, tracking.deadline - time.time()) + 0.5
+        return tracking.done.wait(timeout)
+
+    def pending_count(self) -> int:
+        return len(self.in_flight)
+
+    def clear(self):
+        """Scarta tutti i comandi in volo (senza callback)"""
+        with self._lock:
+            for tracking in self.in_flight.values():
+                tracking.done.set()
+            self.in_flight.clear()
+            self._timers.clear()
+            self._feedback_decks.clear()
+            self._feedback_all = False
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            self._wakeup.notify_all()
+
+    # ==========================================
+    # TIMER (deadline e retry senza feedback)
+    # ==========================================
+
+    def _schedule(self, when: float, command_id: int):
+        heapq.heappush(self._timers, (when, command_id))
+        self._wakeup.notify()
+
+    def _ensure_timer_thread(self):
+        if self._timer_thread and self._timer_thread.is_alive():
+            return
+        self._running = True
+        self._timer_thread = threading.Thread(target=self._timer_loop, daemon=True)
+        self._timer_thread.start()
+
+    def _timer_loop(self):
+        while True:
+            with self._lock:
+                while (self._running and not (self._feedback_all or self._feedback_decks) and
+                       (not self._timers or self._timers[0][0] > time.time())):
+                    timeout = self._timers[0][0] - time.time() if self._timers else None
+                    self._wakeup.wait(timeout)
+                if not self._running:
+                    return
+
+                now = time.time()
+                due: Dict[int, CommandTracking] = {
+                    tracking.command_id: tracking for tracking in self._take_feedback_candidates_locked()
+                }
+                while self._timers and self._timers[0][0] <= now:
+                    _, command_id = heapq.heappop(self._timers)
+                    tracking = self.in_flight.get(command_id)
+                    if tracking is not None:
+                        due[command_id] = tracking
+
+            for tracking in due.values():
+                self._evaluate(tracking, now)
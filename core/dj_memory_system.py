@@ -7,9 +7,11 @@ Integrates with Memory Agent MCP for persistent learning capabilities
 
 import json
 import time
+import queue
 import sqlite3
 import hashlib
 import logging
+from collections import deque, OrderedDict
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
@@ -68,6 +70,24 @@ class DJMemory:
     times_referenced: int = 0
     last_accessed: float = 0.0
 
+@dataclass
+class MemoryIndexEntry:
+    """Compact in-memory index of a stored memory (no JSON blobs)"""
+    memory_id: str
+    memory_type: MemoryType
+    timestamp: float
+    venue_type: str
+    event_type: str
+    session_time: float
+    bpm_diff: Optional[float]
+    key_compatibility: Optional[float]
+    technique_used: Optional[str]
+    success_score: float
+    confidence: float
+    source_bpm: Optional[float] = None      # None when no source track
+    source_energy: Optional[float] = None
+    target_energy: Optional[float] = None   # None when no target track
+
 @dataclass
 class PatternRule:
     """A learned pattern/rule for DJ decisions"""
@@ -82,6 +102,13 @@ class PatternRule:
 class DJMemorySystem:
     """Advanced memory system for DJ learning and pattern recognition"""
 
+    # Columns needed for the compact in-memory index (no JSON blobs)
+    _INDEX_COLUMNS = (
+        'memory_id, memory_type, timestamp, venue_type, event_type, session_time, '
+        'bpm_diff, key_compatibility, technique_used, success_score, confidence, '
+        'source_bpm, source_energy, target_energy'
+    )
+
     def __init__(self, config: DJConfig = None):
         self.config = config or get_config()
 
@@ -89,8 +116,15 @@ class DJMemorySystem:
         self.db_path = Path.home() / '.config' / 'dj_ai' / 'dj_memory.db'
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Memory storage
-        self.active_memories: List[DJMemory] = []
+        # Memory storage: compact index window + on-demand decoded memories
+        self.memory_window_size = 1000
+        self.memory_window_days = 30
+        self.memory_index: deque = deque(maxlen=self.memory_window_size)
+        self.window_complete = True  # False when older rows exist only on disk
+        self.memory_cache: "OrderedDict[str, DJMemory]" = OrderedDict()
+        self.memory_cache_size = 256
+        self.disk_query_limit = 500
+        self._unsaved_memories: Dict[str, DJMemory] = {}
         self.learned_patterns: List[PatternRule] = []
 
         # Learning parameters
@@ -99,12 +133,26 @@ class DJMemorySystem:
         self.memory_retention_days = 365
 
         # Threading for background processing
-        self.learning_queue = []
+        self.learning_queue: List[MemoryIndexEntry] = []
         self.learning_thread = None
         self.is_learning = False
+        self.memory_lock = threading.RLock()
+
+        # Write-behind persistence
+        self.write_queue: "queue.Queue[DJMemory]" = queue.Queue()
+        self.write_batch_size = 50
+        self.write_flush_interval = 2.0     # Seconds between batch flushes
+        self.learning_interval = 60.0       # Seconds between incremental learning passes
+        self.compaction_interval = 6 * 3600 # Seconds between retention compactions
+        self._flush_requested = threading.Event()
+        self._flush_done = threading.Event()
+
+        # Sliding pattern groups, updated incrementally by the learning pass
+        self.pattern_groups: Dict[str, deque] = self._empty_pattern_groups()
 
         self._init_database()
         self._load_existing_memories()
+        self.start_background_learning()
         print("🧠 DJ Memory System initialized")
 
     def _init_database(self):
@@ -133,9 +181,13 @@ class DJMemorySystem:
                         confidence REAL,
                         times_referenced INTEGER DEFAULT 0,
                         last_accessed REAL,
-                        created_at REAL
+                        created_at REAL,
+                        source_bpm REAL,
+                        source_energy REAL,
+                        target_energy REAL
                     )
                 ''')
+                self._migrate_index_columns(conn)
 
                 # Patterns table
                 conn.execute('''
@@ -172,31 +224,67 @@ class DJMemorySystem:
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_venue_type ON memories(venue_type)')
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON memories(timestamp)')
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_success_score ON memories(success_score)')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_venue_event_time ON memories(venue_type, event_type, timestamp)')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_event_time ON memories(event_type, timestamp)')
 
                 conn.commit()
 
         except Exception as e:
             logger.error(f"Error initializing memory database: {e}")
 
+    def _migrate_index_columns(self, conn: sqlite3.Connection):
+        """Add and backfill the numeric index columns on older databases"""
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(memories)')}
+        added = False
+        for column in ('source_bpm', 'source_energy', 'target_energy'):
+            if column not in columns:
+                conn.execute(f'ALTER TABLE memories ADD COLUMN {column} REAL')
+                added = True
+
+        if not added:
+            return
+
+        try:
+            conn.execute('''
+                UPDATE memories SET
+                    source_bpm = COALESCE(json_extract(source_track, '$.bpm'), 120),
+                    source_energy = COALESCE(json_extract(source_track, '$.energy'), 5)
+                WHERE source_track IS NOT NULL AND source_track != '{}'
+            ''')
+            conn.execute('''
+                UPDATE memories SET
+                    target_energy = COALESCE(json_extract(target_track, '$.energy'), 5)
+                WHERE target_track IS NOT NULL AND target_track != '{}'
+            ''')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Could not backfill memory index columns (JSON1 unavailable?): {e}")
+
     def _load_existing_memories(self):
-        """Load existing memories from database"""
+        """Load the compact memory index window and learned patterns"""
         try:
             with sqlite3.connect(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
 
-                # Load recent memories (last 30 days)
-                cutoff_time = time.time() - (30 * 24 * 3600)
-                cursor = conn.execute('''
-                    SELECT * FROM memories
+                # Load index of recent memories only - blobs are decoded on demand
+                cutoff_time = time.time() - (self.memory_window_days * 24 * 3600)
+                cursor = conn.execute(f'''
+                    SELECT {self._INDEX_COLUMNS} FROM memories
                     WHERE timestamp > ?
                     ORDER BY timestamp DESC
-                    LIMIT 1000
-                ''', (cutoff_time,))
+                    LIMIT ?
+                ''', (cutoff_time, self.memory_window_size))
 
-                for row in cursor:
-                    memory = self._row_to_memory(row)
-                    if memory:
-                        self.active_memories.append(memory)
+                entries = [entry for entry in map(self._row_to_index_entry, cursor) if entry]
+                self.memory_index.extend(reversed(entries))
+
+                # Anything older than the window must be queried on disk
+                oldest = entries[-1].timestamp if entries else time.time()
+                self.window_complete = conn.execute(
+                    'SELECT 1 FROM memories WHERE timestamp < ? LIMIT 1', (oldest,)
+                ).fetchone() is None
+
+                # Seed incremental pattern groups with the loaded window
+                self.pattern_groups = self._group_memories_by_pattern()
 
                 # Load learned patterns
                 cursor = conn.execute('SELECT * FROM learned_patterns')
@@ -205,7 +293,7 @@ class DJMemorySystem:
                     if pattern:
                         self.learned_patterns.append(pattern)
 
-                print(f"📚 Loaded {len(self.active_memories)} memories and {len(self.learned_patterns)} patterns")
+                print(f"📚 Loaded {len(self.memory_index)} memories and {len(self.learned_patterns)} patterns")
 
         except Exception as e:
             logger.error(f"Error loading memories: {e}")
@@ -249,14 +337,18 @@ class DJMemorySystem:
             if 'key_compatibility' in context:
                 memory.key_compatibility = context['key_compatibility']
 
-            # Store in active memory
-            self.active_memories.append(memory)
-
-            # Save to database
-            self._save_memory_to_db(memory)
+            # Index in memory and queue for pattern learning
+            entry = self._memory_to_index_entry(memory)
+            with self.memory_lock:
+                if len(self.memory_index) == self.memory_index.maxlen:
+                    self.window_complete = False
+                self.memory_index.append(entry)
+                self.learning_queue.append(entry)
+                self._unsaved_memories[memory_id] = memory
+                self._cache_memory(memory)
 
-            # Queue for pattern learning
-            self.learning_queue.append(memory)
+            # Persist through the write-behind worker (never blocks the caller)
+            self.write_queue.put(memory)
 
             print(f"💾 Stored {memory_type.value} memory: {memory_id}")
 
@@ -269,24 +361,116 @@ class DJMemorySystem:
     def query_similar_situations(self, context: Dict, limit: int = 10) -> List[DJMemory]:
         """Find memories from similar situations"""
         try:
-            similar_memories = []
+            similar_entries = []
 
-            # Calculate similarity scores
-            for memory in self.active_memories:
-                similarity = self._calculate_context_similarity(context, memory)
-                if similarity > 0.5:  # Threshold for relevance
-                    memory.last_accessed = time.time()
-                    memory.times_referenced += 1
-                    similar_memories.append((similarity, memory))
+            # Calculate similarity scores on the in-memory index window
+            with self.memory_lock:
+                window = list(self.memory_index)
+                window_complete = self.window_complete
 
-            # Sort by similarity and return top matches
-            similar_memories.sort(key=lambda x: x[0], reverse=True)
-            return [memory for _, memory in similar_memories[:limit]]
+            for entry in window:
+                similarity = self._calculate_context_similarity(context, entry)
+                if similarity > 0.5:  # Threshold for relevance
+                    similar_entries.append((similarity, entry))
+
+            # Window doesn't cover the query - fall back to indexed disk search
+            if len(similar_entries) < limit and not window_complete:
+                oldest = window[0].timestamp if window else time.time()
+                for entry in self._query_index_on_disk(context, before=oldest):
+                    similarity = self._calculate_context_similarity(context, entry)
+                    if similarity > 0.5:
+                        similar_entries.append((similarity, entry))
+
+            # Sort by similarity and decode only the top matches
+            similar_entries.sort(key=lambda x: x[0], reverse=True)
+            top_entries = [entry for _, entry in similar_entries[:limit]]
+            memories = self._get_memories([entry.memory_id for entry in top_entries])
+
+            now = time.time()
+            for memory in memories:
+                memory.last_accessed = now
+                memory.times_referenced += 1
+            return memories
 
         except Exception as e:
             logger.error(f"Error querying similar situations: {e}")
             return []
 
+    def get_memory(self, memory_id: str) -> Optional[DJMemory]:
+        """Get a fully decoded memory by id"""
+        memories = self._get_memories([memory_id])
+        return memories[0] if memories else None
+
+    def _get_memories(self, memory_ids: List[str]) -> List[DJMemory]:
+        """Decode memories on demand (cache, pending writes, then SQLite)"""
+        found: Dict[str, DJMemory] = {}
+        missing = []
+
+        with self.memory_lock:
+            for memory_id in memory_ids:
+                memory = self.memory_cache.get(memory_id) or self._unsaved_memories.get(memory_id)
+                if memory:
+                    self.memory_cache.pop(memory_id, None)
+                    self._cache_memory(memory)
+                    found[memory_id] = memory
+                else:
+                    missing.append(memory_id)
+
+        if missing:
+            try:
+                with sqlite3.connect(self.db_path) as conn:
+                    conn.row_factory = sqlite3.Row
+                    placeholders = ','.join('?' * len(missing))
+                    cursor = conn.execute(
+                        f'SELECT * FROM memories WHERE memory_id IN ({placeholders})', missing
+                    )
+                    for row in cursor:
+                        memory = self._row_to_memory(row)
+                        if memory:
+                            found[memory.memory_id] = memory
+                            with self.memory_lock:
+                                self._cache_memory(memory)
+            except Exception as e:
+                logger.error(f"Error decoding memories: {e}")
+
+        return [found[memory_id] for memory_id in memory_ids if memory_id in found]
+
+    def _cache_memory(self, memory: DJMemory):
+        """Insert into the LRU cache of decoded memories"""
+        self.memory_cache[memory.memory_id] = memory
+        while len(self.memory_cache) > self.memory_cache_size:
+            self.memory_cache.popitem(last=False)
+
+    def _query_index_on_disk(self, context: Dict, before: float) -> List[MemoryIndexEntry]:
+        """Search memories older than the in-memory window using indexed filters"""
+        # Without a venue or event match the similarity score can't pass the
+        # relevance threshold, so those two columns are a lossless filter
+        venue_type = context.get('venue_type')
+        event_type = context.get('event_type')
+        if not venue_type and not event_type:
+            return []
+
+        cutoff_time = time.time() - (self.memory_retention_days * 24 * 3600)
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.execute(f'''
+                    SELECT {self._INDEX_COLUMNS} FROM memories
+                    WHERE venue_type = ? AND timestamp > ? AND timestamp < ?
+                    UNION
+                    SELECT {self._INDEX_COLUMNS} FROM memories
+                    WHERE event_type = ? AND timestamp > ? AND timestamp < ?
+                    ORDER BY timestamp DESC
+                    LIMIT ?
+                ''', (venue_type, cutoff_time, before,
+                      event_type, cutoff_time, before,
+                      self.disk_query_limit))
+                return [entry for entry in map(self._row_to_index_entry, cursor) if entry]
+
+        except Exception as e:
+            logger.error(f"Error querying memories on disk: {e}")
+            return []
+
     def get_recommendation(self, context: Dict) -> Optional[Dict]:
         """Get AI recommendation based on learned patterns"""
         try:
@@ -338,28 +522,173 @@ class DJMemorySystem:
             logger.error(f"Error getting recommendation: {e}")
             return None
 
-    def learn_patterns(self):
-        """Analyze memories to learn new patterns"""
-        try:
-            if len(self.active_memories) < 10:
-                return  # Need minimum data for pattern recognition
+    def learn_patterns(self, new_memories: Optional[List[MemoryIndexEntry]] = None):
+        """Analyze memories to learn new patterns
 
-            # Group memories by context similarity
-            pattern_groups = self._group_memories_by_pattern()
-
-            # Analyze each group for patterns
-            for pattern_type, memories in pattern_groups.items():
-                if len(memories) >= 5:  # Minimum sample size
-                    pattern_rule = self._extract_pattern_rule(pattern_type, memories)
-                    if pattern_rule and pattern_rule.confidence > self.min_confidence_threshold:
-                        self._store_learned_pattern(pattern_rule)
+        Without arguments the pattern groups are rebuilt from the in-memory
+        index window. When ``new_memories`` is given only the groups they fall
+        into are updated and re-evaluated (incremental pass).
+        """
+        try:
+            learned_rules = []
+            with self.memory_lock:
+                if new_memories is None:
+                    if len(self.memory_index) < 10:
+                        return  # Need minimum data for pattern recognition
+                    self.pattern_groups = self._group_memories_by_pattern()
+                    touched_groups = set(self.pattern_groups)
+                else:
+                    # Il worker ha già svuotato learning_queue: le nuove memorie
+                    # vanno nei gruppi prima del controllo sulla dimensione,
+                    # altrimenti andrebbero perse
+                    touched_groups = set()
+                    for memory in new_memories:
+                        for pattern_type in self._classify_memory(memory):
+                            self.pattern_groups[pattern_type].append(memory)
+                            touched_groups.add(pattern_type)
+
+                    if len(self.memory_index) < 10:
+                        return  # Need minimum data for pattern recognition
+
+                # Analyze each touched group for patterns
+                for pattern_type in touched_groups:
+                    memories = list(self.pattern_groups[pattern_type])
+                    if len(memories) >= 5:  # Minimum sample size
+                        pattern_rule = self._extract_pattern_rule(pattern_type, memories)
+                        if pattern_rule and pattern_rule.confidence > self.min_confidence_threshold:
+                            learned_rules.append(pattern_rule)
+
+            # Persist outside memory_lock: DB writes must not stall store_memory
+            for pattern_rule in learned_rules:
+                self._store_learned_pattern(pattern_rule)
 
             print(f"📈 Pattern learning complete. Total patterns: {len(self.learned_patterns)}")
 
         except Exception as e:
             logger.error(f"Error learning patterns: {e}")
 
-    def _calculate_context_similarity(self, context: Dict, memory: DJMemory) -> float:
+    def start_background_learning(self):
+        """Start the write-behind / learning / compaction worker"""
+        if self.is_learning:
+            return
+
+        self.is_learning = True
+        self.learning_thread = threading.Thread(
+            target=self._background_worker_loop,
+            name="DJMemoryWorker",
+            daemon=True
+        )
+        self.learning_thread.start()
+
+    def stop(self):
+        """Stop the background worker after flushing pending writes"""
+        if not self.is_learning:
+            return
+
+        self.is_learning = False
+        self._flush_requested.set()
+        if self.learning_thread and self.learning_thread.is_alive():
+            self.learning_thread.join(timeout=5.0)
+        self.learning_thread = None
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until pending memories have been written to the database"""
+        if not (self.learning_thread and self.learning_thread.is_alive()):
+            self._save_memories_to_db(self._drain_write_queue())
+            return True
+
+        self._flush_done.clear()
+        self._flush_requested.set()
+        return self._flush_done.wait(timeout)
+
+    def _background_worker_loop(self):
+        """Batch DB writes, run incremental learning and retention compaction"""
+        conn = None
+        last_learning = time.time()
+        last_compaction = 0.0
+
+        try:
+            conn = sqlite3.connect(self.db_path)
+
+            while self.is_learning or not self.write_queue.empty():
+                flush_requested = False
+                if self._flush_requested.wait(self.write_flush_interval):
+                    self._flush_requested.clear()
+                    flush_requested = True
+
+                try:
+                    # Write-behind: one transaction per batch
+                    while True:
+                        batch = self._drain_write_queue(self.write_batch_size)
+                        if not batch:
+                            break
+                        self._save_memories_to_db(batch, conn)
+                        with self.memory_lock:
+                            for memory in batch:
+                                self._unsaved_memories.pop(memory.memory_id, None)
+
+                    if flush_requested:
+                        self._flush_done.set()
+
+                    now = time.time()
+
+                    # Incremental pattern learning on new memories only
+                    if now - last_learning >= self.learning_interval:
+                        with self.memory_lock:
+                            new_memories, self.learning_queue = self.learning_queue, []
+                        if new_memories:
+                            self.learn_patterns(new_memories)
+                        last_learning = now
+
+                    # Retention compaction
+                    if now - last_compaction >= self.compaction_interval:
+                        self._compact_memories(conn)
+                        last_compaction = now
+
+                except Exception as e:
+                    logger.error(f"Error in memory background worker: {e}")
+
+        except Exception as e:
+            logger.error(f"Memory background worker stopped: {e}")
+        finally:
+            self._flush_done.set()
+            if conn:
+                conn.close()
+
+    def _drain_write_queue(self, max_items: Optional[int] = None) -> List[DJMemory]:
+        """Pop up to max_items pending memories without blocking"""
+        batch = []
+        while max_items is None or len(batch) < max_items:
+            try:
+                batch.append(self.write_queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _compact_memories(self, conn: sqlite3.Connection):
+        """Enforce memory_retention_days on the database and in-memory state"""
+        cutoff_time = time.time() - (self.memory_retention_days * 24 * 3600)
+
+        cursor = conn.execute('DELETE FROM memories WHERE timestamp < ?', (cutoff_time,))
+        conn.commit()
+
+        with self.memory_lock:
+            self.memory_index = deque(
+                (m for m in self.memory_index if m.timestamp >= cutoff_time),
+                maxlen=self.memory_window_size
+            )
+            for memory_id in [k for k, m in self.memory_cache.items() if m.timestamp < cutoff_time]:
+                del self.memory_cache[memory_id]
+            for pattern_type, memories in self.pattern_groups.items():
+                self.pattern_groups[pattern_type] = deque(
+                    (m for m in memories if m.timestamp >= cutoff_time),
+                    maxlen=self.pattern_recognition_window
+                )
+
+        if cursor.rowcount:
+            logger.info(f"🧹 Compacted {cursor.rowcount} memories older than {self.memory_retention_days} days")
+
+    def _calculate_context_similarity(self, context: Dict, memory: MemoryIndexEntry) -> float:
         """Calculate similarity between current context and stored memory"""
         try:
             similarity_score = 0.0
@@ -376,9 +705,8 @@ class DJMemorySystem:
             factors += 1
 
             # BPM similarity
-            if context.get('current_bpm') and memory.source_track:
-                source_bpm = memory.source_track.get('bpm', 120)
-                bpm_diff = abs(context['current_bpm'] - source_bpm)
+            if context.get('current_bpm') and memory.source_bpm is not None:
+                bpm_diff = abs(context['current_bpm'] - memory.source_bpm)
                 if bpm_diff < 10:
                     similarity_score += 0.2 * (1 - bpm_diff / 10)
                 factors += 1
@@ -389,9 +717,8 @@ class DJMemorySystem:
                 factors += 1
 
             # Energy level similarity
-            if context.get('energy_level') and memory.source_track:
-                source_energy = memory.source_track.get('energy', 5)
-                energy_diff = abs(context['energy_level'] - source_energy)
+            if context.get('energy_level') and memory.source_energy is not None:
+                energy_diff = abs(context['energy_level'] - memory.source_energy)
                 if energy_diff < 3:
                     similarity_score += 0.2 * (1 - energy_diff / 3)
                 factors += 1
@@ -402,34 +729,41 @@ class DJMemorySystem:
             logger.error(f"Error calculating similarity: {e}")
             return 0.0
 
-    def _group_memories_by_pattern(self) -> Dict[str, List[DJMemory]]:
-        """Group memories by similar patterns"""
-        groups = {
-            'venue_based': [],
-            'energy_transitions': [],
-            'harmonic_progressions': [],
-            'timing_patterns': []
+    def _empty_pattern_groups(self) -> Dict[str, deque]:
+        """Create empty pattern groups bounded by the recognition window"""
+        return {
+            pattern_type: deque(maxlen=self.pattern_recognition_window)
+            for pattern_type in ('venue_based', 'energy_transitions',
+                                 'harmonic_progressions', 'timing_patterns')
         }
 
-        try:
-            for memory in self.active_memories:
-                # Group by venue type
-                groups['venue_based'].append(memory)
+    def _classify_memory(self, memory: MemoryIndexEntry) -> List[str]:
+        """Return the pattern groups a memory belongs to"""
+        pattern_types = ['venue_based']
 
-                # Group energy transitions
-                if memory.source_track and memory.target_track:
-                    source_energy = memory.source_track.get('energy', 5)
-                    target_energy = memory.target_track.get('energy', 5)
-                    if abs(source_energy - target_energy) > 1:
-                        groups['energy_transitions'].append(memory)
+        # Group energy transitions
+        if memory.source_energy is not None and memory.target_energy is not None:
+            if abs(memory.source_energy - memory.target_energy) > 1:
+                pattern_types.append('energy_transitions')
 
-                # Group harmonic progressions
-                if memory.key_compatibility and memory.key_compatibility > 0.7:
-                    groups['harmonic_progressions'].append(memory)
+        # Group harmonic progressions
+        if memory.key_compatibility and memory.key_compatibility > 0.7:
+            pattern_types.append('harmonic_progressions')
 
-                # Group timing patterns
-                if memory.session_time:
-                    groups['timing_patterns'].append(memory)
+        # Group timing patterns
+        if memory.session_time:
+            pattern_types.append('timing_patterns')
+
+        return pattern_types
+
+    def _group_memories_by_pattern(self) -> Dict[str, deque]:
+        """Group memories by similar patterns"""
+        groups = self._empty_pattern_groups()
+
+        try:
+            for memory in self.memory_index:
+                for pattern_type in self._classify_memory(memory):
+                    groups[pattern_type].append(memory)
 
             return groups
 
@@ -437,7 +771,7 @@ class DJMemorySystem:
             logger.error(f"Error grouping memories: {e}")
             return groups
 
-    def _extract_pattern_rule(self, pattern_type: str, memories: List[DJMemory]) -> Optional[PatternRule]:
+    def _extract_pattern_rule(self, pattern_type: str, memories: List[MemoryIndexEntry]) -> Optional[PatternRule]:
         """Extract a pattern rule from grouped memories"""
         try:
             successful_memories = [m for m in memories if m.success_score > 0.7]
@@ -493,17 +827,18 @@ class DJMemorySystem:
     def _store_learned_pattern(self, pattern: PatternRule):
         """Store a learned pattern"""
         try:
-            # Check if pattern already exists
-            existing = next((p for p in self.learned_patterns if p.rule_id == pattern.rule_id), None)
-
-            if existing:
-                # Update existing pattern
-                existing.confidence = (existing.confidence + pattern.confidence) / 2
-                existing.success_rate = pattern.success_rate
-                existing.sample_size = pattern.sample_size
-            else:
-                # Add new pattern
-                self.learned_patterns.append(pattern)
+            with self.memory_lock:
+                # Check if pattern already exists
+                existing = next((p for p in self.learned_patterns if p.rule_id == pattern.rule_id), None)
+
+                if existing:
+                    # Update existing pattern
+                    existing.confidence = (existing.confidence + pattern.confidence) / 2
+                    existing.success_rate = pattern.success_rate
+                    existing.sample_size = pattern.sample_size
+                else:
+                    # Add new pattern
+                    self.learned_patterns.append(pattern)
 
             # Save to database
             self._save_pattern_to_db(pattern)
@@ -515,18 +850,31 @@ class DJMemorySystem:
 
     def _save_memory_to_db(self, memory: DJMemory):
         """Save memory to database"""
+        self._save_memories_to_db([memory])
+
+    def _save_memories_to_db(self, memories: List[DJMemory], conn: sqlite3.Connection = None):
+        """Save a batch of memories to database in a single transaction"""
+        if not memories:
+            return
+
+        own_connection = conn is None
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute('''
+            if own_connection:
+                conn = sqlite3.connect(self.db_path)
+
+            now = time.time()
+            with conn:
+                conn.executemany('''
                     INSERT OR REPLACE INTO memories (
                         memory_id, memory_type, timestamp, venue_type, event_type,
                         session_time, source_track, target_track, bpm_diff,
                         key_compatibility, decision_data, technique_used,
                         success_score, crowd_response, technical_quality,
                         pattern_data, confidence, times_referenced,
-                        last_accessed, created_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                        last_accessed, created_at,
+                        source_bpm, source_energy, target_energy
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [(
                     memory.memory_id, memory.memory_type.value, memory.timestamp,
                     memory.venue_type, memory.event_type, memory.session_time,
                     json.dumps(memory.source_track) if memory.source_track else None,
@@ -537,12 +885,15 @@ class DJMemorySystem:
                     memory.crowd_response, memory.technical_quality,
                     json.dumps(memory.pattern_data) if memory.pattern_data else None,
                     memory.confidence, memory.times_referenced,
-                    memory.last_accessed, time.time()
-                ))
-                conn.commit()
+                    memory.last_accessed, now,
+                    *self._track_index_features(memory.source_track, memory.target_track)
+                ) for memory in memories])
 
         except Exception as e:
-            logger.error(f"Error saving memory to database: {e}")
+            logger.error(f"Error saving {len(memories)} memories to database: {e}")
+        finally:
+            if own_connection and conn:
+                conn.close()
 
     def _save_pattern_to_db(self, pattern: PatternRule):
         """Save learned pattern to database"""
@@ -593,6 +944,60 @@ class DJMemorySystem:
             logger.error(f"Error converting row to memory: {e}")
             return None
 
+    def _row_to_index_entry(self, row) -> Optional[MemoryIndexEntry]:
+        """Convert a compact database row to a MemoryIndexEntry"""
+        try:
+            return MemoryIndexEntry(
+                memory_id=row['memory_id'],
+                memory_type=MemoryType(row['memory_type']),
+                timestamp=row['timestamp'],
+                venue_type=row['venue_type'],
+                event_type=row['event_type'],
+                session_time=row['session_time'],
+                bpm_diff=row['bpm_diff'],
+                key_compatibility=row['key_compatibility'],
+                technique_used=row['technique_used'],
+                success_score=row['success_score'],
+                confidence=row['confidence'],
+                source_bpm=row['source_bpm'],
+                source_energy=row['source_energy'],
+                target_energy=row['target_energy']
+            )
+        except Exception as e:
+            logger.error(f"Error converting row to index entry: {e}")
+            return None
+
+    def _memory_to_index_entry(self, memory: DJMemory) -> MemoryIndexEntry:
+        """Build the compact index entry for a decoded memory"""
+        source_bpm, source_energy, target_energy = self._track_index_features(
+            memory.source_track, memory.target_track
+        )
+        return MemoryIndexEntry(
+            memory_id=memory.memory_id,
+            memory_type=memory.memory_type,
+            timestamp=memory.timestamp,
+            venue_type=memory.venue_type,
+            event_type=memory.event_type,
+            session_time=memory.session_time,
+            bpm_diff=memory.bpm_diff,
+            key_compatibility=memory.key_compatibility,
+            technique_used=memory.technique_used,
+            success_score=memory.success_score,
+            confidence=memory.confidence,
+            source_bpm=source_bpm,
+            source_energy=source_energy,
+            target_energy=target_energy
+        )
+
+    @staticmethod
+    def _track_index_features(source_track: Optional[Dict],
+                              target_track: Optional[Dict]) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        """Numeric track features kept in the index (source bpm/energy, target energy)"""
+        source_bpm = source_track.get('bpm', 120) if source_track else None
+        source_energy = source_track.get('energy', 5) if source_track else None
+        target_energy = target_track.get('energy', 5) if target_track else None
+        return source_bpm, source_energy, target_energy
+
     def _row_to_pattern(self, row) -> Optional[PatternRule]:
         """Convert database row to PatternRule object"""
         try:
@@ -611,13 +1016,17 @@ class DJMemorySystem:
 
     def get_memory_stats(self) -> Dict:
         """Get memory system statistics"""
+        window = list(self.memory_index)
         return {
-            'total_memories': len(self.active_memories),
+            'total_memories': len(window),
             'learned_patterns': len(self.learned_patterns),
-            'avg_success_rate': sum(m.success_score for m in self.active_memories) / len(self.active_memories) if self.active_memories else 0,
-            'memory_types': {mt.value: sum(1 for m in self.active_memories if m.memory_type == mt) for mt in MemoryType},
-            'venues_learned': len(set(m.venue_type for m in self.active_memories)),
-            'queue_size': len(self.learning_queue)
+            'avg_success_rate': sum(m.success_score for m in window) / len(window) if window else 0,
+            'memory_types': {mt.value: sum(1 for m in window if m.memory_type == mt) for mt in MemoryType},
+            'venues_learned': len(set(m.venue_type for m in window)),
+            'window_complete': self.window_complete,
+            'cached_memories': len(self.memory_cache),
+            'queue_size': len(self.learning_queue),
+            'pending_writes': self.write_queue.qsize()
         }
 
 def test_memory_system():
@@ -683,6 +1092,7 @@ def test_memory_system():
     # Test pattern learning
     print("\n📚 Testing pattern learning...")
     memory_system.learn_patterns()
+    memory_system.flush()
 
     # Get stats
     stats = memory_system.get_memory_stats()
@@ -690,6 +1100,7 @@ def test_memory_system():
     for key, value in stats.items():
         print(f"  {key}: {value}")
 
+    memory_system.stop()
     print("\n✅ Memory system test complete!")
 
 if __name__ == "__main__":
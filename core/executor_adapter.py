@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+🧵 Executor Adapter
+Chiamate bloccanti (HTTP AI, MIDI Traktor, SQLite) eseguite su thread pool
+dedicati, fuori dall'event loop asyncio, con misura del lag del loop
+"""
+
+import time
+import asyncio
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+# Pool dedicati: un worker MIDI mantiene l'ordine dei comandi verso Traktor
+DEFAULT_POOL_SIZES = {
+    'io': 4,    # HTTP (OpenRouter)
+    'midi': 1,  # TraktorController
+    'db': 2,    # SQLite (ogni chiamata apre la propria connessione)
+}
+
+class ExecutorAdapter:
+    """
+    Adapter async -> sync su pool separati: una chiamata AI di 30s occupa
+    solo il pool 'io' e non ritarda i comandi MIDI di una transizione.
+    """
+
+    def __init__(self, pool_sizes: Optional[Dict[str, int]] = None, slow_call_threshold: float = 0.5):
+        sizes = {**DEFAULT_POOL_SIZES, **(pool_sizes or {})}
+        self.pools: Dict[str, ThreadPoolExecutor] = {
+            name: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"DJ_{name}")
+            for name, size in sizes.items()
+        }
+        self.slow_call_threshold = slow_call_threshold
+        self.stats: Dict[str, Dict[str, Any]] = {
+            name: {'calls': 0, 'errors': 0, 'slow_calls': 0, 'max_call_ms': 0.0, 'in_flight': 0}
+            for name in sizes
+        }
+
+    async def run(self, pool: str, func: Callable, *args, **kwargs) -> Any:
+        """Esegui func(*args, **kwargs) sul pool indicato"""
+        loop = asyncio.get_running_loop()
+        stats = self.stats[pool]
+        stats['in_flight'] += 1
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self.pools[pool], functools.partial(func, *args, **kwargs))
+        except Exception:
+            stats['errors'] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            stats['in_flight'] -= 1
+            stats['calls'] += 1
+            stats['max_call_ms'] = max(stats['max_call_ms'], elapsed * 1000)
+            if elapsed > self.slow_call_threshold:
+                stats['slow_calls'] += 1
+                logger.debug(f"🐢 Slow {pool} call {getattr(func, '__name__', func)}: {elapsed * 1000:.0f}ms")
+
+    async def io(self, func: Callable, *args, **kwargs) -> Any:
+        return await self.run('io', func, *args, **kwargs)
+
+    async def midi(self, func: Callable, *args, **kwargs) -> Any:
+        return await self.run('midi', func, *args, **kwargs)
+
+    async def db(self, func: Callable, *args, **kwargs) -> Any:
+        return await self.run('db', func, *args, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: dict(stats) for name, stats in self.stats.items()}
+
+    def shutdown(self, wait: bool = False):
+        for pool in self.pools.values():
+            pool.shutdown(wait=wait)
+
+class LoopLagMonitor:
+    """Misura il ritardo dell'event loop (sleep programmato vs risveglio reale)"""
+
+    def __init__(self, interval: float = 0.1, warn_threshold: float = 0.1):
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            'samples': 0,
+            'last_lag_ms': 0.0,
+            'avg_lag_ms': 0.0,
+            'max_lag_ms': 0.0,
+            'lag_warnings': 0
+        }
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._record(lag)
+
+    def _record(self, lag: float):
+        lag_ms = lag * 1000
+        stats = self.stats
+        stats['samples'] += 1
+        stats['last_lag_ms'] = lag_ms
+        stats['max_lag_ms'] = max(stats['max_lag_ms'], lag_ms)
+        # Media mobile esponenziale
+        stats['avg_lag_ms'] = lag_ms if stats['samples'] == 1 else stats['avg_lag_ms'] * 0.9 + lag_ms * 0.1
+
+        if lag > self.warn_threshold:
+            stats['lag_warnings'] += 1
+            logger.warning(f"⏱️ Event loop lag {lag_ms:.0f}ms: blocking call on the loop?")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
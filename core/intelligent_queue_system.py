@@ -16,11 +16,11 @@ sys.path.append(str(Path(__file__).parent))
 
 import json
 import time
+import heapq
 import threading
 from typing import List, Dict, Optional, Tuple, NamedTuple
 from dataclasses import dataclass, field
 from enum import Enum, IntEnum
-from queue import PriorityQueue
 import logging
 
 from music_library import TrackInfo, MusicLibrary
@@ -59,12 +59,250 @@ class QueuedTrack:
     queue_position: int = 0
     emergency_rating: float = 0.0  # 0-1, higher = better emergency track
     crowd_response_prediction: float = 0.5  # 0-1 expected crowd reaction
+    target_energy: Optional[float] = None  # Energy target the track was planned for
+
+    @property
+    def track_id(self) -> str:
+        """Unique identifier of the queued track"""
+        return self.track_info.filepath
+
+    def sort_key(self) -> Tuple[int, float]:
+        """Priority queue ordering key"""
+        return (self.priority, self.queue_timestamp)
 
     def __lt__(self, other):
         """Priority queue ordering"""
-        if self.priority != other.priority:
-            return self.priority < other.priority
-        return self.queue_timestamp < other.queue_timestamp
+        return self.sort_key() < other.sort_key()
+
+class IndexedTrackHeap:
+    """
+    Binary min-heap of QueuedTrack with a track_id -> position index.
+
+    Supports O(log n) push/pop/update/remove and O(k log k) non-destructive
+    peek of the first k items. Not thread-safe: callers hold the queue lock.
+    """
+
+    def __init__(self):
+        self._heap: List[QueuedTrack] = []
+        self._positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, track_id: str) -> bool:
+        return track_id in self._positions
+
+    def empty(self) -> bool:
+        return not self._heap
+
+    def clear(self):
+        self._heap.clear()
+        self._positions.clear()
+
+    def push(self, item: QueuedTrack):
+        """Add a track, replacing any queued entry for the same track"""
+        if item.track_id in self._positions:
+            self.remove(item.track_id)
+
+        self._heap.append(item)
+        self._positions[item.track_id] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def pop(self) -> Optional[QueuedTrack]:
+        """Remove and return the highest priority track"""
+        if not self._heap:
+            return None
+        return self._remove_at(0)
+
+    def peek(self) -> Optional[QueuedTrack]:
+        return self._heap[0] if self._heap else None
+
+    def peek_k(self, k: int) -> List[QueuedTrack]:
+        """First k tracks in priority order, without modifying the heap"""
+        result = []
+        if not self._heap or k <= 0:
+            return result
+
+        candidates = [(self._heap[0].sort_key(), 0)]
+        while candidates and len(result) < k:
+            _, index = heapq.heappop(candidates)
+            result.append(self._heap[index])
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(self._heap):
+                    heapq.heappush(candidates, (self._heap[child].sort_key(), child))
+        return result
+
+    def get(self, track_id: str) -> Optional[QueuedTrack]:
+        index = self._positions.get(track_id)
+        return self._heap[index] if index is not None else None
+
+    def items(self) -> List[QueuedTrack]:
+        """Unordered copy of the queued tracks"""
+        return list(self._heap)
+
+    def update_priority(self, track_id: str, priority: QueuePriority) -> bool:
+        """Change a track's priority in place (decrease or increase key)"""
+        index = self._positions.get(track_id)
+        if index is None:
+            return False
+
+        item = self._heap[index]
+        if item.priority == priority:
+            return True
+
+        raised = priority < item.priority
+        item.priority = priority
+        if raised:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+        return True
+
+    def remove(self, track_id: str) -> Optional[QueuedTrack]:
+        """Remove a track by id"""
+        index = self._positions.get(track_id)
+        if index is None:
+            return None
+        return self._remove_at(index)
+
+    def _remove_at(self, index: int) -> QueuedTrack:
+        item = self._heap[index]
+        last = self._heap.pop()
+        del self._positions[item.track_id]
+
+        if index < len(self._heap):
+            self._heap[index] = last
+            self._positions[last.track_id] = index
+            self._sift_up(index)
+            self._sift_down(self._positions[last.track_id])
+        return item
+
+    def _swap(self, i: int, j: int):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._positions[heap[i].track_id] = i
+        self._positions[heap[j].track_id] = j
+
+    def _sift_up(self, index: int):
+        while index > 0:
+            parent = (index - 1) // 2
+            if self._heap[index] < self._heap[parent]:
+                self._swap(index, parent)
+                index = parent
+            else:
+                break
+
+    def _sift_down(self, index: int):
+        size = len(self._heap)
+        while True:
+            smallest = index
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < size and self._heap[child] < self._heap[smallest]:
+                    smallest = child
+            if smallest == index:
+                break
+            self._swap(index, smallest)
+            index = smallest
+
+class EnergyBpmIndex:
+    """
+    Persistent 2-D histogram (energy x BPM) of library track ids.
+
+    Pool queries visit only the cells inside the requested ranges and stop
+    as soon as enough tracks are found, instead of scanning the library.
+    """
+
+    ENERGY_BIN_WIDTH = 1.0
+    BPM_BIN_WIDTH = 5.0
+
+    def __init__(self):
+        self._rows: Dict[int, Dict[Optional[int], set]] = {}  # energy bin -> BPM bin -> track ids
+        self._tracks: Dict[str, TrackInfo] = {}
+        self._track_cells: Dict[str, Tuple[int, Optional[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def rebuild(self, tracks: List[TrackInfo]):
+        """Rebuild the index from a full track list"""
+        self._rows.clear()
+        self._tracks.clear()
+        self._track_cells.clear()
+        for track in tracks:
+            self.add_track(track)
+
+    def add_track(self, track: TrackInfo):
+        """Add or re-bucket a track"""
+        track_id = track.filepath
+        self.remove_track(track_id)
+
+        if not track.energy_level:
+            return  # Can't be bucketed without energy
+
+        cell = (self._energy_bin(track.energy_level),
+                self._bpm_bin(track.bpm) if track.bpm else None)
+        self._rows.setdefault(cell[0], {}).setdefault(cell[1], set()).add(track_id)
+        self._tracks[track_id] = track
+        self._track_cells[track_id] = cell
+
+    def remove_track(self, track_id: str):
+        cell = self._track_cells.pop(track_id, None)
+        if cell is None:
+            return
+        self._tracks.pop(track_id, None)
+        row = self._rows.get(cell[0], {})
+        members = row.get(cell[1])
+        if members is not None:
+            members.discard(track_id)
+            if not members:
+                del row[cell[1]]
+            if not row:
+                del self._rows[cell[0]]
+
+    def query(self, energy_min: float, energy_max: float,
+              bpm_min: Optional[float] = None, bpm_max: Optional[float] = None,
+              limit: Optional[int] = None, high_energy_first: bool = False) -> List[TrackInfo]:
+        """
+        Tracks within the energy (and optional BPM) range, ordered by energy
+        (descending if high_energy_first) then BPM ascending.
+        """
+        bpm_filtered = bpm_min is not None or bpm_max is not None
+        energy_bins = range(self._energy_bin(energy_min), self._energy_bin(energy_max) + 1)
+        if high_energy_first:
+            energy_bins = reversed(energy_bins)
+
+        results: List[TrackInfo] = []
+        for energy_bin in energy_bins:
+            # Gather every BPM cell of this energy row that can match
+            row: List[TrackInfo] = []
+            for cell_bpm, track_ids in self._rows.get(energy_bin, {}).items():
+                if bpm_filtered and (cell_bpm is None or
+                                     (bpm_min is not None and cell_bpm < self._bpm_bin(bpm_min)) or
+                                     (bpm_max is not None and cell_bpm > self._bpm_bin(bpm_max))):
+                    continue
+                for track_id in track_ids:
+                    track = self._tracks[track_id]
+                    if not energy_min <= track.energy_level <= energy_max:
+                        continue
+                    if bpm_filtered and not ((bpm_min is None or track.bpm >= bpm_min) and
+                                             (bpm_max is None or track.bpm <= bpm_max)):
+                        continue
+                    row.append(track)
+
+            energy_sign = -1 if high_energy_first else 1
+            row.sort(key=lambda t: (energy_sign * t.energy_level, t.bpm or 0.0, t.filepath))
+            results.extend(row)
+
+            if limit is not None and len(results) >= limit:
+                return results[:limit]
+
+        return results
+
+    def _energy_bin(self, energy: float) -> int:
+        return int(energy // self.ENERGY_BIN_WIDTH)
+
+    def _bpm_bin(self, bpm: float) -> int:
+        return int(bpm // self.BPM_BIN_WIDTH)
 
 @dataclass
 class EnergyProgression:
@@ -84,9 +322,11 @@ class IntelligentQueueSystem:
         self.ai_client = OpenRouterClient()
 
         # Queue management
-        self.planned_queue = PriorityQueue()
+        self.planned_queue = IndexedTrackHeap()
         self.emergency_tracks: List[QueuedTrack] = []
         self.backup_tracks: List[QueuedTrack] = []
+        self.track_index = EnergyBpmIndex()
+        self.track_index_built = False
 
         # Performance tracking
         self.current_track: Optional[TrackInfo] = None
@@ -99,12 +339,31 @@ class IntelligentQueueSystem:
         self.emergency_pool_size = 10
         self.backup_pool_size = 20
         self.recompute_interval = 30.0  # Seconds between queue recomputation
+        self.locked_positions = 1  # Planned positions never invalidated (next track stays ready)
+        self.replan_energy_tolerance = 1.0  # Target energy drift that invalidates a position
+        self.candidate_energy_tolerances = (1.0, 2.0, 3.0)  # Energy windows tried when planning a position
+
+        # Incremental planner state
+        self.planning_context: Optional[DJContext] = None
+        self.plan_tail_track: Optional[TrackInfo] = None  # Track the next position is planned from
+        self.last_dispatched_track: Optional[TrackInfo] = None
+        self.plan_generation = 0  # Bumped on invalidation to discard stale planner results
+        self.plan_sequence = 0
+        self.crowd_energy_bias = 0.0
+        self.queue_snapshot: Tuple[QueuedTrack, ...] = ()
+        self._replan_event = threading.Event()
+        self._pending_analysis_upgrades: List[TrackInfo] = []
 
         # Threading
         self.is_running = False
         self.queue_thread: Optional[threading.Thread] = None
         self.lock = threading.RLock()
 
+        # Keep the energy/BPM index in sync with scanner inserts, updates and deletes
+        add_change_listener = getattr(music_library, 'add_change_listener', None)
+        if add_change_listener:
+            add_change_listener(self.on_library_changed)
+
         logger.info("🎵 Intelligent Queue System initialized")
 
     def start_session(self, context: DJContext, initial_track: TrackInfo):
@@ -115,24 +374,32 @@ class IntelligentQueueSystem:
             self.current_track = initial_track
             self.session_start_time = time.time()
             self.energy_progression = self._create_energy_progression(context)
+            self.planning_context = context
+            self.plan_tail_track = initial_track
+            self.last_dispatched_track = initial_track
+            self.plan_generation += 1
+            self.crowd_energy_bias = 0.0
 
             # Clear existing queues
-            while not self.planned_queue.empty():
-                self.planned_queue.get()
+            self.planned_queue.clear()
             self.emergency_tracks.clear()
             self.backup_tracks.clear()
 
             # Populate initial queues
+            if not self.track_index_built:
+                self.rebuild_track_index()
             self._populate_emergency_tracks(context)
             self._populate_backup_tracks(context)
             self._compute_initial_queue(context)
 
-            # Start background thread
+            # Start background planner
             self.is_running = True
-            self.queue_thread = threading.Thread(target=self._queue_management_loop, daemon=True)
-            self.queue_thread.start()
+            if not (self.queue_thread and self.queue_thread.is_alive()):
+                self.queue_thread = threading.Thread(target=self._queue_management_loop, daemon=True)
+                self.queue_thread.start()
+            self._replan_event.set()
 
-            logger.info(f"✅ Queue session started with {self.planned_queue.qsize()} planned tracks")
+            logger.info(f"✅ Queue session started with {len(self.planned_queue)} planned tracks")
 
     def get_next_track(self, context: DJContext, urgent: bool = False) -> Optional[QueuedTrack]:
         """Get the next track from the intelligent queue"""
@@ -146,7 +413,9 @@ class IntelligentQueueSystem:
 
             # Normal operation - get from planned queue
             if not self.planned_queue.empty():
-                next_track = self.planned_queue.get()
+                next_track = self.planned_queue.pop()
+                self.last_dispatched_track = next_track.track_info
+                self._publish_snapshot()
                 logger.info(f"🎵 Next track from queue: {next_track.track_info.title}")
 
                 # Trigger queue recomputation
@@ -178,39 +447,53 @@ class IntelligentQueueSystem:
             if recent_average < 3.0:  # Poor crowd response
                 logger.warning(f"📉 Poor crowd response detected: {recent_average:.1f}")
                 self._handle_poor_crowd_response()
+                crowd_energy_bias = 1.0
             elif recent_average > 8.0:  # Excellent response
                 logger.info(f"🎉 Excellent crowd response: {recent_average:.1f}")
                 self._handle_excellent_crowd_response()
+                crowd_energy_bias = 0.5
+            else:
+                crowd_energy_bias = 0.0
 
-    def get_queue_preview(self) -> List[Dict]:
-        """Get a preview of the current queue for display"""
+            if crowd_energy_bias != self.crowd_energy_bias:
+                self.crowd_energy_bias = crowd_energy_bias
+                self._invalidate_affected_suffix()
+
+            self._publish_snapshot()
+
+    def update_energy_level(self, energy_level: float):
+        """Update the current floor energy and replan the affected queue suffix"""
         with self.lock:
-            preview = []
-            temp_items = []
-
-            # Extract all items from priority queue
-            while not self.planned_queue.empty():
-                temp_items.append(self.planned_queue.get())
-
-            # Sort by priority and position
-            temp_items.sort(key=lambda x: (x.priority, x.queue_position))
-
-            # Create preview and restore queue
-            for i, track in enumerate(temp_items):
-                preview.append({
-                    'position': i + 1,
-                    'title': track.track_info.title,
-                    'artist': track.track_info.artist,
-                    'bpm': track.track_info.bpm,
-                    'energy': track.track_info.energy_level,
-                    'key': track.track_info.key,
-                    'priority': track.priority.name,
-                    'direction': track.energy_direction.value,
-                    'compatibility': track.compatibility_score.total_score if track.compatibility_score else 0.0
-                })
-                self.planned_queue.put(track)
-
-            return preview
+            self.energy_progression.current_energy = energy_level
+            if self.planning_context:
+                self.planning_context.energy_level = energy_level
+            self._invalidate_affected_suffix()
+            self._publish_snapshot()
+
+    def get_queue_snapshot(self) -> Tuple[QueuedTrack, ...]:
+        """Latest published queue in play order (lock-free, read-only)"""
+        return self.queue_snapshot
+
+    def get_queue_preview(self, limit: Optional[int] = None) -> List[Dict]:
+        """Get a preview of the current queue for display"""
+        # Read the published snapshot - the live queue is never touched
+        tracks = self.queue_snapshot if limit is None else self.queue_snapshot[:limit]
+
+        preview = []
+        for i, track in enumerate(tracks):
+            preview.append({
+                'position': i + 1,
+                'title': track.track_info.title,
+                'artist': track.track_info.artist,
+                'bpm': track.track_info.bpm,
+                'energy': track.track_info.energy_level,
+                'key': track.track_info.key,
+                'priority': track.priority.name,
+                'direction': track.energy_direction.value,
+                'compatibility': track.compatibility_score.total_score if track.compatibility_score else 0.0
+            })
+
+        return preview
 
     def _create_energy_progression(self, context: DJContext) -> EnergyProgression:
         """Create energy curve based on venue and event type"""
@@ -252,14 +535,13 @@ class IntelligentQueueSystem:
         ]
 
         for criteria in emergency_criteria:
-            tracks = self.music_library.get_tracks_by_energy_range(
-                criteria['energy_min'], criteria['energy_max']
+            # Highest energy first, then lowest BPM - straight from the index
+            tracks = self.track_index.query(
+                criteria['energy_min'], criteria['energy_max'],
+                limit=criteria['count'], high_energy_first=True
             )
 
-            # Sort by popularity/energy and take best ones
-            tracks.sort(key=lambda t: (t.energy_level, -t.bpm), reverse=True)
-
-            for track in tracks[:criteria['count']]:
+            for track in tracks:
                 emergency_track = QueuedTrack(
                     track_info=track,
                     priority=QueuePriority.EMERGENCY,
@@ -275,20 +557,12 @@ class IntelligentQueueSystem:
         """Populate backup tracks for various scenarios"""
         logger.info("🔄 Populating backup track pool...")
 
-        # Get diverse selection of tracks
-        all_tracks = self.music_library.get_all_tracks()
-
-        # Filter and diversify
-        backup_candidates = []
-        for track in all_tracks:
-            if (track.bpm and 120 <= track.bpm <= 140 and
-                track.energy_level and 4.0 <= track.energy_level <= 8.0):
-                backup_candidates.append(track)
-
-        # Sort by compatibility and diversity
-        backup_candidates.sort(key=lambda t: (t.energy_level, t.bpm))
+        # Mid energy, mainstream BPM - ordered by energy then BPM
+        backup_candidates = self.track_index.query(
+            4.0, 8.0, bpm_min=120, bpm_max=140, limit=self.backup_pool_size
+        )
 
-        for track in backup_candidates[:self.backup_pool_size]:
+        for track in backup_candidates:
             backup_track = QueuedTrack(
                 track_info=track,
                 priority=QueuePriority.BACKGROUND,
@@ -299,58 +573,186 @@ class IntelligentQueueSystem:
 
         logger.info(f"✅ {len(self.backup_tracks)} backup tracks ready")
 
+    def rebuild_track_index(self):
+        """Rebuild the energy x BPM index from the full library"""
+        with self.lock:
+            self.track_index.rebuild(self.music_library.get_all_tracks())
+            self.track_index_built = True
+            logger.info(f"🗂️ Energy/BPM index built with {len(self.track_index)} tracks")
+
+    def on_library_changed(self, added: Optional[List[TrackInfo]] = None,
+                           removed: Optional[List[str]] = None):
+        """Apply library changes (added/updated tracks, removed track ids) to the index"""
+        with self.lock:
+            if not self.track_index_built:
+                return  # Built in full on next session start
+
+            for track_id in removed or []:
+                self.track_index.remove_track(track_id)
+            for track in added or []:
+                self.track_index.add_track(track)
+
     def _compute_initial_queue(self, context: DJContext):
-        """Compute the initial intelligent queue"""
+        """Compute the first queue position; the planner extends the rest off-thread"""
         logger.info("🧠 Computing initial intelligent queue...")
 
         if not self.current_track:
             logger.error("❌ No current track set for queue computation")
             return
 
-        # Calculate planned progression
-        for i in range(self.queue_size):
-            target_energy = self._calculate_target_energy(i + 1, context)
+        # Only the next track is needed right away
+        self._extend_queue(context)
+
+        logger.info(f"✅ Initial queue computed with {len(self.planned_queue)} tracks")
+
+    def _extend_queue(self, context: DJContext) -> bool:
+        """Plan one more queue position after the current plan tail"""
+        with self.lock:
+            if not self.plan_tail_track:
+                return False
+            tail_track = self.plan_tail_track
+            generation = self.plan_generation
+            position = len(self.planned_queue) + 1
+            target_energy = self._calculate_target_energy(position, context)
             energy_direction = self._determine_energy_direction(target_energy, context)
+            candidates = self._energy_candidates(target_energy, tail_track)
 
-            # Use enhanced track selector
-            next_track = self.track_selector.select_next_track(
-                current_track=self.current_track,
-                context=context,
+        if not candidates:
+            logger.warning(f"⚠️ No unplanned tracks near energy {target_energy:.1f}")
+            return False
+
+        # Expensive selection runs without holding the queue lock
+        next_track = self.track_selector.select_next_track(
+            current_track=tail_track,
+            context=context,
+            candidates=candidates
+        )
+
+        if not next_track:
+            return False
+
+        compatibility = self.track_selector._calculate_comprehensive_compatibility(
+            tail_track, next_track, context
+        )
+
+        with self.lock:
+            # Plan was invalidated while selecting - discard the stale result
+            if generation != self.plan_generation:
+                return False
+
+            # Planned concurrently (e.g. by a replan) - the next pass excludes it
+            if next_track.filepath in self.planned_queue:
+                return False
+
+            queued_track = QueuedTrack(
+                track_info=next_track,
+                priority=QueuePriority.PLANNED,
+                energy_direction=energy_direction,
+                compatibility_score=compatibility,
+                queue_position=self.plan_sequence,
+                crowd_response_prediction=compatibility.confidence,
                 target_energy=target_energy
             )
+            self.plan_sequence += 1
+
+            self.planned_queue.push(queued_track)
+            self.plan_tail_track = next_track  # Update for next iteration
+            self._pending_analysis_upgrades.append(next_track)
+            self._publish_snapshot()
+
+        logger.info(f"  📍 Queue position {position}: {next_track.title} (energy: {target_energy:.1f})")
+        return True
+
+    def _energy_candidates(self, target_energy: float, tail_track: TrackInfo) -> List[TrackInfo]:
+        """Unplanned tracks near the target energy, widening the window if needed (lock held)"""
+        if not self.track_index_built:
+            self.rebuild_track_index()
+
+        for tolerance in self.candidate_energy_tolerances:
+            candidates = [
+                track for track in self.track_index.query(target_energy - tolerance,
+                                                          target_energy + tolerance)
+                if track.filepath != tail_track.filepath and track.filepath not in self.planned_queue
+            ]
+            if candidates:
+                return candidates
+        return []
+
+    def _upgrade_queued_analysis(self):
+        """Upgrade newly queued tracks from bulk to full audio analysis"""
+        with self.lock:
+            tracks, self._pending_analysis_upgrades = self._pending_analysis_upgrades, []
 
-            if next_track and next_track.track:
-                compatibility = self.track_selector._calculate_comprehensive_compatibility(
-                    self.current_track, next_track.track, context
-                )
+        ensure_full_analysis = getattr(self.music_library, 'ensure_full_analysis', None)
+        if not ensure_full_analysis:
+            return
 
-                queued_track = QueuedTrack(
-                    track_info=next_track.track,
-                    priority=QueuePriority.PLANNED,
-                    energy_direction=energy_direction,
-                    compatibility_score=compatibility,
-                    queue_position=i,
-                    crowd_response_prediction=next_track.confidence
-                )
+        for track in tracks:
+            if getattr(track, 'analysis_profile', None) != 'full':
+                ensure_full_analysis(track)
+
+    def _planned_in_order(self) -> List[QueuedTrack]:
+        """Planned tracks in the order they were chained by the planner"""
+        return sorted(
+            (t for t in self.planned_queue.items() if t.target_energy is not None),
+            key=lambda t: t.queue_position
+        )
+
+    def _invalidate_affected_suffix(self):
+        """Drop planned positions whose energy target no longer holds"""
+        if not self.planning_context:
+            return
+
+        planned = self._planned_in_order()
+        invalidate_from = None
+        for index, track in enumerate(planned):
+            if index < self.locked_positions:
+                continue
+            new_target = self._calculate_target_energy(index + 1, self.planning_context)
+            if abs(new_target - track.target_energy) > self.replan_energy_tolerance:
+                invalidate_from = index
+                break
+
+        if invalidate_from is None:
+            return
+
+        # Later positions were chained from the dropped ones, so they go too
+        for track in planned[invalidate_from:]:
+            self.planned_queue.remove(track.track_id)
 
-                self.planned_queue.put(queued_track)
-                self.current_track = next_track.track  # Update for next iteration
+        kept = planned[:invalidate_from]
+        self.plan_tail_track = kept[-1].track_info if kept else self.last_dispatched_track
+        self.plan_generation += 1
+        self._replan_event.set()
 
-                logger.info(f"  📍 Queue position {i+1}: {next_track.track.title} (energy: {target_energy:.1f})")
+        logger.info(f"♻️ Replanning {len(planned) - invalidate_from} queue positions from position {invalidate_from + 1}")
 
-        logger.info(f"✅ Initial queue computed with {self.planned_queue.qsize()} tracks")
+    def _publish_snapshot(self):
+        """Publish an immutable, ordered copy of the queue for readers"""
+        self.queue_snapshot = tuple(self.planned_queue.peek_k(len(self.planned_queue)))
 
     def _queue_management_loop(self):
-        """Background thread for continuous queue management"""
+        """Background planner: keeps the queue filled one position at a time"""
         logger.info("🔄 Queue management loop started")
 
         while self.is_running:
             try:
-                time.sleep(self.recompute_interval)
+                self._replan_event.wait(self.recompute_interval)
+                self._replan_event.clear()
+
+                failures = 0
+                while self.is_running and failures < 3:
+                    with self.lock:
+                        context = self.planning_context
+                        queue_full = len(self.planned_queue) >= self.queue_size
+
+                    if queue_full or not context:
+                        break
 
-                if self.planned_queue.qsize() < 2:  # Keep queue filled
-                    logger.info("📈 Queue low, recomputing...")
-                    # Trigger recomputation logic here
+                    # Selection failed, duplicated or was invalidated - retry a few times
+                    failures = 0 if self._extend_queue(context) else failures + 1
+
+                self._upgrade_queued_analysis()
 
             except Exception as e:
                 logger.error(f"❌ Queue management error: {e}")
@@ -364,19 +766,24 @@ class IntelligentQueueSystem:
         session_minutes = (time.time() - self.session_start_time) / 60.0
 
         # Find target from energy progression curve
+        target_energy = None
         for i, (time_point, energy) in enumerate(self.energy_progression.target_curve):
             if session_minutes <= time_point:
                 if i == 0:
-                    return energy
+                    target_energy = energy
+                else:
+                    # Interpolate between points
+                    prev_time, prev_energy = self.energy_progression.target_curve[i-1]
+                    ratio = (session_minutes - prev_time) / (time_point - prev_time)
+                    target_energy = prev_energy + (energy - prev_energy) * ratio
+                break
 
-                # Interpolate between points
-                prev_time, prev_energy = self.energy_progression.target_curve[i-1]
-                ratio = (session_minutes - prev_time) / (time_point - prev_time)
-                return prev_energy + (energy - prev_energy) * ratio
+        if target_energy is None:
+            # Default to current energy with slight variation
+            target_energy = self.energy_progression.current_energy + (position * 0.5)
 
-        # Default to current energy with slight variation
-        base_energy = self.energy_progression.current_energy
-        return max(1.0, min(10.0, base_energy + (position * 0.5)))
+        # Crowd feedback shifts the whole plan
+        return max(1.0, min(10.0, target_energy + self.crowd_energy_bias))
 
     def _determine_energy_direction(self, target_energy: float, context: DJContext) -> EnergyDirection:
         """Determine energy direction based on target and context"""
@@ -425,25 +832,20 @@ class IntelligentQueueSystem:
         """Reorganize queue for poor crowd response"""
         logger.warning("📉 Reorganizing queue for crowd recovery...")
 
-        # Move high-energy emergency tracks to front
-        priority_boost_tracks = []
-        while not self.planned_queue.empty():
-            track = self.planned_queue.get()
-            if track.track_info.energy_level >= 8.0:
-                track.priority = QueuePriority.CRITICAL
-            priority_boost_tracks.append(track)
-
-        # Re-add with updated priorities
-        for track in priority_boost_tracks:
-            self.planned_queue.put(track)
+        # Move high-energy tracks to front, reordering in place
+        for track in self.planned_queue.items():
+            if track.track_info.energy_level >= 8.0 and track.priority > QueuePriority.CRITICAL:
+                self.planned_queue.update_priority(track.track_id, QueuePriority.CRITICAL)
 
     def _handle_excellent_crowd_response(self):
         """Capitalize on excellent crowd response"""
         logger.info("🎉 Capitalizing on excellent crowd response...")
 
-        # Consider adding peak moment tracks
-        # Implementation would involve queue reordering
-        pass
+        # Keep the momentum: push cool-down tracks behind the rest of the plan
+        for track in self.planned_queue.items():
+            if (track.energy_direction == EnergyDirection.COOL_DOWN and
+                    track.priority == QueuePriority.PLANNED):
+                self.planned_queue.update_priority(track.track_id, QueuePriority.OPTIONAL)
 
     def _calculate_venue_peak_time(self, context: DJContext) -> Optional[float]:
         """Calculate expected peak time for venue type"""
@@ -463,13 +865,14 @@ class IntelligentQueueSystem:
 
     def _trigger_queue_recomputation(self, context: DJContext):
         """Trigger intelligent queue recomputation"""
-        # This would be implemented to maintain optimal queue
-        pass
+        self.planning_context = context
+        self._replan_event.set()
 
     def stop(self):
         """Stop the queue management system"""
         logger.info("🛑 Stopping intelligent queue system...")
         self.is_running = False
+        self._replan_event.set()
         if self.queue_thread and self.queue_thread.is_alive():
             self.queue_thread.join(timeout=5.0)
         logger.info("✅ Queue system stopped")
@@ -5,13 +5,14 @@ Scansione e gestione intelligente della libreria musicale
 """
 
 import os
+import re
 import json
 import sqlite3
 import time
 import asyncio
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Callable
 from dataclasses import dataclass, asdict
 import hashlib
 
@@ -24,13 +25,36 @@ except ImportError:
     MUTAGEN_AVAILABLE = False
     print("⚠️ mutagen non disponibile. Installa con: pip install mutagen")
 
-from config import DJConfig
+from config import DJConfig, VENUE_TYPES
 
 # Import dependency manager for advanced analysis
 from core.dependency_manager import get_dependency_manager, is_audio_analysis_available
+from core.audio_feature_store import AudioFeatureStore
 
 logger = logging.getLogger(__name__)
 
+# Colonne del pool di sessione (righe compatte, niente blob JSON di analisi)
+SESSION_POOL_COLUMNS = ('filepath', 'filename', 'title', 'artist', 'genre', 'bpm', 'key', 'energy', 'duration')
+
+_GENRE_SEPARATORS = re.compile(r'[/,;|&]+')
+
+def normalize_genre_tokens(genre: Optional[str], max_words: int = 3) -> List[str]:
+    """
+    Token di genere normalizzati per la tabella track_genres: per ogni genere
+    (es. "Deep House / Tech-House") tutte le sequenze di parole fino a
+    max_words ("deep", "house", "deep house", "tech house", ...)
+    """
+    if not genre:
+        return []
+
+    tokens = set()
+    for name in _GENRE_SEPARATORS.split(genre.lower()):
+        words = name.replace('-', ' ').split()
+        for size in range(1, min(max_words, len(words)) + 1):
+            for start in range(len(words) - size + 1):
+                tokens.add(' '.join(words[start:start + size]))
+    return sorted(tokens)
+
 @dataclass
 class TrackInfo:
     """Informazioni complete di un brano"""
@@ -58,6 +82,8 @@ class TrackInfo:
 
     # Metadati calcolati
     file_hash: Optional[str] = None
+    content_hash: Optional[str] = None  # Hash del contenuto audio (feature store)
+    analysis_profile: Optional[str] = None  # 'bulk' o 'full'
     analyzed: bool = False
     compatible_bpm_range: Optional[Tuple[float, float]] = None
 
@@ -114,6 +140,17 @@ class MusicLibraryScanner:
         self.config = config
         self.db_path = Path(config.music_library_path).parent / ".dj_library.db"
         self.cache_file = Path(config.music_library_path).parent / ".dj_cache.json"
+        self.feature_store = AudioFeatureStore(Path(config.music_library_path).parent / ".dj_features")
+
+        # Profilo analisi: 'bulk' (veloce) per scansioni grandi, 'full' per track in coda
+        self.bulk_profile_threshold = 20  # File da analizzare oltre cui si usa 'bulk'
+
+        # Pool di sessione per profilo venue, invalidati a ogni modifica della libreria
+        self._library_version = 0
+        self._session_pool_cache: Dict[Tuple, Tuple[int, List[TrackInfo]]] = {}
+
+        # Listener notificati a ogni insert/update (track) e delete (filepath)
+        self.change_listeners: List[Callable[[List[TrackInfo], List[str]], None]] = []
 
         # Statistiche
         self.stats = {
@@ -123,6 +160,7 @@ class MusicLibraryScanner:
             'new_files': 0,
             'updated_files': 0,
             'advanced_analyzed': 0,
+            'feature_cache_hits': 0,
             'scan_time': 0.0
         }
 
@@ -169,10 +207,18 @@ class MusicLibraryScanner:
                         outro_duration REAL,
                         tempo_stability REAL,
                         spectral_features TEXT,
-                        advanced_analyzed BOOLEAN DEFAULT FALSE
+                        advanced_analyzed BOOLEAN DEFAULT FALSE,
+                        content_hash TEXT,
+                        analysis_profile TEXT
                     )
                 ''')
 
+                # Migrazione database esistenti
+                columns = {row[1] for row in conn.execute('PRAGMA table_info(tracks)')}
+                for column in ('content_hash', 'analysis_profile'):
+                    if column not in columns:
+                        conn.execute(f'ALTER TABLE tracks ADD COLUMN {column} TEXT')
+
                 # Indici per performance
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_genre ON tracks(genre)')
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_bpm ON tracks(bpm)')
@@ -180,6 +226,22 @@ class MusicLibraryScanner:
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_energy ON tracks(energy)')
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_artist ON tracks(artist)')
 
+                # Generi normalizzati: lookup per genere via chiave primaria (niente LIKE '%x%')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS track_genres (
+                        genre TEXT NOT NULL,
+                        filepath TEXT NOT NULL,
+                        PRIMARY KEY (genre, filepath)
+                    ) WITHOUT ROWID
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_track_genres_filepath ON track_genres(filepath)')
+
+                # Backfill per database creati prima della tabella generi
+                has_genres = conn.execute('SELECT 1 FROM track_genres LIMIT 1').fetchone()
+                if not has_genres:
+                    for filepath, genre in conn.execute('SELECT filepath, genre FROM tracks').fetchall():
+                        self._index_genres(conn, filepath, genre)
+
                 conn.commit()
         except Exception as e:
             logger.error(f"Errore inizializzazione database: {e}")
@@ -194,8 +256,13 @@ class MusicLibraryScanner:
         except:
             return ""
 
-    def _enhance_track_with_audio_features(self, track: TrackInfo, audio_features: Any):
-        """Enhance track with advanced audio analysis features"""
+    def _enhance_track_with_audio_features(self, track: TrackInfo, audio_features: Any,
+                                           overwrite: bool = False):
+        """Enhance track with advanced audio analysis features
+
+        Con overwrite=True (upgrade bulk -> full) bpm, durata ed energia
+        dell'analisi sostituiscono le stime già presenti sul track.
+        """
         try:
             # Store the complete audio features object (for future use)
             track.audio_features = audio_features
@@ -204,10 +271,10 @@ class MusicLibraryScanner:
             if audio_features.key:
                 track.harmonic_key = audio_features.key
 
-            if audio_features.tempo and not track.bpm:
+            if audio_features.tempo and (overwrite or not track.bpm):
                 track.bpm = audio_features.tempo
 
-            if audio_features.duration and not track.duration:
+            if audio_features.duration and (overwrite or not track.duration):
                 track.duration = audio_features.duration
 
             # Advanced features
@@ -222,8 +289,8 @@ class MusicLibraryScanner:
             if audio_features.optimal_mix_points:
                 track.optimal_mix_points = audio_features.optimal_mix_points
 
-            # Calculate enhanced energy level if not present
-            if not track.energy and audio_features.energy_level:
+            # Calculate enhanced energy level if not present (or on upgrade)
+            if audio_features.energy_level and (overwrite or not track.energy):
                 track.energy = int(round(audio_features.energy_level))
 
             # Store spectral features
@@ -356,11 +423,16 @@ class MusicLibraryScanner:
         self.stats['total_files'] = len(music_files)
         logger.info(f"📁 Trovati {len(music_files)} file musicali")
 
+        # Scelta profilo: ingestion massiva veloce, upgrade 'full' quando entrano in coda
+        pending_files = sum(1 for f in music_files if str(f) not in existing_files)
+        profile = 'bulk' if pending_files > self.bulk_profile_threshold else 'full'
+        logger.info(f"🎚️ Profilo analisi: {profile} ({pending_files} file nuovi)")
+
         # Analizza file in batch
         batch_size = 50
         for i in range(0, len(music_files), batch_size):
             batch = music_files[i:i + batch_size]
-            await self._process_batch(batch, existing_files, force_rescan)
+            await self._process_batch(batch, existing_files, force_rescan, profile)
 
             # Log progresso
             processed = min(i + batch_size, len(music_files))
@@ -374,7 +446,8 @@ class MusicLibraryScanner:
 
         return self.stats
 
-    async def _process_batch(self, batch: List[Path], existing_files: Dict[str, Dict], force_rescan: bool):
+    async def _process_batch(self, batch: List[Path], existing_files: Dict[str, Dict], force_rescan: bool,
+                             profile: str = 'full'):
         """Processa batch di file"""
         for filepath in batch:
             try:
@@ -395,7 +468,7 @@ class MusicLibraryScanner:
                 # Analisi audio avanzata (se disponibile)
                 if self.audio_analyzer and is_audio_analysis_available():
                     try:
-                        audio_features = self.audio_analyzer.analyze_track_structure(str(filepath))
+                        audio_features = self._get_or_analyze_features(track, filepath, profile)
                         if audio_features:
                             self._enhance_track_with_audio_features(track, audio_features)
                             self.stats['advanced_analyzed'] += 1
@@ -419,6 +492,78 @@ class MusicLibraryScanner:
             except Exception as e:
                 logger.error(f"Errore processamento {filepath}: {e}")
 
+    def _analysis_version(self, profile: str = 'full') -> str:
+        """Versione dell'analizzatore usata come parte della chiave cache"""
+        if hasattr(self.audio_analyzer, 'get_analysis_version'):
+            return self.audio_analyzer.get_analysis_version(profile)
+        return f"{getattr(self.audio_analyzer, 'ANALYZER_VERSION', 'unknown')}-{profile}"
+
+    def _get_or_analyze_features(self, track: TrackInfo, filepath: Path, profile: str = 'full') -> Any:
+        """AudioFeatures dal feature store, analizzando l'audio solo se mancante"""
+        version = self._analysis_version(profile)
+        if not track.content_hash:
+            track.content_hash = self.feature_store.compute_content_hash(filepath)
+
+        audio_features = self.feature_store.get(track.content_hash, version)
+        if audio_features is not None:
+            self.stats['feature_cache_hits'] += 1
+            track.analysis_profile = profile
+            return audio_features
+
+        audio_features = self.audio_analyzer.analyze_track_structure(str(filepath), profile=profile)
+        if audio_features:
+            self.feature_store.put(track.content_hash, version, audio_features)
+            track.analysis_profile = profile
+        return audio_features
+
+    def ensure_full_analysis(self, track: TrackInfo) -> Any:
+        """
+        Upgrade lazy di un track analizzato in modalità 'bulk' al profilo 'full'.
+        Da chiamare quando il track entra in coda (fuori dal percorso critico).
+        """
+        if not self.audio_analyzer or not is_audio_analysis_available():
+            return None
+
+        try:
+            if track.analysis_profile == 'full' and track.content_hash:
+                return self.feature_store.get(track.content_hash, self._analysis_version('full'))
+
+            audio_features = self._get_or_analyze_features(track, Path(track.filepath), 'full')
+            if audio_features:
+                self._enhance_track_with_audio_features(track, audio_features, overwrite=True)
+                self._update_track(track)
+                logger.info(f"⬆️ Analisi completa per {track.filename}")
+            return audio_features
+
+        except Exception as e:
+            logger.warning(f"Errore upgrade analisi per {track.filepath}: {e}")
+            return None
+
+    def get_cached_audio_features(self, filepath: str, fields: Optional[List[str]] = None) -> Any:
+        """
+        Feature di analisi salvate per un track, senza librosa.
+
+        Con fields=None restituisce AudioFeatures completo, altrimenti un dict
+        con i soli array richiesti (es. ['beat_times']) caricati in mmap.
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                row = conn.execute(
+                    'SELECT content_hash, analysis_profile FROM tracks WHERE filepath = ?', (filepath,)
+                ).fetchone()
+
+            if not row or not row[0]:
+                return None
+
+            version = self._analysis_version(row[1] or 'full')
+            if fields is None:
+                return self.feature_store.get(row[0], version)
+            return self.feature_store.load_arrays(row[0], version, fields)
+
+        except Exception as e:
+            logger.error(f"Errore lettura feature cache per {filepath}: {e}")
+            return None
+
     def _get_existing_files(self) -> Dict[str, Dict]:
         """Ottieni file esistenti dal database"""
         try:
@@ -442,8 +587,8 @@ class MusicLibraryScanner:
                         file_hash, analyzed, created_at, updated_at,
                         harmonic_key, structural_segments, optimal_mix_points,
                         intro_duration, outro_duration, tempo_stability,
-                        spectral_features, advanced_analyzed
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        spectral_features, advanced_analyzed, content_hash, analysis_profile
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     track.filepath, track.filename, track.title, track.artist,
                     track.album, track.genre, track.year, track.bpm, track.key,
@@ -456,9 +601,13 @@ class MusicLibraryScanner:
                     json.dumps(track.optimal_mix_points) if track.optimal_mix_points else None,
                     track.intro_duration, track.outro_duration, track.tempo_stability,
                     json.dumps(track.spectral_features) if track.spectral_features else None,
-                    bool(track.audio_features)
+                    bool(track.audio_features),
+                    track.content_hash, track.analysis_profile
                 ))
+                self._index_genres(conn, track.filepath, track.genre)
                 conn.commit()
+            self._library_version += 1
+            self._notify_library_changed(added=[track])
         except Exception as e:
             logger.error(f"Errore inserimento track: {e}")
 
@@ -474,7 +623,7 @@ class MusicLibraryScanner:
                         file_hash=?, analyzed=?, updated_at=?,
                         harmonic_key=?, structural_segments=?, optimal_mix_points=?,
                         intro_duration=?, outro_duration=?, tempo_stability=?,
-                        spectral_features=?, advanced_analyzed=?
+                        spectral_features=?, advanced_analyzed=?, content_hash=?, analysis_profile=?
                     WHERE filepath=?
                 ''', (
                     track.filename, track.title, track.artist, track.album,
@@ -489,12 +638,25 @@ class MusicLibraryScanner:
                     track.intro_duration, track.outro_duration, track.tempo_stability,
                     json.dumps(track.spectral_features) if track.spectral_features else None,
                     bool(track.audio_features),
+                    track.content_hash, track.analysis_profile,
                     track.filepath
                 ))
+                self._index_genres(conn, track.filepath, track.genre)
                 conn.commit()
+            self._library_version += 1
+            self._notify_library_changed(added=[track])
         except Exception as e:
             logger.error(f"Errore aggiornamento track: {e}")
 
+    @staticmethod
+    def _index_genres(conn: sqlite3.Connection, filepath: str, genre: Optional[str]):
+        """Riscrivi i token di genere di un track"""
+        conn.execute('DELETE FROM track_genres WHERE filepath = ?', (filepath,))
+        conn.executemany(
+            'INSERT OR IGNORE INTO track_genres (genre, filepath) VALUES (?, ?)',
+            [(token, filepath) for token in normalize_genre_tokens(genre)]
+        )
+
     def _cleanup_deleted_files(self, current_files: List[Path]):
         """Rimuovi dal database file eliminati"""
         try:
@@ -507,11 +669,33 @@ class MusicLibraryScanner:
                 if deleted_paths:
                     placeholders = ','.join('?' * len(deleted_paths))
                     conn.execute(f'DELETE FROM tracks WHERE filepath IN ({placeholders})', list(deleted_paths))
+                    conn.execute(f'DELETE FROM track_genres WHERE filepath IN ({placeholders})', list(deleted_paths))
                     conn.commit()
+                    self._library_version += 1
                     logger.info(f"🗑️ Rimossi {len(deleted_paths)} file eliminati dal database")
+            if deleted_paths:
+                self._notify_library_changed(removed=list(deleted_paths))
         except Exception as e:
             logger.error(f"Errore cleanup database: {e}")
 
+    def add_change_listener(self, listener: Callable[[List[TrackInfo], List[str]], None]):
+        """Registra un listener listener(added, removed) per le modifiche alla libreria"""
+        if listener not in self.change_listeners:
+            self.change_listeners.append(listener)
+
+    def remove_change_listener(self, listener: Callable[[List[TrackInfo], List[str]], None]):
+        """Rimuovi un listener di modifiche"""
+        if listener in self.change_listeners:
+            self.change_listeners.remove(listener)
+
+    def _notify_library_changed(self, added: Optional[List[TrackInfo]] = None,
+                                removed: Optional[List[str]] = None):
+        for listener in list(self.change_listeners):
+            try:
+                listener(added or [], removed or [])
+            except Exception as e:
+                logger.warning(f"⚠️ Library change listener error: {e}")
+
     def search_tracks(self,
                      genre: Optional[str] = None,
                      bpm_range: Optional[Tuple[float, float]] = None,
@@ -552,6 +736,62 @@ class MusicLibraryScanner:
             logger.error(f"Errore ricerca tracks: {e}")
             return []
 
+    def build_session_pool(self, venue_type: str, per_genre_limit: int = 50,
+                           min_tracks: int = 20, fallback_limit: int = 100) -> List[TrackInfo]:
+        """
+        Pool di track per una sessione dal profilo VENUE_TYPES: tutti i generi
+        tipici + range BPM in una sola query indicizzata (track_genres), righe
+        compatte. Cache per profilo venue fino alla prossima modifica della libreria.
+        """
+        venue_info = VENUE_TYPES.get(venue_type, {})
+        # Stessa normalizzazione dei token di track_genres ("nu-disco" -> "nu disco")
+        genres = sorted({' '.join(genre.lower().replace('-', ' ').split())
+                         for genre in venue_info.get('typical_genres', [])})
+        bpm_range = tuple(venue_info.get('bpm_range', (120, 140)))
+
+        cache_key = (tuple(genres), bpm_range, per_genre_limit, min_tracks, fallback_limit)
+        cached = self._session_pool_cache.get(cache_key)
+        if cached and cached[0] == self._library_version:
+            return list(cached[1])
+
+        columns = ', '.join(f't.{column}' for column in SESSION_POOL_COLUMNS)
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                pool: List[TrackInfo] = []
+
+                if genres:
+                    placeholders = ','.join('?' * len(genres))
+                    cursor = conn.execute(f'''
+                        SELECT {columns}
+                        FROM tracks t
+                        WHERE t.filepath IN (
+                            SELECT filepath FROM track_genres WHERE genre IN ({placeholders})
+                        )
+                        AND t.bpm BETWEEN ? AND ?
+                        ORDER BY t.title
+                        LIMIT ?
+                    ''', [*genres, *bpm_range, per_genre_limit * len(genres)])
+                    pool = [TrackInfo(**dict(row)) for row in cursor]
+
+                # Libreria povera per questo venue: completa con track generici con BPM
+                if len(pool) < min_tracks:
+                    seen = {track.filepath for track in pool}
+                    cursor = conn.execute(f'''
+                        SELECT {columns} FROM tracks t
+                        WHERE t.bpm IS NOT NULL
+                        ORDER BY t.title
+                        LIMIT ?
+                    ''', (fallback_limit,))
+                    pool.extend(TrackInfo(**dict(row)) for row in cursor if row['filepath'] not in seen)
+
+            self._session_pool_cache[cache_key] = (self._library_version, pool)
+            return list(pool)
+
+        except Exception as e:
+            logger.error(f"Errore costruzione pool sessione: {e}")
+            return []
+
     def get_compatible_tracks(self, current_bpm: float, current_genre: str = None, limit: int = 20) -> List[TrackInfo]:
         """Ottieni track compatibili per mixing"""
         try:
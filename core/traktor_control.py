@@ -7,8 +7,9 @@ Controllo semplice e diretto di Traktor via MIDI con mappatura AI DJ
 import time
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+import itertools
+from typing import Dict, List, Optional, Any, Tuple, Callable
+from dataclasses import dataclass, field
 from enum import Enum
 import threading
 
@@ -57,9 +58,61 @@ class TraktorStatus:
     ai_enabled: bool = True
     last_update: float = 0.0
 
+class TrackedState(dict):
+    """Dict che notifica ogni modifica (usato per invalidare lo status snapshot)"""
+
+    def __init__(self, on_change: Callable[[], None], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._on_change = on_change
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._on_change()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._on_change()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._on_change()
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._on_change()
+        return value
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        value = super().setdefault(key, default)
+        self._on_change()
+        return value
+
+    def clear(self):
+        super().clear()
+        self._on_change()
+
+@dataclass
+class StatusSnapshot:
+    """
+    Vista immutabile (per convenzione) dello stato del controller.
+    Condivisa tra tutti i consumer: non modificare i dict restituiti.
+    """
+    version: int
+    created_at: float
+    comprehensive: Dict[str, Any]
+    mixing: Dict[str, Any]
+    hotcues: Dict[str, Any] = field(default_factory=dict)
+
 class TraktorController:
     """Controller semplificato per Traktor"""
 
+    # Attributi che fanno parte dello status snapshot
+    _SNAPSHOT_ATTRIBUTES = frozenset({
+        'connected', 'sync_enabled', 'last_state_verification', 'state_synchronizer'
+    })
+
     # Mappatura MIDI CC - VERIFIED WORKING MAPPINGS
     # Source: User discovery testing with test_cc_discovery.py + traktor-command-tester agent
     # Date: 2025-10-03
@@ -235,6 +288,13 @@ class TraktorController:
     }
 
     def __init__(self, config: DJConfig):
+        # Status snapshot versionato (ricostruito solo dopo modifiche)
+        self._status_version_counter = itertools.count(1)
+        self.status_version = 0
+        self._status_snapshot: Optional[StatusSnapshot] = None
+        self._status_snapshot_lock = threading.Lock()
+        self._hotcue_status_cache: Optional[Dict[str, Any]] = None
+
         self.config = config
         self.midi_out: Optional[rtmidi.MidiOut] = None
         self.midi_in: Optional[rtmidi.MidiIn] = None
@@ -245,6 +305,9 @@ class TraktorController:
         self.status_thread: Optional[threading.Thread] = None
         self.running = False
 
+        # Listener notificati a ogni feedback di status (chiamati dal thread MIDI)
+        self.status_listeners: List[Callable[[str, Any], None]] = []
+
         # Stato deck interno per tracking play/pause
         self.deck_states = {
             DeckID.A: {
@@ -254,7 +317,8 @@ class TraktorController:
                 'track_name': None,
                 'track_id': None,
                 'last_loaded_time': None,
-                'load_source_position': None
+                'load_source_position': None,
+                'load_count': 0  # Incrementato a ogni load inviato (verifica di un nuovo load)
             },
             DeckID.B: {
                 'playing': False,
@@ -263,7 +327,8 @@ class TraktorController:
                 'track_name': None,
                 'track_id': None,
                 'last_loaded_time': None,
-                'load_source_position': None
+                'load_source_position': None,
+                'load_count': 0  # Incrementato a ogni load inviato (verifica di un nuovo load)
             },
             DeckID.C: {
                 'playing': False,
@@ -272,7 +337,8 @@ class TraktorController:
                 'track_name': None,
                 'track_id': None,
                 'last_loaded_time': None,
-                'load_source_position': None
+                'load_source_position': None,
+                'load_count': 0  # Incrementato a ogni load inviato (verifica di un nuovo load)
             },
             DeckID.D: {
                 'playing': False,
@@ -281,7 +347,8 @@ class TraktorController:
                 'track_name': None,
                 'track_id': None,
                 'last_loaded_time': None,
-                'load_source_position': None
+                'load_source_position': None,
+                'load_count': 0  # Incrementato a ogni load inviato (verifica di un nuovo load)
             },
         }
 
@@ -315,6 +382,71 @@ class TraktorController:
         # Simulation Mode (se MIDI non disponibile)
         self.simulation_mode = False  # True = comandi simulati, False = MIDI reale
 
+        # Automazione transizioni (creata al primo uso)
+        self.automation_engine: Optional[Any] = None
+        self.last_sent_values: Dict[Tuple[int, int], int] = {}  # (channel, cc) -> ultimo valore inviato
+        self.last_mix_handle: Optional[Any] = None
+
+        # Ricezione di ogni campo di status (perf_counter) per ancorare le curve al beat
+        self.status_timestamps: Dict[str, float] = {}
+        self.beat_anchor_max_age = 2.0  # Feedback più vecchio non è affidabile per la fase
+
+        # Le modifiche a questi dict invalidano lo status snapshot
+        self.deck_states = {
+            deck: TrackedState(lambda deck=deck: self._on_deck_state_changed(deck), state)
+            for deck, state in self.deck_states.items()
+        }
+        self.browser_state = TrackedState(self.mark_status_dirty, self.browser_state)
+        self.stats = TrackedState(self.mark_status_dirty, self.stats)
+
+    @staticmethod
+    def to_midi_value(value: float) -> int:
+        """0.0-1.0 -> valore CC a 7 bit (quantizzazione unica per setter e automazione)"""
+        return min(127, max(0, int(round(value * 127))))
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in self._SNAPSHOT_ATTRIBUTES and '_status_version_counter' in self.__dict__:
+            self.mark_status_dirty()
+
+    # ==========================================
+    # STATUS SNAPSHOT
+    # ==========================================
+
+    def mark_status_dirty(self):
+        """Segnala una modifica di stato: il prossimo snapshot verrà ricostruito"""
+        self.status_version = next(self._status_version_counter)
+
+    def _on_deck_state_changed(self, deck: DeckID):
+        """Stato deck modificato: invalida snapshot e anticipa la verifica del deck"""
+        self.mark_status_dirty()
+        synchronizer = self.__dict__.get('state_synchronizer')
+        if synchronizer is not None and hasattr(synchronizer, 'note_deck_activity'):
+            synchronizer.note_deck_activity(deck)
+
+    def get_status_snapshot(self) -> StatusSnapshot:
+        """
+        Snapshot condiviso dello stato, ricostruito solo se status_version è cambiata.
+        I consumer in polling possono confrontare snapshot.version per rilevare cambiamenti.
+        """
+        snapshot = self._status_snapshot
+        if snapshot is not None and snapshot.version == self.status_version:
+            return snapshot
+
+        with self._status_snapshot_lock:
+            snapshot = self._status_snapshot
+            version = self.status_version
+            if snapshot is None or snapshot.version != version:
+                snapshot = StatusSnapshot(
+                    version=version,
+                    created_at=time.time(),
+                    comprehensive=self._build_comprehensive_status(version),
+                    mixing=self._build_mixing_status(),
+                    hotcues=self._get_hotcue_status_cache()
+                )
+                self._status_snapshot = snapshot
+            return snapshot
+
     def connect_with_gil_safety(self, output_only: bool = False, timeout: float = 5.0) -> bool:
         """
         Connetti a Traktor via IAC Driver con GIL-safe threading
@@ -509,13 +641,30 @@ class TraktorController:
                         setattr(self.status, status_key, value)
 
                     self.status.last_update = time.time()
-                    self.stats['status_received'] += 1
+                    self.status_timestamps[status_key] = time.perf_counter()
+                    self.stats['status_received'] += 1  # invalida lo snapshot
 
                     logger.debug(f"📥 Status: {status_key} = {value}")
 
+                    for listener in self.status_listeners:
+                        try:
+                            listener(status_key, getattr(self.status, status_key))
+                        except Exception as e:
+                            logger.warning(f"⚠️ Status listener error: {e}")
+
         except Exception as e:
             logger.error(f"❌ Errore callback status: {e}")
 
+    def add_status_listener(self, listener: Callable[[str, Any], None]):
+        """Registra un listener per i feedback di status (deve essere veloce e non bloccante)"""
+        if listener not in self.status_listeners:
+            self.status_listeners.append(listener)
+
+    def remove_status_listener(self, listener: Callable[[str, Any], None]):
+        """Rimuovi un listener di status"""
+        if listener in self.status_listeners:
+            self.status_listeners.remove(listener)
+
     def _send_midi_command(self, channel: int, cc: int, value: int, description: str = "") -> bool:
         """
         Invia comando MIDI a Traktor con simulation mode support
@@ -526,6 +675,7 @@ class TraktorController:
         # SIMULATION MODE - simula invio senza MIDI reale
         if self.simulation_mode:
             logger.debug(f"🎭 [SIMULATION] CH{channel} CC{cc}={value} ({description})")
+            self.last_sent_values[(channel, cc)] = value
             self.stats['commands_sent'] += 1
             return True  # Simula successo
 
@@ -541,6 +691,7 @@ class TraktorController:
             # Invio con timeout protection
             try:
                 self.midi_out.send_message(message)
+                self.last_sent_values[(channel, cc)] = value
                 self.stats['commands_sent'] += 1
                 logger.debug(f"📤 Comando: CH{channel} CC{cc}={value} ({description})")
                 return True
@@ -582,19 +733,19 @@ class TraktorController:
     # Metodi di controllo semplificati
     def set_deck_volume(self, deck: DeckID, volume: float) -> bool:
         """Imposta volume deck (0.0-1.0)"""
-        midi_value = int(volume * 127)
+        midi_value = self.to_midi_value(volume)
         channel, cc = self.MIDI_MAP[f'deck_{deck.value.lower()}_volume']
         return self._send_midi_command(channel, cc, midi_value, f"Deck {deck.value} Volume")
 
     def set_crossfader(self, position: float) -> bool:
         """Imposta crossfader (0.0=A, 1.0=B)"""
-        midi_value = int(position * 127)
+        midi_value = self.to_midi_value(position)
         channel, cc = self.MIDI_MAP['crossfader']
         return self._send_midi_command(channel, cc, midi_value, "Crossfader")
 
     def set_eq(self, deck: DeckID, eq_type: str, value: float) -> bool:
         """Imposta EQ (eq_type: 'high'/'mid'/'low', value: 0.0-1.0, 0.5=neutro)"""
-        midi_value = int(value * 127)
+        midi_value = self.to_midi_value(value)
         key = f'deck_{deck.value.lower()}_eq_{eq_type}'
 
         if key in self.MIDI_MAP:
@@ -750,7 +901,7 @@ class TraktorController:
     def set_fx_drywet(self, fx_unit: int, amount: float) -> bool:
         """Imposta FX dry/wet (1-4, 0.0-1.0) - COMPLETE 4-UNIT SUPPORT"""
         if 1 <= fx_unit <= 4:
-            midi_value = int(amount * 127)
+            midi_value = self.to_midi_value(amount)
             channel, cc = self.MIDI_MAP[f'fx{fx_unit}_drywet']
             return self._send_midi_command(channel, cc, midi_value, f"FX{fx_unit} Dry/Wet")
         return False
@@ -758,7 +909,7 @@ class TraktorController:
     def set_fx_knob(self, fx_unit: int, knob_num: int, value: float) -> bool:
         """Imposta FX parameter knob (fx_unit: 1-4, knob_num: 1-3, value: 0.0-1.0)"""
         if 1 <= fx_unit <= 4 and 1 <= knob_num <= 3:
-            midi_value = int(value * 127)
+            midi_value = self.to_midi_value(value)
             channel, cc = self.MIDI_MAP[f'fx{fx_unit}_knob{knob_num}']
             return self._send_midi_command(channel, cc, midi_value, f"FX{fx_unit} Knob{knob_num}")
         return False
@@ -832,7 +983,20 @@ class TraktorController:
         return success_rate > 0.5
 
     def get_hotcue_status(self, deck: DeckID) -> Dict[str, Any]:
-        """Get HOTCUE status for deck"""
+        """Get HOTCUE status for deck (shared snapshot, read-only)"""
+        return self.get_status_snapshot().hotcues['decks'][deck.value]
+
+    def get_all_hotcue_status(self) -> Dict[str, Any]:
+        """Get complete HOTCUE system status (shared snapshot, read-only)"""
+        return self.get_status_snapshot().hotcues
+
+    def _get_hotcue_status_cache(self) -> Dict[str, Any]:
+        """Lo stato HOTCUE dipende solo da MIDI_MAP: calcolato una volta"""
+        if self._hotcue_status_cache is None:
+            self._hotcue_status_cache = self._build_all_hotcue_status()
+        return self._hotcue_status_cache
+
+    def _build_hotcue_status(self, deck: DeckID) -> Dict[str, Any]:
         hotcue_mappings = {}
 
         for hotcue_num in range(1, 9):
@@ -856,13 +1020,12 @@ class TraktorController:
             'all_mapped': all(hc['mapped'] for hc in hotcue_mappings.values())
         }
 
-    def get_all_hotcue_status(self) -> Dict[str, Any]:
-        """Get complete HOTCUE system status"""
+    def _build_all_hotcue_status(self) -> Dict[str, Any]:
         all_decks_status = {}
         total_mapped = 0
 
         for deck in [DeckID.A, DeckID.B, DeckID.C, DeckID.D]:
-            deck_status = self.get_hotcue_status(deck)
+            deck_status = self._build_hotcue_status(deck)
             all_decks_status[deck.value] = deck_status
 
             if deck_status['all_mapped']:
@@ -897,6 +1060,7 @@ class TraktorController:
                 self.deck_states[deck]['loaded'] = True
                 self.deck_states[deck]['last_loaded_time'] = time.time()
                 self.deck_states[deck]['track_name'] = f"Track_{int(time.time())}"  # Placeholder
+                self.deck_states[deck]['load_count'] += 1
                 self.deck_states[deck]['playing'] = False  # Reset play state
                 self.deck_states[deck]['cued'] = False     # Reset cue state
 
@@ -1001,6 +1165,7 @@ class TraktorController:
 
         # Aggiungi alla storia
         self.browser_state['navigation_history'].append([new_position, current_time])
+        self.mark_status_dirty()
 
         # Mantieni solo gli ultimi 100 movimenti
         if len(self.browser_state['navigation_history']) > 100:
@@ -1165,12 +1330,14 @@ class TraktorController:
                 self.deck_states[deck]['track_id'] = track_id
                 self.deck_states[deck]['track_name'] = f"Track_Pos_{browser_position}"
                 self.deck_states[deck]['load_source_position'] = browser_position
+                self.deck_states[deck]['load_count'] += 1
                 self.deck_states[deck]['playing'] = False  # Reset play state
                 self.deck_states[deck]['cued'] = False     # Reset cue state
 
                 # Aggiorna browser state
                 self.browser_state['loaded_track_positions'].add(browser_position)
                 self.browser_state['loaded_track_ids'].add(track_id)
+                self.mark_status_dirty()
 
                 logger.info(f"🎵 Track loaded: Deck {deck.value} ← Position {browser_position} (ID: {track_id})")
                 self.stats['commands_sent'] += 1
@@ -1214,6 +1381,7 @@ class TraktorController:
         self.browser_state['loaded_track_positions'].clear()
         self.browser_state['loaded_track_ids'].clear()
         self.browser_state['navigation_history'].clear()
+        self.mark_status_dirty()
         self.browser_state['consecutive_duplicates'] = 0
         self.browser_state['smart_navigation_enabled'] = True
 
@@ -1295,7 +1463,10 @@ class TraktorController:
         logger.info("✅ Forced state reset completed")
 
     def get_comprehensive_status(self) -> Dict[str, Any]:
-        """Ottieni stato comprensivo sistema + sincronizzazione"""
+        """Ottieni stato comprensivo sistema + sincronizzazione (snapshot condiviso, read-only)"""
+        return self.get_status_snapshot().comprehensive
+
+    def _build_comprehensive_status(self, version: int) -> Dict[str, Any]:
         base_status = self.get_status()
         browser_status = self.get_browser_status()
 
@@ -1323,27 +1494,40 @@ class TraktorController:
                 'last_verification': self.last_state_verification,
                 'sync_enabled': self.sync_enabled
             },
-            'statistics': self.stats
+            'statistics': dict(self.stats),
+            'version': version
         }
 
     def auto_verify_if_needed(self):
         """Verifica automatica stato se necessaria"""
+        if not self.sync_enabled:
+            return
+
+        # Con il synchronizer si usa il suo scheduler adattivo (nessun timer separato)
+        if self.state_synchronizer and hasattr(self.state_synchronizer, 'verify_due_decks'):
+            if self.state_synchronizer.verify_due_decks() is not None:
+                self.last_state_verification = time.time()
+            return
+
         current_time = time.time()
-        if (self.sync_enabled and
-            current_time - self.last_state_verification > self.state_verification_interval):
+        if current_time - self.last_state_verification > self.state_verification_interval:
 
             logger.debug("🔍 Performing automatic state verification...")
             self.verify_state_sync()
 
-    def _enhanced_send_midi_command(self, channel: int, cc: int, value: int, description: str) -> bool:
-        """Send MIDI command con verifica stato post-command"""
+    def _enhanced_send_midi_command(self, channel: int, cc: int, value: int, description: str,
+                                    deck: Optional[DeckID] = None) -> bool:
+        """Send MIDI command con verifica stato post-command del deck interessato"""
         # Send comando normale
         success = self._send_midi_command(channel, cc, value, description)
 
-        # Se il comando ha successo e riguarda un cambio di stato, schedula verifica
-        if success and any(keyword in description.lower() for keyword in ['play', 'load', 'cue']):
+        # Solo i comandi su un deck che ne cambiano lo stato richiedono una verifica
+        if success and deck is not None and any(keyword in description.lower() for keyword in ['play', 'load', 'cue']):
             # Verifica stato dopo breve delay per permettere a Traktor di rispondere
-            threading.Timer(1.0, self.auto_verify_if_needed).start()
+            if self.state_synchronizer and hasattr(self.state_synchronizer, 'note_deck_activity'):
+                self.state_synchronizer.note_deck_activity(deck, delay=1.0)
+            else:
+                threading.Timer(1.0, self.auto_verify_if_needed).start()
 
         return success
 
@@ -1381,28 +1565,100 @@ class TraktorController:
         """Verifica se deck è cued"""
         return self.deck_states[deck]['cued']
 
-    def mix_to_deck_b(self) -> bool:
-        """Professional transition from A to B"""
+    def get_automation_engine(self):
+        """Engine di automazione curve (un solo thread di timing per tutte le transizioni)"""
+        if self.automation_engine is None:
+            from .transition_automation import AutomationEngine
+            self.automation_engine = AutomationEngine(self)
+        return self.automation_engine
+
+    def _current_bpm(self, default: float = 128.0) -> float:
+        """BPM corrente dal feedback di status (master/deck A/deck B)"""
+        for bpm in (getattr(self.status, 'master_bpm', 0.0), self.status.deck_a_bpm, self.status.deck_b_bpm):
+            if bpm and bpm > 0:
+                return bpm
+        return default
+
+    def get_beat_anchor(self, deck: DeckID, bpm: float,
+                        track_duration: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        """
+        (perf_counter, posizione in beat) del deck dal feedback di status.
+
+        La fase (beat_phase) dà l'allineamento al beat; con la durata del track
+        la posizione (7 bit, grossolana) fornisce anche il numero del beat, utile
+        per allinearsi alle frasi. None se il deck è fermo o il feedback è vecchio.
+        """
+        if bpm <= 0 or not self.deck_states[deck]['playing']:
+            return None
+
+        now = time.perf_counter()
+        beats_per_second = bpm / 60.0
+        anchor = None
+
+        position_key = f'deck_{deck.value.lower()}_position'
+        position_time = self.status_timestamps.get(position_key)
+        if track_duration and position_time is not None:
+            beats = getattr(self.status, position_key, 0.0) * track_duration * beats_per_second
+            anchor = (position_time, beats)
+
+        phase_time = self.status_timestamps.get('beat_phase')
+        if phase_time is not None and now - phase_time <= self.beat_anchor_max_age:
+            phase = getattr(self.status, 'beat_phase', 0) / 128.0  # 0-127 -> frazione di beat
+            if anchor is not None:
+                # Beat intero più vicino alla posizione grossolana, fase precisa
+                coarse = anchor[1] + (phase_time - anchor[0]) * beats_per_second
+                anchor = (phase_time, round(coarse - phase) + phase)
+            else:
+                anchor = (phase_time, phase)
+
+        return anchor
+
+    def mix_to_deck_b(self, length_beats: float = 8.0, bpm: Optional[float] = None,
+                      eq_swap: bool = False, track_duration: Optional[float] = None,
+                      quantize_beats: Optional[float] = None, wait: bool = False) -> bool:
+        """
+        Professional transition from A to B (crossfade beat-locked, curva automatizzata).
+
+        La curva parte sul prossimo beat (o frase, se track_duration di A è noto)
+        del deck A; non blocca: l'handle è in last_mix_handle (wait=True attende).
+        """
         try:
+            from .transition_automation import crossfade, eq_swap as eq_swap_curves
+
             # Check if both decks have tracks
             if not self.deck_states[DeckID.A]['loaded'] or not self.deck_states[DeckID.B]['loaded']:
                 logger.warning("Both decks must have tracks loaded for mixing")
                 return False
 
-            # Start playing B if not already
+            engine = self.get_automation_engine()
+            bpm = bpm or self._current_bpm()
+            seconds_per_beat = 60.0 / bpm
+
+            # Start playing B if not already; the blend starts at least one beat later to let it stabilize
+            start_delay = 0.0
             if not self.deck_states[DeckID.B]['playing']:
                 self.play_deck(DeckID.B)
-                import time
-                time.sleep(0.5)  # Let it stabilize
-
-            # Gradual crossfade A → B
-            crossfade_steps = [0.2, 0.4, 0.6, 0.8, 1.0]
-            for position in crossfade_steps:
-                self.set_crossfader(position)
-                import time
-                time.sleep(0.6)  # 600ms between steps
-
-            logger.info("✅ Professional mix A→B completed")
+                start_delay = seconds_per_beat
+
+            # Gradual crossfade A → B, dalla posizione attuale del crossfader
+            curves = crossfade(DeckID.A, DeckID.B, length_beats=length_beats,
+                               start_value=engine.last_value('crossfader'))
+            if eq_swap:
+                curves += eq_swap_curves(DeckID.A, DeckID.B, start_beat=length_beats / 2,
+                                         length_beats=min(4.0, length_beats / 2))
+
+            beat_anchor = self.get_beat_anchor(DeckID.A, bpm, track_duration)
+            if quantize_beats is None:
+                quantize_beats = 16.0 if track_duration else 1.0
+
+            handle = engine.schedule(curves, bpm, name="mix A→B", start_delay=start_delay,
+                                     beat_anchor=beat_anchor, quantize_beats=quantize_beats)
+            self.last_mix_handle = handle
+            if wait:
+                handle.wait(handle.start_delay + handle.duration + 2.0)
+                logger.info("✅ Professional mix A→B completed")
+            else:
+                logger.info(f"✅ Professional mix A→B scheduled (starts in {handle.start_delay:.2f}s)")
             return True
 
         except Exception as e:
@@ -1421,11 +1677,26 @@ class TraktorController:
             logger.error(f"❌ Deck sync failed: {e}")
             return False
 
-    def volume_balance_for_mixing(self, deck_a_vol: float = 0.8, deck_b_vol: float = 0.8) -> bool:
-        """Professional volume balancing for mixing"""
+    def volume_balance_for_mixing(self, deck_a_vol: float = 0.8, deck_b_vol: float = 0.8,
+                                  length_beats: float = 0.0, bpm: Optional[float] = None) -> bool:
+        """Professional volume balancing for mixing (length_beats > 0: rampa beat-locked)"""
         try:
-            success_a = self.set_deck_volume(DeckID.A, deck_a_vol)
-            success_b = self.set_deck_volume(DeckID.B, deck_b_vol)
+            engine = self.get_automation_engine()
+
+            if length_beats > 0:
+                from .transition_automation import volume_ramp
+                curves = []
+                for deck, target in ((DeckID.A, deck_a_vol), (DeckID.B, deck_b_vol)):
+                    current = engine.last_value(f'deck_{deck.value.lower()}_volume')
+                    curves += volume_ramp(deck, target if current is None else current, target,
+                                          length_beats=length_beats)
+                handle = engine.schedule(curves, bpm or self._current_bpm(), name="volume balance")
+                handle.wait(handle.duration + 2.0)
+                success_a = success_b = True
+            else:
+                # Invio diretto, deduplicato se il valore a 7 bit non cambia
+                success_a = engine.set_now('deck_a_volume', deck_a_vol)
+                success_b = engine.set_now('deck_b_volume', deck_b_vol)
 
             if success_a and success_b:
                 logger.info(f"🔊 Volume balanced: A={deck_a_vol:.1f}, B={deck_b_vol:.1f}")
@@ -1435,7 +1706,10 @@ class TraktorController:
             return False
 
     def get_mixing_status(self) -> Dict[str, Any]:
-        """Get comprehensive mixing status"""
+        """Get comprehensive mixing status (shared snapshot, read-only)"""
+        return self.get_status_snapshot().mixing
+
+    def _build_mixing_status(self) -> Dict[str, Any]:
         return {
             'deck_a_playing': self.deck_states[DeckID.A]['playing'],
             'deck_b_playing': self.deck_states[DeckID.B]['playing'],
@@ -60,8 +60,23 @@ class TraktorStateSynchronizer:
     def __init__(self, traktor_controller: TraktorController):
         self.controller = traktor_controller
         self.sync_states: Dict[DeckID, DeckSyncState] = {}
-        self.verification_interval = 10.0  # Verifica ogni 10 secondi
+        self.verification_interval = 10.0  # Intervallo iniziale per deck
         self.last_full_verification = 0.0
+
+        # Scheduling adattivo per deck: deck attivi/con discrepanze verificati
+        # spesso, deck inattivi con backoff esponenziale
+        self.min_verification_interval = 2.0
+        self.max_verification_interval = 120.0
+        self.activity_check_delay = 1.0  # Attesa dopo un comando prima di verificare
+        self.deck_intervals: Dict[DeckID, float] = {}
+        self.next_verification: Dict[DeckID, float] = {}
+        self.schedule_lock = threading.RLock()
+        self._wake_event = threading.Event()
+        self.verification_stats = {
+            'verifications_performed': 0,
+            'verifications_skipped': 0,
+            'scheduler_runs': 0
+        }
         self.auto_sync_enabled = True
         self.verification_thread: Optional[threading.Thread] = None
         self.running = False
@@ -84,6 +99,8 @@ class TraktorStateSynchronizer:
                 internal_track_name=internal_state['track_name'],
                 last_verification=time.time()
             )
+            self.deck_intervals[deck] = self.verification_interval
+            self.next_verification[deck] = time.time() + self.verification_interval
 
     def start_auto_sync(self):
         """Avvia sincronizzazione automatica"""
@@ -101,30 +118,87 @@ class TraktorStateSynchronizer:
     def stop_auto_sync(self):
         """Ferma sincronizzazione automatica"""
         self.running = False
+        self._wake_event.set()
         if self.verification_thread:
             self.verification_thread.join(timeout=5.0)
         logger.info("🔄 Auto-sync stopped")
 
     def _auto_verification_loop(self):
-        """Loop verifica automatica"""
+        """Loop verifica automatica (dorme fino al prossimo deck in scadenza)"""
         while self.running:
             try:
-                self.verify_all_states()
-                time.sleep(self.verification_interval)
+                self.verify_due_decks()
+
+                with self.schedule_lock:
+                    next_due = min(self.next_verification.values(), default=time.time() + self.verification_interval)
+                self._wake_event.wait(max(0.0, next_due - time.time()))
+                self._wake_event.clear()
             except Exception as e:
                 logger.error(f"❌ Error in auto-verification: {e}")
                 time.sleep(self.verification_interval)
 
+    def note_deck_activity(self, deck: Optional[DeckID] = None, delay: Optional[float] = None):
+        """
+        Segnala attività (comando inviato / stato cambiato) su un deck, o su tutti
+        se deck è None: il deck torna all'intervallo minimo e viene verificato presto.
+        """
+        check_at = time.time() + (self.activity_check_delay if delay is None else delay)
+        with self.schedule_lock:
+            for target in ([deck] if deck is not None else list(DeckID)):
+                self.deck_intervals[target] = self.min_verification_interval
+                self.next_verification[target] = min(self.next_verification.get(target, check_at), check_at)
+        self._wake_event.set()
+
+    def verify_due_decks(self) -> Optional[SystemSyncReport]:
+        """
+        Scheduler condiviso: verifica solo i deck in scadenza.
+        Restituisce None se nessun deck era da verificare.
+        """
+        now = time.time()
+        with self.schedule_lock:
+            self.verification_stats['scheduler_runs'] += 1
+            due_decks = [deck for deck in DeckID if self.next_verification.get(deck, 0.0) <= now]
+            self.verification_stats['verifications_skipped'] += len(DeckID) - len(due_decks)
+            if not due_decks:
+                self.controller.mark_status_dirty()  # contatori del sync summary cambiati
+                return None
+
+            return self._run_verification(due_decks)
+
     def verify_all_states(self) -> SystemSyncReport:
         """Verifica completa stati tutti i deck"""
-        logger.debug("🔍 Starting comprehensive state verification...")
+        with self.schedule_lock:
+            return self._run_verification(list(DeckID))
+
+    def _run_verification(self, decks: List[DeckID]) -> SystemSyncReport:
+        """Verifica i deck indicati e ne ripianifica la prossima verifica"""
+        logger.debug(f"🔍 Verifying decks: {', '.join(deck.value for deck in decks)}")
 
         # Aggiorna stati interni da controller
-        self._update_internal_states()
+        changed_decks = self._update_internal_states()
 
-        # Verifica ogni deck
-        for deck in DeckID:
+        # Verifica i deck richiesti
+        for deck in decks:
             self._verify_deck_state(deck)
+        self.verification_stats['verifications_performed'] += len(decks)
+
+        # Ripianifica: discrepanze o cambiamenti -> intervallo minimo, altrimenti backoff
+        now = time.time()
+        for deck in decks:
+            if self.sync_states[deck].discrepancies or deck in changed_decks:
+                interval = self.min_verification_interval
+            else:
+                interval = min(self.deck_intervals.get(deck, self.verification_interval) * 2,
+                               self.max_verification_interval)
+            self.deck_intervals[deck] = interval
+            self.next_verification[deck] = now + interval
+
+        # Deck cambiati ma non verificati in questo giro: anticipa la verifica
+        for deck in changed_decks:
+            if deck not in decks:
+                self.deck_intervals[deck] = self.min_verification_interval
+                self.next_verification[deck] = min(self.next_verification[deck],
+                                                   now + self.min_verification_interval)
 
         # Genera report
         report = self._generate_sync_report()
@@ -137,10 +211,12 @@ class TraktorStateSynchronizer:
             self._auto_correct_discrepancies(report)
 
         self.last_full_verification = time.time()
+        self.controller.mark_status_dirty()  # sync summary cambiato
         return report
 
-    def _update_internal_states(self):
-        """Aggiorna stati interni da controller"""
+    def _update_internal_states(self) -> Set[DeckID]:
+        """Aggiorna stati interni da controller; restituisce i deck cambiati"""
+        changed_decks = set()
         for deck in DeckID:
             internal_state = self.controller.deck_states[deck]
             sync_state = self.sync_states[deck]
@@ -162,6 +238,7 @@ class TraktorStateSynchronizer:
 
             # Registra cambiamento
             if changed:
+                changed_decks.add(deck)
                 self.state_change_history.append({
                     'timestamp': time.time(),
                     'deck': deck.value,
@@ -170,6 +247,8 @@ class TraktorStateSynchronizer:
                     'playing': internal_state['playing']
                 })
 
+        return changed_decks
+
     def _verify_deck_state(self, deck: DeckID):
         """Verifica stato specifico deck"""
         sync_state = self.sync_states[deck]
@@ -331,7 +410,7 @@ class TraktorStateSynchronizer:
             total_discrepancies=total_discrepancies,
             critical_issues=critical_issues,
             recommendations=recommendations,
-            next_verification=time.time() + self.verification_interval
+            next_verification=min(self.next_verification.values(), default=time.time() + self.verification_interval)
         )
 
     def _log_verification_results(self, report: SystemSyncReport):
@@ -382,6 +461,7 @@ class TraktorStateSynchronizer:
         self.sync_states[deck].internal_playing = traktor_state.get('playing', False)
         self.sync_states[deck].sync_status = SyncStatus.SYNCED
         self.sync_states[deck].discrepancies.clear()
+        self.controller.mark_status_dirty()
 
     def get_sync_status_summary(self) -> Dict[str, Any]:
         """Ottieni riassunto stato sincronizzazione"""
@@ -397,9 +477,18 @@ class TraktorStateSynchronizer:
                 deck.value for deck, state in self.sync_states.items()
                 if state.sync_status == SyncStatus.OUT_OF_SYNC
             ],
-            'recent_changes': len(self.state_change_history[-10:])  # Ultimi 10 cambiamenti
+            'recent_changes': len(self.state_change_history[-10:]),  # Ultimi 10 cambiamenti
+            'verification_stats': self.get_verification_stats()
         }
 
+    def get_verification_stats(self) -> Dict[str, Any]:
+        """Contatori verifiche eseguite/saltate e intervalli correnti per deck"""
+        with self.schedule_lock:
+            return {
+                **self.verification_stats,
+                'deck_intervals': {deck.value: interval for deck, interval in self.deck_intervals.items()}
+            }
+
     def reset_all_sync_states(self):
         """Reset completo tutti gli stati sincronizzazione"""
         logger.info("🔄 Resetting all sync states...")
@@ -422,6 +511,7 @@ class TraktorStateSynchronizer:
         # Clear history
         self.state_change_history.clear()
         self.discrepancy_alerts.clear()
+        self.controller.mark_status_dirty()
 
         logger.info("✅ All sync states reset completed")
 
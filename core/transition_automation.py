@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+🎚️ Transition Automation Engine
+Curve dichiarative (crossfade, EQ swap, filter sweep) legate a BPM e posizione
+in beat, precompilate in sequenze di valori MIDI a 7 bit ed eseguite da un
+unico thread di timing con correzione del drift
+"""
+
+import math
+import time
+import heapq
+import logging
+import itertools
+import threading
+from typing import Dict, List, Optional, Any, Tuple, Callable
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+# Forme delle curve: progress 0..1 -> 0..1
+CURVE_SHAPES: Dict[str, Callable[[float], float]] = {
+    'linear': lambda x: x,
+    'ease_in': lambda x: x * x,
+    'ease_out': lambda x: 1.0 - (1.0 - x) * (1.0 - x),
+    's_curve': lambda x: x * x * (3.0 - 2.0 * x),
+    'equal_power': lambda x: math.sin(x * math.pi / 2.0),
+}
+
+def _deck_key(deck: Any) -> str:
+    """DeckID o stringa -> 'a'/'b'/..."""
+    return str(getattr(deck, 'value', deck)).lower()
+
+@dataclass
+class AutomationCurve:
+    """Curva su un controllo MIDI_MAP, da start_beat per length_beats"""
+    target: str                 # chiave MIDI_MAP (es. 'crossfader', 'deck_b_eq_low')
+    start_value: float          # 0.0-1.0
+    end_value: float            # 0.0-1.0
+    start_beat: float = 0.0     # relativo al beat di ancoraggio
+    length_beats: float = 8.0
+    shape: str = 'linear'
+
+    def value_at(self, progress: float) -> float:
+        progress = min(1.0, max(0.0, progress))
+        shaped = CURVE_SHAPES.get(self.shape, CURVE_SHAPES['linear'])(progress)
+        return self.start_value + (self.end_value - self.start_value) * shaped
+
+def crossfade(from_deck: Any, to_deck: Any, start_beat: float = 0.0,
+              length_beats: float = 16.0, shape: str = 's_curve',
+              start_value: Optional[float] = None) -> List[AutomationCurve]:
+    """Crossfader verso to_deck (0.0=A, 1.0=B), da start_value (posizione attuale) se noto"""
+    start = start_value if start_value is not None else (0.0 if _deck_key(from_deck) == 'a' else 1.0)
+    end = 0.0 if _deck_key(to_deck) == 'a' else 1.0
+    return [AutomationCurve('crossfader', start, end, start_beat, length_beats, shape)]
+
+def eq_swap(out_deck: Any, in_deck: Any, band: str = 'low', start_beat: float = 0.0,
+            length_beats: float = 4.0) -> List[AutomationCurve]:
+    """Scambio di banda EQ: out_deck taglia mentre in_deck riporta la banda a neutro"""
+    return [
+        AutomationCurve(f'deck_{_deck_key(out_deck)}_eq_{band}', 0.5, 0.0, start_beat, length_beats, 'ease_in'),
+        AutomationCurve(f'deck_{_deck_key(in_deck)}_eq_{band}', 0.0, 0.5, start_beat, length_beats, 'ease_out'),
+    ]
+
+def filter_sweep(start_value: float = 0.5, end_value: float = 0.1, start_beat: float = 0.0,
+                 length_beats: float = 8.0, target: str = 'fx1_knob1_filter',
+                 shape: str = 'ease_in') -> List[AutomationCurve]:
+    """Sweep del filtro (default: FX1 knob 1 filter)"""
+    return [AutomationCurve(target, start_value, end_value, start_beat, length_beats, shape)]
+
+def volume_ramp(deck: Any, start_value: float, end_value: float, start_beat: float = 0.0,
+                length_beats: float = 4.0, shape: str = 'linear') -> List[AutomationCurve]:
+    """Rampa volume deck"""
+    return [AutomationCurve(f'deck_{_deck_key(deck)}_volume', start_value, end_value,
+                            start_beat, length_beats, shape)]
+
+@dataclass(order=True)
+class AutomationEvent:
+    """Singolo messaggio MIDI precompilato"""
+    due: float                  # time.perf_counter() assoluto
+    seq: int
+    channel: int = field(compare=False)
+    cc: int = field(compare=False)
+    value: int = field(compare=False)
+    target: str = field(compare=False)
+    handle: 'AutomationHandle' = field(compare=False, repr=False, default=None)
+
+class AutomationHandle:
+    """Automazione schedulata: attesa e cancellazione"""
+
+    def __init__(self, name: str, event_count: int, duration: float, start_delay: float = 0.0):
+        self.name = name
+        self.event_count = event_count
+        self.duration = duration
+        self.start_delay = start_delay  # Secondi da schedule() al beat 0 della curva
+        self.remaining = event_count
+        self.cancelled = False
+        self.done = threading.Event()
+        if event_count == 0:
+            self.done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.done.wait(timeout)
+
+    def cancel(self):
+        self.cancelled = True
+        self.done.set()
+
+class AutomationEngine:
+    """
+    Esegue le curve di tutte le transizioni da un solo thread di timing.
+
+    - compile(): campiona ogni curva a `resolution` secondi e tiene solo i
+      punti in cui il valore a 7 bit cambia (niente messaggi ridondanti)
+    - il thread usa scadenze assolute (perf_counter): il ritardo di un evento
+      non si accumula sui successivi; se in ritardo, eventi dello stesso
+      controllo già superati vengono fusi nell'ultimo valore
+    """
+
+    def __init__(self, controller, resolution: float = 0.005, spin_threshold: float = 0.001):
+        self.controller = controller
+        # Ultimo valore inviato per (channel, cc), condiviso con gli invii diretti del controller
+        self.last_values: Dict[Tuple[int, int], int] = controller.last_sent_values
+        self.resolution = resolution
+        self.spin_threshold = spin_threshold  # ultimi ms in busy-wait per precisione
+
+        self._events: List[AutomationEvent] = []
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        self.stats = {
+            'messages_sent': 0,
+            'samples_skipped': 0,        # campioni curva con valore 7 bit invariato
+            'messages_deduplicated': 0,  # invii saltati: valore già inviato
+            'messages_coalesced': 0,
+            'late_events': 0,
+            'max_lateness_ms': 0.0
+        }
+
+    # ==========================================
+    # COMPILAZIONE
+    # ==========================================
+
+    def compile(self, curves: List[AutomationCurve], bpm: float,
+                anchor_time: float) -> Tuple[List[AutomationEvent], float]:
+        """Precompila le curve in eventi MIDI deduplicati; restituisce (eventi, durata)"""
+        seconds_per_beat = 60.0 / bpm if bpm > 0 else 0.5
+        events: List[AutomationEvent] = []
+        end_time = anchor_time
+
+        for curve in curves:
+            if curve.target not in self.controller.MIDI_MAP:
+                logger.warning(f"⚠️ Automation target not mapped: {curve.target}")
+                continue
+
+            channel, cc = self.controller.MIDI_MAP[curve.target]
+            start = anchor_time + curve.start_beat * seconds_per_beat
+            duration = max(0.0, curve.length_beats * seconds_per_beat)
+            steps = max(1, int(math.ceil(duration / self.resolution)))
+
+            previous = None
+            for step in range(steps + 1):
+                value = self.controller.to_midi_value(curve.value_at(step / steps))
+                if value == previous:
+                    self.stats['samples_skipped'] += 1
+                    continue
+                previous = value
+                events.append(AutomationEvent(
+                    due=start + duration * step / steps, seq=next(self._seq),
+                    channel=channel, cc=cc, value=value, target=curve.target
+                ))
+            end_time = max(end_time, start + duration)
+
+        events.sort()
+        return events, end_time - anchor_time
+
+    # ==========================================
+    # SCHEDULING
+    # ==========================================
+
+    def schedule(self, curves: List[AutomationCurve], bpm: float, name: str = "transition",
+                 start_delay: float = 0.0, beat_anchor: Optional[Tuple[float, float]] = None,
+                 quantize_beats: float = 1.0) -> AutomationHandle:
+        """
+        Schedula curve (beat 0 = ora + start_delay).
+
+        Con beat_anchor = (perf_counter, posizione in beat) del deck di
+        riferimento, il beat 0 viene spostato al primo multiplo di
+        quantize_beats (beat o frase) dopo ora + start_delay.
+        """
+        now = time.perf_counter()
+        anchor_time = self.align_to_beat(now + start_delay, bpm, beat_anchor, quantize_beats)
+        events, duration = self.compile(curves, bpm, anchor_time)
+        handle = AutomationHandle(name, len(events), duration, anchor_time - now)
+
+        with self._condition:
+            for event in events:
+                event.handle = handle
+                heapq.heappush(self._events, event)
+            self._ensure_thread()
+            self._condition.notify()
+
+        logger.info(f"🎚️ Automation '{name}': {len(events)} MIDI events over {duration:.2f}s @ {bpm:.1f} BPM")
+        return handle
+
+    @staticmethod
+    def align_to_beat(earliest: float, bpm: float, beat_anchor: Optional[Tuple[float, float]],
+                      quantize_beats: float = 1.0) -> float:
+        """Primo confine di quantize_beats (nella griglia di beat_anchor) non prima di earliest"""
+        if beat_anchor is None or bpm <= 0 or quantize_beats <= 0:
+            return earliest
+        seconds_per_beat = 60.0 / bpm
+        anchor_time, anchor_beats = beat_anchor
+        beats_at_earliest = anchor_beats + (earliest - anchor_time) / seconds_per_beat
+        boundary = math.ceil(beats_at_earliest / quantize_beats - 1e-9) * quantize_beats
+        return anchor_time + (boundary - anchor_beats) * seconds_per_beat
+
+    def set_now(self, target: str, value: float) -> bool:
+        """Invio immediato deduplicato (stesso valore a 7 bit -> nessun messaggio)"""
+        if target not in self.controller.MIDI_MAP:
+            return False
+        channel, cc = self.controller.MIDI_MAP[target]
+        midi_value = self.controller.to_midi_value(value)
+        if self.last_values.get((channel, cc)) == midi_value:
+            self.stats['messages_deduplicated'] += 1
+            return True
+        return self._send(channel, cc, midi_value, target)
+
+    def last_value(self, target: str) -> Optional[float]:
+        """Ultimo valore inviato dall'engine per un controllo (0.0-1.0)"""
+        mapping = self.controller.MIDI_MAP.get(target)
+        value = self.last_values.get(tuple(mapping)) if mapping else None
+        return value / 127.0 if value is not None else None
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            for event in self._events:
+                if event.handle:
+                    event.handle.cancel()
+            self._events.clear()
+            self._condition.notify_all()
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._timing_loop, name="AutomationTiming", daemon=True)
+        self._thread.start()
+
+    def _send(self, channel: int, cc: int, value: int, target: str) -> bool:
+        success = self.controller._send_midi_command(channel, cc, value, f"Automation {target}")
+        if success:
+            self.stats['messages_sent'] += 1
+        return success
+
+    def _timing_loop(self):
+        """Thread di timing unico: scadenze assolute, sleep + breve busy-wait"""
+        while True:
+            with self._condition:
+                while self._running and not self._events:
+                    self._condition.wait()
+                if not self._running:
+                    return
+
+                next_due = self._events[0].due
+                wait = next_due - time.perf_counter()
+                if wait > self.spin_threshold:
+                    self._condition.wait(wait - self.spin_threshold)
+                    continue
+
+            while time.perf_counter() < next_due:
+                pass
+
+            now = time.perf_counter()
+            with self._condition:
+                # Tutti gli eventi scaduti: per ogni controllo vale solo l'ultimo
+                due_events: Dict[Tuple[int, int], AutomationEvent] = {}
+                while self._events and self._events[0].due <= now:
+                    event = heapq.heappop(self._events)
+                    if event.handle and event.handle.cancelled:
+                        continue
+                    key = (event.channel, event.cc)
+                    if key in due_events:
+                        self._complete(due_events[key])
+                        self.stats['messages_coalesced'] += 1
+                    due_events[key] = event
+
+            for key, event in due_events.items():
+                lateness = now - event.due
+                if lateness > self.resolution:
+                    self.stats['late_events'] += 1
+                    self.stats['max_lateness_ms'] = max(self.stats['max_lateness_ms'], lateness * 1000)
+
+                if self.last_values.get(key) != event.value:
+                    self._send(event.channel, event.cc, event.value, event.target)
+                else:
+                    self.stats['messages_deduplicated'] += 1
+                self._complete(event)
+
+    def _complete(self, event: AutomationEvent):
+        handle = event.handle
+        if handle is None:
+            return
+        handle.remaining -= 1
+        if handle.remaining <= 0:
+            handle.done.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            pending = len(self._events)
+        return {**self.stats, 'pending_events': pending}
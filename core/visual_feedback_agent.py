@@ -18,6 +18,7 @@ from enum import Enum
 import json
 
 from traktor_control import TraktorController, DeckID
+from command_ack_tracker import AcknowledgementTracker, CommandStatus, CommandTracking
 from core.openrouter_client import OpenRouterClient, DJContext
 
 logger = logging.getLogger(__name__)
@@ -81,6 +82,12 @@ class VisualFeedbackAgent:
         self.correction_enabled = True
         self.max_retries = 3
         self.command_timeout = 2.0  # Secondi per considerare comando fallito
+        self.retry_after = 0.5      # Attesa ack prima del reinvio
+
+        # Comandi in volo (verificati in parallelo sui feedback di status)
+        self.ack_tracker = AcknowledgementTracker(on_resolved=self._on_command_resolved)
+        if hasattr(self.traktor, 'add_status_listener'):
+            self.traktor.add_status_listener(self._on_status_feedback)
 
         # Storico per apprendimento
         self.command_history: List[Dict] = []
@@ -114,6 +121,7 @@ class VisualFeedbackAgent:
 
                 # Verifica comandi pendenti
                 self._verify_pending_commands()
+                self.ack_tracker.process_feedback()
 
                 # Correggi errori se necessario
                 if self.correction_enabled:
@@ -209,73 +217,108 @@ class VisualFeedbackAgent:
         """
         Esegue comando e verifica che sia stato realmente eseguito
         """
-        logger.info(f"🎯 Executing verified command: {command} on deck {target_deck}")
+        tracking = self.submit_verified_command(command, target_deck, **params)
+        self.ack_tracker.wait(tracking)
+        return tracking.status == CommandStatus.VERIFIED
 
-        # Registra comando
-        command_info = {
-            'command': command,
-            'deck': target_deck,
-            'params': params,
-            'timestamp': time.time(),
-            'attempts': 0,
-            'success': False
-        }
+    def execute_verified_commands(self, commands: List[Tuple[str, str, Dict[str, Any]]]) -> List[bool]:
+        """
+        Esegue una sequenza di comandi (es. una transizione) verificandoli in
+        parallelo: tutti inviati subito, poi attesa degli acknowledgement
+        """
+        trackings = [
+            self.submit_verified_command(command, target_deck, **params)
+            for command, target_deck, params in commands
+        ]
+        for tracking in trackings:
+            self.ack_tracker.wait(tracking)
+        return [tracking.status == CommandStatus.VERIFIED for tracking in trackings]
+
+    def submit_verified_command(self, command: str, target_deck: str, **params) -> CommandTracking:
+        """
+        Invia comando senza bloccare: la verifica avviene sui feedback di
+        status, con reinvio dopo retry_after fino a max_retries tentativi
+        """
+        logger.info(f"🎯 Executing verified command: {command} on deck {target_deck}")
 
         deck_status = self.deck_a if target_deck == "A" else self.deck_b
         deck_id = DeckID.A if target_deck == "A" else DeckID.B
 
-        for attempt in range(self.max_retries):
-            command_info['attempts'] = attempt + 1
-
-            # Salva stato pre-comando
-            pre_state = {
-                'playing': deck_status.is_playing,
-                'bpm': deck_status.bpm,
-                'state': deck_status.state
-            }
-
-            # Esegui comando
-            success = False
-            if command == 'play':
-                success = self.traktor.play_deck(deck_id)
-            elif command == 'pause':
-                success = self.traktor.pause_deck(deck_id)
-            elif command == 'load_track':
-                track_path = params.get('track_path')
-                if track_path:
-                    success = self.traktor.load_track_by_path(track_path, deck_id)
-            elif command == 'stop':
-                success = self.traktor.stop_deck(deck_id)
+        # Salva stato pre-comando
+        self._update_real_status()
+        pre_state = {
+            'playing': deck_status.is_playing,
+            'bpm': deck_status.bpm,
+            'state': deck_status.state
+        }
 
+        def send() -> bool:
+            success = self._send_deck_command(command, deck_id, params)
             if not success:
-                logger.warning(f"⚠️ Command {command} returned False on attempt {attempt + 1}")
-                continue
+                logger.warning(f"⚠️ Command {command} returned False on deck {target_deck}")
+            return success
 
-            # Attendi e verifica esecuzione
-            time.sleep(0.5)  # Attendi esecuzione comando
+        def verify() -> bool:
             self._update_real_status()  # Forza aggiornamento stato
+            return self._verify_command_execution(command, target_deck, pre_state)
+
+        tracking = CommandTracking(
+            command_name=command,
+            deck_id=target_deck,
+            timestamp=time.time(),
+            timeout_seconds=self.command_timeout,
+            verify=verify,
+            resend=send,
+            retry_after=self.retry_after,
+            max_attempts=self.max_retries,
+            params=params
+        )
+
+        if not send():
+            # Invio fallito: il primo retry parte subito
+            tracking.next_retry_at = tracking.timestamp
+        self.ack_tracker.submit(tracking)
+        return tracking
+
+    def _send_deck_command(self, command: str, deck_id: DeckID, params: Dict[str, Any]) -> bool:
+        """Invia un singolo comando deck a Traktor"""
+        if command == 'play':
+            return self.traktor.play_deck(deck_id)
+        elif command == 'pause':
+            return self.traktor.pause_deck(deck_id)
+        elif command == 'load_track':
+            track_path = params.get('track_path')
+            if track_path:
+                return self.traktor.load_track_by_path(track_path, deck_id)
+        elif command == 'stop':
+            return self.traktor.stop_deck(deck_id)
+        return False
 
-            # Verifica se comando è stato eseguito
-            verified = self._verify_command_execution(command, target_deck, pre_state)
-
-            if verified:
-                logger.info(f"✅ Command {command} verified on deck {target_deck} (attempt {attempt + 1})")
-                command_info['success'] = True
-                break
-            else:
-                logger.warning(f"❌ Command {command} not verified on attempt {attempt + 1}")
-                time.sleep(0.5)  # Pausa prima del retry
-
-        # Registra nel history
-        self.command_history.append(command_info)
-
-        # Aggiorna pattern di errore
-        if not command_info['success']:
-            error_key = f"{command}_{target_deck}"
+    def _on_status_feedback(self, status_key: str, value: Any):
+        """Feedback status Traktor: verifica i comandi in volo"""
+        self.ack_tracker.process_feedback()
+
+    def _on_command_resolved(self, tracking: CommandTracking):
+        """Registra l'esito di un comando verificato"""
+        success = tracking.status == CommandStatus.VERIFIED
+        self.command_history.append({
+            'command': tracking.command_name,
+            'deck': tracking.deck_id,
+            'params': tracking.params,
+            'timestamp': tracking.timestamp,
+            'attempts': tracking.attempts,
+            'success': success
+        })
+
+        if success:
+            logger.info(f"✅ Command {tracking.command_name} verified on deck {tracking.deck_id} "
+                        f"(attempt {tracking.attempts})")
+        else:
+            # Aggiorna pattern di errore
+            error_key = f"{tracking.command_name}_{tracking.deck_id}"
             self.error_patterns[error_key] = self.error_patterns.get(error_key, 0) + 1
-            logger.error(f"❌ Command {command} failed after {self.max_retries} attempts on deck {target_deck}")
-
-        return command_info['success']
+            logger.error(f"❌ Command {tracking.command_name} failed after {tracking.attempts} attempts "
+                         f"on deck {tracking.deck_id}: {tracking.error}")
 
     def _verify_command_execution(self, command: str, target_deck: str, pre_state: Dict) -> bool:
         """Verifica se il comando è stato realmente eseguito"""
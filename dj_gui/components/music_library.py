@@ -7,16 +7,31 @@ for music library management in the DJ interface.
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
+import re
 import json
+import math
 import time
-from typing import List, Dict, Any, Optional, Callable
+import bisect
+import hashlib
+from dataclasses import asdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional, Callable, Tuple
 import threading
 import logging
 from pathlib import Path
 
+# Import con fallback
+try:
+    from mutagen import File as MutagenFile
+    MUTAGEN_AVAILABLE = True
+except ImportError:
+    MUTAGEN_AVAILABLE = False
+
 from ..themes.dj_dark_theme import DJTheme, create_themed_frame, create_themed_label, create_themed_button
 from ..utils.state_manager import get_state_manager, TrackInfo
 from ..utils.threading_utils import TaskManager
+from ..utils.library_snapshot import LibrarySnapshot, write_library_snapshot, is_library_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -28,10 +43,8 @@ class TrackMetadata:
     def extract_metadata(file_path: str) -> TrackInfo:
         """Extract metadata from audio file."""
         try:
-            # Try to import mutagen for metadata extraction
-            try:
-                from mutagen import File
-                audio_file = File(file_path)
+            if MUTAGEN_AVAILABLE:
+                audio_file = MutagenFile(file_path)
 
                 if audio_file is not None:
                     # Extract basic metadata
@@ -66,9 +79,9 @@ class TrackMetadata:
                         energy=5
                     )
 
-            except ImportError:
+            else:
                 # Fallback without metadata library
-                logger.warning("Mutagen not available, using filename only")
+                logger.debug("Mutagen not available, using filename only")
 
         except Exception as e:
             logger.error(f"Error extracting metadata from {file_path}: {e}")
@@ -87,52 +100,126 @@ class TrackMetadata:
         )
 
 
+def _extract_metadata_batch(file_paths: List[str]) -> List[TrackInfo]:
+    """Worker entry point (module level so process pools can pickle it)."""
+    return [TrackMetadata.extract_metadata(file_path) for file_path in file_paths]
+
+
 class LibraryScanner:
-    """Background library scanner for audio files."""
+    """
+    Background library scanner for audio files.
+
+    Tag extraction runs on a process pool (one worker per core) in batches;
+    each finished batch is streamed to `batch_callback`, progress is reported
+    at most every `progress_interval` seconds, and a checkpoint of the tracks
+    scanned so far lets an interrupted scan resume where it stopped.
+    """
 
     SUPPORTED_FORMATS = {'.mp3', '.wav', '.flac', '.aac', '.m4a', '.ogg', '.wma'}
 
-    def __init__(self, task_manager: TaskManager):
+    def __init__(self, task_manager: TaskManager, max_workers: Optional[int] = None,
+                 batch_size: int = 64, checkpoint_dir: Optional[str] = None):
         self.task_manager = task_manager
         self._scanning = False
         self._scan_progress_callback: Optional[Callable[[int, int], None]] = None
 
-    def scan_directory(self, directory: str, progress_callback: Optional[Callable[[int, int], None]] = None) -> List[TrackInfo]:
+        self.max_workers = max_workers or os.cpu_count() or 4
+        self.batch_size = batch_size
+        self.use_processes = True
+        self.progress_interval = 0.1    # seconds between progress callbacks
+        self.checkpoint_interval = 5.0  # seconds between checkpoint writes
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else Path.home() / '.config' / 'dj_ai' / 'scan_checkpoints'
+
+    def scan_directory(self, directory: str, progress_callback: Optional[Callable[[int, int], None]] = None,
+                       batch_callback: Optional[Callable[[List[TrackInfo]], None]] = None) -> List[TrackInfo]:
         """Scan directory for audio files and extract metadata."""
         self._scan_progress_callback = progress_callback
         self._scanning = True
 
         def scan_worker():
             try:
-                tracks = []
-                audio_files = []
-
-                # Find all audio files
-                for root, dirs, files in os.walk(directory):
-                    for file in files:
-                        if Path(file).suffix.lower() in self.SUPPORTED_FORMATS:
-                            audio_files.append(os.path.join(root, file))
-
+                audio_files = self._find_audio_files(directory)
                 total_files = len(audio_files)
                 logger.info(f"Found {total_files} audio files in {directory}")
 
-                # Process files
-                for i, file_path in enumerate(audio_files):
-                    if not self._scanning:
-                        break
-
+                # Resume: tracks from an interrupted scan, if the file is unchanged
+                checkpoint = self._load_checkpoint(directory)
+                entries: Dict[str, Tuple[float, TrackInfo]] = {}
+                pending: List[str] = []
+                for file_path, mtime in audio_files:
+                    cached = checkpoint.get(file_path)
+                    if cached and cached[0] == mtime:
+                        entries[file_path] = cached
+                    else:
+                        pending.append(file_path)
+
+                mtimes = dict(audio_files)
+                tracks = [track for _, track in entries.values()]
+                if tracks:
+                    logger.info(f"Resuming scan: {len(tracks)} tracks from checkpoint")
+                    if batch_callback:
+                        batch_callback(list(tracks))
+
+                last_progress = last_checkpoint = time.time()
+                self._report_progress(len(tracks), total_files)
+
+                batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+                failed_batches = 0
+                use_processes = self.use_processes
+                while batches and self._scanning:
+                    pool = self._create_pool(use_processes)
+                    broken: List[List[str]] = []
                     try:
-                        track_info = TrackMetadata.extract_metadata(file_path)
-                        tracks.append(track_info)
-
-                        # Update progress
-                        if self._scan_progress_callback:
-                            self._scan_progress_callback(i + 1, total_files)
+                        futures = {pool.submit(_extract_metadata_batch, batch): batch for batch in batches}
+                        for future in as_completed(futures):
+                            if not self._scanning:
+                                break
 
-                    except Exception as e:
-                        logger.error(f"Error processing {file_path}: {e}")
+                            try:
+                                batch_tracks = future.result()
+                            except BrokenProcessPool as e:
+                                # A worker died: every unfinished batch fails the same way
+                                if not broken:
+                                    logger.warning(f"Scan process pool broken, retrying remaining batches with threads: {e}")
+                                broken.append(futures[future])
+                                continue
+                            except Exception as e:
+                                logger.error(f"Error processing scan batch: {e}")
+                                failed_batches += 1
+                                continue
 
-                logger.info(f"Scanned {len(tracks)} tracks successfully")
+                            tracks.extend(batch_tracks)
+                            for track in batch_tracks:
+                                entries[track.file_path] = (mtimes.get(track.file_path, 0.0), track)
+                            if batch_callback:
+                                batch_callback(batch_tracks)
+
+                            now = time.time()
+                            if now - last_progress >= self.progress_interval:
+                                self._report_progress(len(tracks), total_files)
+                                last_progress = now
+                            if now - last_checkpoint >= self.checkpoint_interval:
+                                self._save_checkpoint(directory, entries)
+                                last_checkpoint = now
+                    finally:
+                        pool.shutdown(wait=False, cancel_futures=True)
+
+                    batches = broken
+                    use_processes = False
+
+                if self._scanning and not failed_batches:
+                    self._report_progress(len(tracks), total_files)
+                    self._clear_checkpoint(directory)
+                    logger.info(f"Scanned {len(tracks)} tracks successfully")
+                else:
+                    # Failed batches are not in the checkpoint: the next scan retries them
+                    self._save_checkpoint(directory, entries)
+                    if self._scanning:
+                        self._report_progress(len(tracks), total_files)
+                        logger.warning(f"Scan finished with {failed_batches} failed batches "
+                                       f"({len(tracks)}/{total_files} tracks, checkpoint saved)")
+                    else:
+                        logger.info(f"Scan interrupted after {len(tracks)}/{total_files} tracks (checkpoint saved)")
                 return tracks
 
             except Exception as e:
@@ -142,11 +229,231 @@ class LibraryScanner:
         # Submit scanning task
         return self.task_manager.submit_background_task('library_scan', scan_worker)
 
+    def _find_audio_files(self, directory: str) -> List[Tuple[str, float]]:
+        """(path, mtime) of every supported audio file under directory"""
+        audio_files = []
+        stack = [directory]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in self.SUPPORTED_FORMATS:
+                            audio_files.append((entry.path, entry.stat().st_mtime))
+            except OSError as e:
+                logger.warning(f"Cannot read directory: {e}")
+        return audio_files
+
+    def _create_pool(self, use_processes: bool = True):
+        if use_processes:
+            try:
+                return ProcessPoolExecutor(max_workers=self.max_workers)
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"Process pool unavailable, using threads: {e}")
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="DJ_Scan")
+
+    def _report_progress(self, current: int, total: int):
+        if self._scan_progress_callback:
+            self._scan_progress_callback(current, total)
+
+    # ==========================================
+    # CHECKPOINT
+    # ==========================================
+
+    def _checkpoint_path(self, directory: str) -> Path:
+        key = hashlib.md5(os.path.abspath(directory).encode()).hexdigest()
+        return self.checkpoint_dir / f"{key}.json"
+
+    def _load_checkpoint(self, directory: str) -> Dict[str, Tuple[float, TrackInfo]]:
+        try:
+            with open(self._checkpoint_path(directory), 'r') as f:
+                data = json.load(f)
+            if data.get('directory') != os.path.abspath(directory):
+                return {}
+            return {
+                entry['track']['file_path']: (entry['mtime'], TrackInfo(**entry['track']))
+                for entry in data.get('entries', [])
+            }
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable scan checkpoint: {e}")
+            return {}
+
+    def _save_checkpoint(self, directory: str, entries: Dict[str, Tuple[float, TrackInfo]]):
+        """Atomic write (tmp + replace)"""
+        try:
+            path = self._checkpoint_path(directory)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = {
+                'directory': os.path.abspath(directory),
+                'updated_at': time.time(),
+                'entries': [{'mtime': mtime, 'track': asdict(track)} for mtime, track in entries.values()]
+            }
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not save scan checkpoint: {e}")
+
+    def _clear_checkpoint(self, directory: str):
+        try:
+            self._checkpoint_path(directory).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove scan checkpoint: {e}")
+
     def stop_scan(self):
         """Stop current scanning operation."""
         self._scanning = False
 
 
+def format_track_row(track: TrackInfo) -> tuple:
+    """Treeview values for a track (artist, title, album, genre, bpm, duration)"""
+    if track.duration > 0:
+        duration_str = f"{int(track.duration // 60):02d}:{int(track.duration % 60):02d}"
+    else:
+        duration_str = "--:--"
+
+    return (
+        track.artist or "Unknown Artist",
+        track.title or "Unknown Title",
+        track.album or "",
+        track.genre or "",
+        f"{track.bpm:.1f}" if track.bpm > 0 else "--",
+        duration_str
+    )
+
+
+class LibrarySearchIndex:
+    """
+    In-memory inverted index over a track list, built after a scan (or
+    incrementally, batch by batch, while a scan streams results).
+
+    Posting lists, genre and BPM filters are stored as int bitsets (bit i =
+    track i), so a search is a handful of AND/OR operations instead of a
+    linear scan. Each query word matches as a prefix of artist/title/album
+    tokens; all words must match. Treeview row strings are formatted here
+    too, once per scan.
+    """
+
+    TOKEN_PATTERN = re.compile(r'\w+')
+
+    def __init__(self, tracks: List[TrackInfo]):
+        self.tracks: List[TrackInfo] = []
+        self.all_mask = 0
+        self.by_path: Dict[str, TrackInfo] = {}
+        self.row_values: Dict[str, tuple] = {}
+
+        self.postings: Dict[str, int] = {}
+        self.genre_masks: Dict[str, int] = {}
+        self._floor_buckets: Dict[int, int] = {}
+        self._ceil_buckets: Dict[int, int] = {}
+        self.unknown_bpm_mask = 0
+
+        # Derived structures, rebuilt lazily after add_tracks()
+        self._vocabulary: Optional[List[str]] = None
+        self._ge_masks: List[int] = []
+        self._le_masks: List[int] = []
+        self._bpm_dirty = True
+        self._prefix_cache: Dict[str, int] = {}
+
+        self.add_tracks(tracks)
+
+    def add_tracks(self, tracks: List[TrackInfo]):
+        """Append tracks to the index (bits continue after the existing ones)"""
+        postings = self.postings
+        for track in tracks:
+            bit = 1 << len(self.tracks)
+            self.tracks.append(track)
+            self.by_path[track.file_path] = track
+            self.row_values[track.file_path] = format_track_row(track)
+
+            text = f"{track.artist} {track.title} {track.album}".lower()
+            for token in set(self.TOKEN_PATTERN.findall(text)):
+                postings[token] = postings.get(token, 0) | bit
+
+            self.genre_masks[track.genre] = self.genre_masks.get(track.genre, 0) | bit
+
+            if track.bpm > 0:
+                low, high = int(math.floor(track.bpm)), int(math.ceil(track.bpm))
+                self._floor_buckets[low] = self._floor_buckets.get(low, 0) | bit
+                self._ceil_buckets[high] = self._ceil_buckets.get(high, 0) | bit
+            else:
+                self.unknown_bpm_mask |= bit
+
+        if tracks:
+            self.all_mask = (1 << len(self.tracks)) - 1
+            self._vocabulary = None
+            self._bpm_dirty = True
+            self._prefix_cache.clear()
+
+    @property
+    def vocabulary(self) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        return self._vocabulary
+
+    def _build_bpm_masks(self):
+        """
+        Cumulative BPM bitsets: bpm >= min  <=>  floor(bpm) >= min (integer min)
+                                bpm <= max  <=>  ceil(bpm) <= max  (integer max)
+        """
+        self.max_bpm = max(self._ceil_buckets, default=0)
+        self._ge_masks = [0] * (self.max_bpm + 2)
+        for bpm in range(self.max_bpm, -1, -1):
+            self._ge_masks[bpm] = self._ge_masks[bpm + 1] | self._floor_buckets.get(bpm, 0)
+        self._le_masks = [0] * (self.max_bpm + 1)
+        running = 0
+        for bpm in range(self.max_bpm + 1):
+            running |= self._ceil_buckets.get(bpm, 0)
+            self._le_masks[bpm] = running
+        self._bpm_dirty = False
+
+    def prefix_mask(self, prefix: str) -> int:
+        """Union of posting lists of all tokens starting with prefix"""
+        mask = self._prefix_cache.get(prefix)
+        if mask is None:
+            start = bisect.bisect_left(self.vocabulary, prefix)
+            end = bisect.bisect_left(self.vocabulary, prefix + '\uffff', start)
+            mask = 0
+            for token in self.vocabulary[start:end]:
+                mask |= self.postings[token]
+            self._prefix_cache[prefix] = mask
+        return mask
+
+    def bpm_mask(self, bpm_min: int, bpm_max: int) -> int:
+        """Tracks with bpm_min <= bpm <= bpm_max; unknown BPM always passes"""
+        if self._bpm_dirty:
+            self._build_bpm_masks()
+        ge = self._ge_masks[min(max(bpm_min, 0), self.max_bpm + 1)]
+        le = self._le_masks[min(bpm_max, self.max_bpm)] if bpm_max >= 0 else 0
+        return (ge & le) | self.unknown_bpm_mask
+
+    def search(self, text: str = "", genre: str = "All",
+               bpm_min: int = 0, bpm_max: int = 200) -> List[TrackInfo]:
+        """Filtered tracks, in library order"""
+        mask = self.all_mask
+        for word in self.TOKEN_PATTERN.findall(text.lower()):
+            mask &= self.prefix_mask(word)
+            if not mask:
+                return []
+
+        if genre != "All":
+            mask &= self.genre_masks.get(genre, 0)
+
+        mask &= self.bpm_mask(bpm_min, bpm_max)
+
+        if mask == self.all_mask:
+            return list(self.tracks)
+
+        bits = bin(mask)[:1:-1]
+        return [self.tracks[i] for i, bit in enumerate(bits) if bit == '1']
+
+
 class MusicLibraryBrowser:
     """
     Music Library Browser component.
@@ -162,8 +469,33 @@ class MusicLibraryBrowser:
         # Library data
         self.tracks: List[TrackInfo] = []
         self.filtered_tracks: List[TrackInfo] = []
+        self.search_index = LibrarySearchIndex([])
         self.current_directory = ""
 
+        # Debounce dei filtri mentre si digita
+        self.search_debounce_ms = 150
+        self._filter_after_id: Optional[str] = None
+
+        # Virtual list: only visible rows (+ overscan) exist as Treeview items
+        self.virtual_mode = True
+        self.overscan_rows = 5
+        self._row_items: List[str] = []     # recycled Treeview items
+        self._attached_rows = 0
+        self._view_start = 0
+        self._visible_rows = 15
+        self._selected_path: Optional[str] = None
+        # Selection set by the last render: <<TreeviewSelect>> is queued, so the
+        # events it generates are recognised by comparing with it
+        self._rendered_selection: Tuple[str, ...] = ()
+
+        # Streaming scan: view refresh throttled while batches arrive
+        self.scan_refresh_ms = 250
+        self._scan_refresh_after_id: Optional[str] = None
+
+        # Snapshot loading: first page decoded synchronously, the rest streamed
+        self.snapshot_first_page = 200
+        self.snapshot_batch_size = 2000
+
         # Search and filter variables
         self.search_term = tk.StringVar()
         self.genre_filter = tk.StringVar(value="All")
@@ -339,10 +671,15 @@ class MusicLibraryBrowser:
         self.track_tree.column('bpm', width=60, minwidth=50)
         self.track_tree.column('duration', width=80, minwidth=60)
 
-        # Scrollbars
-        v_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.track_tree.yview)
+        # Scrollbars (virtual mode: the vertical scrollbar drives the row window)
+        if self.virtual_mode:
+            v_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self._on_virtual_scroll)
+        else:
+            v_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.track_tree.yview)
+            self.track_tree.configure(yscrollcommand=v_scrollbar.set)
+        self.v_scrollbar = v_scrollbar
         h_scrollbar = ttk.Scrollbar(tree_frame, orient='horizontal', command=self.track_tree.xview)
-        self.track_tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.track_tree.configure(xscrollcommand=h_scrollbar.set)
 
         # Pack treeview and scrollbars
         self.track_tree.pack(side='left', fill='both', expand=True)
@@ -353,6 +690,17 @@ class MusicLibraryBrowser:
         self.track_tree.bind('<Double-1>', self._on_track_double_click)
         self.track_tree.bind('<Button-3>', self._on_track_right_click)
 
+        if self.virtual_mode:
+            self.track_tree.bind('<Configure>', self._on_tree_configure)
+            self.track_tree.bind('<<TreeviewSelect>>', self._on_tree_select)
+            self.track_tree.bind('<MouseWheel>', self._on_mouse_wheel)
+            self.track_tree.bind('<Button-4>', lambda e: self._scroll_rows(-3))
+            self.track_tree.bind('<Button-5>', lambda e: self._scroll_rows(3))
+            self.track_tree.bind('<Up>', lambda e: self._move_selection(-1))
+            self.track_tree.bind('<Down>', lambda e: self._move_selection(1))
+            self.track_tree.bind('<Prior>', lambda e: self._move_selection(-self._visible_rows))
+            self.track_tree.bind('<Next>', lambda e: self._move_selection(self._visible_rows))
+
         # Enable drag and drop
         self._setup_drag_drop()
 
@@ -410,8 +758,15 @@ class MusicLibraryBrowser:
             self.scan_button.configure(text="SCANNING...", state='disabled')
             self.status_label.configure(text=f"Scanning {directory}...")
 
+            # Results stream in batch by batch into a fresh index
+            scan_index = self.search_index = LibrarySearchIndex([])
+            self.tracks = self.search_index.tracks
+            self.filtered_tracks = []
+            self._update_track_list()
+
             # Start scan
-            scan_future = self.scanner.scan_directory(directory, self._on_scan_progress)
+            scan_future = self.scanner.scan_directory(directory, self._on_scan_progress,
+                                                      lambda batch: self._on_scan_batch(batch, scan_index))
 
             # Monitor scan completion
             self.task_manager.start_periodic_task(
@@ -439,6 +794,22 @@ class MusicLibraryBrowser:
                 text=f"Scanning... {current}/{total}"
             )
 
+    def _on_scan_batch(self, batch: List[TrackInfo], target_index: LibrarySearchIndex):
+        """Scanner thread: hand a batch of tracks to the Tk thread."""
+        self.task_manager.schedule_gui_update(self._append_scan_batch, batch, target_index)
+
+    def _append_scan_batch(self, batch: List[TrackInfo], target_index: LibrarySearchIndex):
+        """Add streamed tracks; the view refreshes at most every scan_refresh_ms."""
+        if self.search_index is not target_index:
+            return  # Library replaced (new scan or load) since the batch was produced
+        target_index.add_tracks(batch)
+        if self._scan_refresh_after_id is None:
+            self._scan_refresh_after_id = self.frame.after(self.scan_refresh_ms, self._refresh_scan_view)
+
+    def _refresh_scan_view(self):
+        self._scan_refresh_after_id = None
+        self._apply_filters(keep_position=True)
+
     def _monitor_scan(self, scan_future):
         """Monitor scan completion."""
         if scan_future.done():
@@ -454,49 +825,144 @@ class MusicLibraryBrowser:
 
     def _scan_complete(self, tracks: List[TrackInfo]):
         """Handle scan completion."""
-        self.tracks = tracks
-        self.filtered_tracks = tracks.copy()
+        if self._scan_refresh_after_id is not None:
+            self.frame.after_cancel(self._scan_refresh_after_id)
+            self._scan_refresh_after_id = None
+
+        # Batches were streamed into the index; rebuild only if they were not
+        if len(self.search_index.tracks) != len(tracks):
+            self.search_index = LibrarySearchIndex(tracks)
+        self.tracks = self.search_index.tracks
 
         # Update UI
         self.scan_button.configure(text="SCAN FOLDER", state='normal')
         self.progress_bar.pack_forget()
 
         if tracks:
+            self._apply_filters(keep_position=True)
             self.status_label.configure(text=f"Loaded {len(tracks)} tracks")
-            self._update_track_list()
             self._update_genre_filter()
         else:
+            self.filtered_tracks = []
+            self._update_track_list()
             self.status_label.configure(text="No tracks found")
 
         logger.info(f"Library scan complete: {len(tracks)} tracks")
 
-    def _update_track_list(self):
+    def _update_track_list(self, keep_position: bool = False):
         """Update the track list display."""
+        if self.virtual_mode:
+            if not keep_position:
+                self._view_start = 0
+            self._render_virtual_rows()
+            return
+
         # Clear existing items
         for item in self.track_tree.get_children():
             self.track_tree.delete(item)
 
         # Add filtered tracks
+        row_values = self.search_index.row_values
         for track in self.filtered_tracks:
-            # Format duration
-            if track.duration > 0:
-                minutes = int(track.duration // 60)
-                seconds = int(track.duration % 60)
-                duration_str = f"{minutes:02d}:{seconds:02d}"
-            else:
-                duration_str = "--:--"
-
-            # Format BPM
-            bpm_str = f"{track.bpm:.1f}" if track.bpm > 0 else "--"
-
-            self.track_tree.insert('', 'end', values=(
-                track.artist or "Unknown Artist",
-                track.title or "Unknown Title",
-                track.album or "",
-                track.genre or "",
-                bpm_str,
-                duration_str
-            ), tags=(track.file_path,))
+            values = row_values.get(track.file_path) or format_track_row(track)
+            self.track_tree.insert('', 'end', values=values, tags=(track.file_path,))
+
+    # ==========================================
+    # VIRTUAL LIST
+    # ==========================================
+
+    def _render_virtual_rows(self):
+        """Fill the recycled row items with the tracks of the current window."""
+        total = len(self.filtered_tracks)
+        self._view_start = max(0, min(self._view_start, total - self._visible_rows))
+        window = self.filtered_tracks[self._view_start:self._view_start + self._visible_rows + self.overscan_rows]
+
+        # Grow the pool if needed, detach rows that are not used
+        while len(self._row_items) < len(window):
+            self._row_items.append(self.track_tree.insert('', 'end'))
+            self._attached_rows += 1
+        for index in range(len(window), self._attached_rows):
+            self.track_tree.detach(self._row_items[index])
+        for index in range(self._attached_rows, len(window)):
+            self.track_tree.move(self._row_items[index], '', index)
+        self._attached_rows = len(window)
+
+        row_values = self.search_index.row_values
+        selected_item = None
+        for item, track in zip(self._row_items, window):
+            values = row_values.get(track.file_path) or format_track_row(track)
+            self.track_tree.item(item, values=values, tags=(track.file_path,))
+            if track.file_path == self._selected_path:
+                selected_item = item
+
+        # Selection follows the track, not the recycled row
+        self._rendered_selection = (selected_item,) if selected_item else ()
+        self.track_tree.selection_set(self._rendered_selection)
+        self.track_tree.yview_moveto(0)
+
+        if total:
+            first = self._view_start / total
+            last = min(1.0, (self._view_start + self._visible_rows) / total)
+            self.v_scrollbar.set(first, last)
+        else:
+            self.v_scrollbar.set(0.0, 1.0)
+
+    def _scroll_rows(self, delta: int) -> str:
+        start = self._view_start + delta
+        start = max(0, min(start, len(self.filtered_tracks) - self._visible_rows))
+        if start != self._view_start:
+            self._view_start = start
+            self._render_virtual_rows()
+        return "break"
+
+    def _on_virtual_scroll(self, action: str, amount: str, unit: Optional[str] = None):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        if action == 'moveto':
+            self._scroll_rows(int(float(amount) * len(self.filtered_tracks)) - self._view_start)
+        elif action == 'scroll':
+            step = self._visible_rows if unit == 'pages' else 1
+            self._scroll_rows(int(amount) * step)
+
+    def _on_mouse_wheel(self, event) -> str:
+        return self._scroll_rows(-3 if event.delta > 0 else 3)
+
+    def _on_tree_configure(self, event):
+        """Recompute how many rows fit after a resize."""
+        row_height = ttk.Style().lookup("DJ.Treeview", "rowheight") or 20
+        visible = max(1, (event.height - 25) // int(row_height))
+        if visible != self._visible_rows:
+            self._visible_rows = visible
+            self._render_virtual_rows()
+
+    def _on_tree_select(self, event):
+        selection = tuple(self.track_tree.selection())
+        if selection == self._rendered_selection:
+            # Event generated by _render_virtual_rows (or nothing changed)
+            return
+        self._rendered_selection = selection
+        tags = self.track_tree.item(selection[0], 'tags') if selection else ()
+        self._selected_path = tags[0] if tags else None
+
+    def _move_selection(self, delta: int) -> str:
+        """Keyboard navigation across the whole filtered list."""
+        total = len(self.filtered_tracks)
+        if not total:
+            return "break"
+
+        track = self.search_index.by_path.get(self._selected_path)
+        try:
+            position = self.filtered_tracks.index(track) if track else self._view_start - 1
+        except ValueError:
+            position = self._view_start - 1
+        position = max(0, min(total - 1, position + delta))
+        self._selected_path = self.filtered_tracks[position].file_path
+
+        if position < self._view_start:
+            self._view_start = position
+        elif position >= self._view_start + self._visible_rows:
+            self._view_start = position - self._visible_rows + 1
+        self._render_virtual_rows()
+        return "break"
 
     def _update_genre_filter(self):
         """Update genre filter options."""
@@ -504,45 +970,41 @@ class MusicLibraryBrowser:
         genre_list = ["All"] + sorted(genres)
         self.genre_combo['values'] = genre_list
 
-    def _apply_filters(self):
+    def _apply_filters(self, keep_position: bool = False):
         """Apply search and filter criteria."""
-        search = self.search_term.get().lower()
-        genre = self.genre_filter.get()
-        bpm_min_val = self.bpm_min.get()
-        bpm_max_val = self.bpm_max.get()
-
-        self.filtered_tracks = []
-
-        for track in self.tracks:
-            # Search filter
-            if search:
-                search_text = f"{track.artist} {track.title} {track.album}".lower()
-                if search not in search_text:
-                    continue
-
-            # Genre filter
-            if genre != "All" and track.genre != genre:
-                continue
-
-            # BPM filter
-            if track.bpm > 0:
-                if track.bpm < bpm_min_val or track.bpm > bpm_max_val:
-                    continue
-
-            self.filtered_tracks.append(track)
+        self._filter_after_id = None
+        try:
+            bpm_min_val = self.bpm_min.get()
+            bpm_max_val = self.bpm_max.get()
+        except tk.TclError:
+            # BPM entry being edited (empty / not a number)
+            return
+
+        self.filtered_tracks = self.search_index.search(
+            self.search_term.get(),
+            self.genre_filter.get(),
+            bpm_min_val,
+            bpm_max_val
+        )
 
-        self._update_track_list()
+        self._update_track_list(keep_position)
         self.status_label.configure(
             text=f"Showing {len(self.filtered_tracks)} of {len(self.tracks)} tracks"
         )
 
+    def _schedule_filters(self):
+        """Debounce: apply filters once typing pauses."""
+        if self._filter_after_id is not None:
+            self.frame.after_cancel(self._filter_after_id)
+        self._filter_after_id = self.frame.after(self.search_debounce_ms, self._apply_filters)
+
     def _on_search_change(self, *args):
         """Handle search term change."""
-        self._apply_filters()
+        self._schedule_filters()
 
     def _on_filter_change(self, *args):
         """Handle filter change."""
-        self._apply_filters()
+        self._schedule_filters()
 
     def _clear_search(self):
         """Clear search and filters."""
@@ -570,7 +1032,7 @@ class MusicLibraryBrowser:
 
             if file_path:
                 # Find track info
-                track = next((t for t in self.tracks if t.file_path == file_path), None)
+                track = self.search_index.by_path.get(file_path)
                 if track:
                     self._load_track_to_deck(track)
 
@@ -621,7 +1083,7 @@ class MusicLibraryBrowser:
             file_path = item['tags'][0] if item['tags'] else None
 
             if file_path:
-                track = next((t for t in self.tracks if t.file_path == file_path), None)
+                track = self.search_index.by_path.get(file_path)
                 if track:
                     self._load_to_deck(deck_id, track)
 
@@ -669,7 +1131,7 @@ class MusicLibraryBrowser:
             file_path = item['tags'][0] if item['tags'] else None
 
             if file_path:
-                track = next((t for t in self.tracks if t.file_path == file_path), None)
+                track = self.search_index.by_path.get(file_path)
                 if track:
                     info_text = f"""Title: {track.title}
 Artist: {track.artist}
@@ -698,7 +1160,11 @@ File: {track.file_path}"""
         self.track_load_callback = callback
 
     def load_library_from_file(self, file_path: str):
-        """Load library from saved file."""
+        """Load library from a snapshot (lazily) or from a JSON export."""
+        if is_library_snapshot(file_path):
+            self._load_library_snapshot(file_path)
+            return
+
         try:
             with open(file_path, 'r') as f:
                 data = json.load(f)
@@ -708,7 +1174,8 @@ File: {track.file_path}"""
                 track = TrackInfo(**track_data)
                 tracks.append(track)
 
-            self.tracks = tracks
+            self.search_index = LibrarySearchIndex(tracks)
+            self.tracks = self.search_index.tracks
             self.filtered_tracks = tracks.copy()
             self.current_directory = data.get('directory', '')
 
@@ -722,8 +1189,60 @@ File: {track.file_path}"""
             logger.error(f"Error loading library from file: {e}")
             messagebox.showerror("Error", f"Failed to load library: {e}")
 
+    def _load_library_snapshot(self, file_path: str):
+        """Show the first page immediately, decode the rest in the background."""
+        try:
+            snapshot = LibrarySnapshot(file_path)
+        except Exception as e:
+            logger.error(f"Error loading library snapshot: {e}")
+            messagebox.showerror("Error", f"Failed to load library: {e}")
+            return
+
+        first_page = snapshot.tracks(0, self.snapshot_first_page)
+        snapshot_index = self.search_index = LibrarySearchIndex(first_page)
+        self.tracks = self.search_index.tracks
+        self.current_directory = snapshot.directory
+        self._apply_filters()
+        self.status_label.configure(text=f"Loading {len(snapshot)} tracks...")
+
+        def decode_rest():
+            try:
+                for batch in snapshot.iter_batches(self.snapshot_batch_size, start=len(first_page)):
+                    if self.search_index is not snapshot_index:
+                        break  # Replaced by another load/scan: stop decoding
+                    self._on_scan_batch(batch, snapshot_index)
+            finally:
+                total = len(snapshot)
+                snapshot.close()
+                self.task_manager.schedule_gui_update(self._snapshot_loaded, file_path, total, snapshot_index)
+
+        self.task_manager.submit_background_task('library_load', decode_rest)
+
+    def _snapshot_loaded(self, file_path: str, total: int, snapshot_index: LibrarySearchIndex):
+        if self.search_index is not snapshot_index:
+            logger.info(f"Library snapshot {file_path} superseded before it finished loading")
+            return
+        if self._scan_refresh_after_id is not None:
+            self.frame.after_cancel(self._scan_refresh_after_id)
+            self._scan_refresh_after_id = None
+
+        self._apply_filters(keep_position=True)
+        self._update_genre_filter()
+        self.status_label.configure(text=f"Loaded {len(self.tracks)} tracks from file")
+        logger.info(f"Loaded library snapshot {file_path}: {len(self.tracks)}/{total} tracks")
+
     def save_library_to_file(self, file_path: str):
-        """Save library to file."""
+        """Save library as a compact binary snapshot."""
+        try:
+            write_library_snapshot(file_path, self.tracks, self.current_directory)
+            logger.info(f"Saved library to {file_path}: {len(self.tracks)} tracks")
+
+        except Exception as e:
+            logger.error(f"Error saving library to file: {e}")
+            messagebox.showerror("Error", f"Failed to save library: {e}")
+
+    def export_library_to_json(self, file_path: str):
+        """Export library as JSON (interchange format)."""
         try:
             data = {
                 'directory': self.current_directory,
@@ -746,11 +1265,11 @@ File: {track.file_path}"""
             with open(file_path, 'w') as f:
                 json.dump(data, f, indent=2)
 
-            logger.info(f"Saved library to {file_path}: {len(self.tracks)} tracks")
+            logger.info(f"Exported library to {file_path}: {len(self.tracks)} tracks")
 
         except Exception as e:
-            logger.error(f"Error saving library to file: {e}")
-            messagebox.showerror("Error", f"Failed to save library: {e}")
+            logger.error(f"Error exporting library to JSON: {e}")
+            messagebox.showerror("Error", f"Failed to export library: {e}")
 
     def get_frame(self) -> ttk.Frame:
         """Get the main browser frame."""
@@ -772,6 +1291,11 @@ File: {track.file_path}"""
         # Stop monitoring tasks
         self.task_manager.stop_periodic_task('monitor_scan')
 
+        for after_id in (self._filter_after_id, self._scan_refresh_after_id):
+            if after_id is not None:
+                self.frame.after_cancel(after_id)
+        self._filter_after_id = self._scan_refresh_after_id = None
+
         logger.info("Music Library Browser cleanup complete")
 
 
@@ -0,0 +1,225 @@
+"""
+Library Snapshot
+Compact columnar binary format for saving/loading the music library.
+
+Layout (little-endian, sections padded to 8 bytes):
+    header      magic, version, track count, string count, directory string id
+    offsets     uint32[string_count + 1] into the string blob
+    blob        UTF-8 bytes of all interned strings
+    columns     uint32[count] string ids for each of STRING_FIELDS,
+                float64[count] bpm, float64[count] duration, uint8[count] energy
+
+The file is memory-mapped and tracks are decoded on demand, so the first
+page can be shown before the rest of the snapshot is read.
+"""
+
+import os
+import sys
+import mmap
+import array
+import struct
+import logging
+from typing import List, Dict, Iterator, Optional
+
+from .state_manager import TrackInfo
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'DJLS'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIII')  # magic, version, reserved, count, string_count, directory id
+
+STRING_FIELDS = ('title', 'artist', 'album', 'genre', 'file_path', 'key')
+NUMERIC_FIELDS = (('bpm', 'd'), ('duration', 'd'), ('energy', 'B'))
+
+
+def _padding(size: int) -> bytes:
+    return b'\0' * (-size % 8)
+
+
+def _le_bytes(values: array.array) -> bytes:
+    if sys.byteorder != 'little':
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def is_library_snapshot(file_path: str) -> bool:
+    """True if the file starts with the snapshot magic"""
+    try:
+        with open(file_path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_library_snapshot(file_path: str, tracks: List[TrackInfo], directory: str = "") -> None:
+    """Write tracks as a columnar snapshot (atomic: tmp file + replace)."""
+    strings: Dict[str, int] = {}
+
+    def intern(value: Optional[str]) -> int:
+        value = value or ""
+        string_id = strings.get(value)
+        if string_id is None:
+            string_id = strings[value] = len(strings)
+        return string_id
+
+    directory_id = intern(directory)
+    string_columns = {field: array.array('I', (intern(getattr(track, field)) for track in tracks))
+                      for field in STRING_FIELDS}
+    numeric_columns = {
+        'bpm': array.array('d', (track.bpm or 0.0 for track in tracks)),
+        'duration': array.array('d', (track.duration or 0.0 for track in tracks)),
+        'energy': array.array('B', (min(255, max(0, int(track.energy or 0))) for track in tracks)),
+    }
+
+    encoded = [value.encode('utf-8') for value in strings]  # dict order == id order
+    offsets = array.array('I', [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    blob = b''.join(encoded)
+
+    sections = [HEADER.pack(MAGIC, VERSION, 0, len(tracks), len(strings), directory_id)]
+    sections.append(_le_bytes(offsets))
+    sections.append(blob)
+    for field in STRING_FIELDS:
+        sections.append(_le_bytes(string_columns[field]))
+    for field, _ in NUMERIC_FIELDS:
+        sections.append(_le_bytes(numeric_columns[field]))
+
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        for section in sections:
+            f.write(section)
+            f.write(_padding(len(section)))
+    os.replace(tmp_path, file_path)
+
+
+class LibrarySnapshot:
+    """
+    Lazy, memory-mapped reader for a library snapshot.
+
+    Columns are zero-copy views over the mapped file; a TrackInfo is only
+    built when it is accessed, and each interned string is decoded once.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            self._file.close()
+            raise ValueError(f"Not a library snapshot: {file_path}")
+        view = memoryview(self._map)
+
+        error = None
+        try:
+            self._parse(view)
+        except (struct.error, ValueError, IndexError, UnicodeDecodeError) as e:
+            # Truncated or corrupt file; close outside the handler so no frame keeps a view alive
+            error = str(e)
+        if error is not None:
+            view.release()
+            self.close()
+            raise ValueError(f"Corrupt library snapshot {file_path}: {error}")
+
+    def _parse(self, view: memoryview):
+        magic, version, _, count, string_count, directory_id = HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a library snapshot (or unsupported version)")
+        self.count = count
+
+        position = HEADER.size + len(_padding(HEADER.size))
+        self._offsets, position = self._column(view, position, 'I', string_count + 1)
+        blob_size = self._offsets[string_count]
+        if position + blob_size > len(view):
+            raise ValueError("string blob truncated")
+        self._blob = view[position:position + blob_size]
+        position += blob_size + len(_padding(blob_size))
+
+        self._columns = {}
+        for field in STRING_FIELDS:
+            self._columns[field], position = self._column(view, position, 'I', count)
+        for field, typecode in NUMERIC_FIELDS:
+            self._columns[field], position = self._column(view, position, typecode, count)
+
+        self._strings: Dict[int, str] = {}
+        self.directory = self._string(directory_id)
+
+    @staticmethod
+    def _column(view: memoryview, position: int, typecode: str, length: int):
+        size = array.array(typecode).itemsize * length
+        if position + size > len(view):
+            raise ValueError(f"column truncated at byte {position}")
+        raw = view[position:position + size]
+        if sys.byteorder == 'little':
+            column = raw.cast(typecode)
+        else:
+            column = array.array(typecode, raw.tobytes())
+            column.byteswap()
+        return column, position + size + len(_padding(size))
+
+    def _string(self, string_id: int) -> str:
+        value = self._strings.get(string_id)
+        if value is None:
+            start, end = self._offsets[string_id], self._offsets[string_id + 1]
+            value = self._strings[string_id] = str(self._blob[start:end], 'utf-8')
+        return value
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> TrackInfo:
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        columns = self._columns
+        values = {field: self._string(columns[field][index]) for field in STRING_FIELDS}
+        return TrackInfo(
+            bpm=columns['bpm'][index],
+            duration=columns['duration'][index],
+            energy=columns['energy'][index],
+            **values
+        )
+
+    def tracks(self, start: int = 0, stop: Optional[int] = None) -> List[TrackInfo]:
+        """Decode tracks [start, stop)"""
+        stop = self.count if stop is None else min(stop, self.count)
+        if start >= stop:
+            return []
+
+        # Column slices -> Python lists in bulk, then one pass to build the tracks
+        columns = self._columns
+        string_columns = [[self._string(string_id) for string_id in columns[field][start:stop].tolist()]
+                          for field in STRING_FIELDS]
+        numeric_columns = [columns[field][start:stop].tolist() for field, _ in NUMERIC_FIELDS]
+        return [
+            TrackInfo(title=title, artist=artist, album=album, genre=genre, file_path=file_path,
+                      key=key, bpm=bpm, duration=duration, energy=energy)
+            for title, artist, album, genre, file_path, key, bpm, duration, energy
+            in zip(*string_columns, *numeric_columns)
+        ]
+
+    def iter_batches(self, batch_size: int = 1000, start: int = 0) -> Iterator[List[TrackInfo]]:
+        for offset in range(start, self.count, batch_size):
+            yield self.tracks(offset, offset + batch_size)
+
+    def close(self):
+        """Release the mapping (views must not be used afterwards)"""
+        for column in getattr(self, '_columns', {}).values():
+            if isinstance(column, memoryview):
+                column.release()
+        for name in ('_offsets', '_blob'):
+            value = getattr(self, name, None)
+            if isinstance(value, memoryview):
+                value.release()
+        self._columns = {}
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
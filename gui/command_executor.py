@@ -6,11 +6,15 @@ Sistema di esecuzione comandi MIDI con verifica feedback da Traktor
 
 import time
 import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional, Dict, Any, Callable
 from dataclasses import dataclass
 from enum import Enum
 
 from traktor_control import TraktorController, DeckID
+from command_ack_tracker import AcknowledgementTracker, CommandTracking, CommandStatus as AckStatus
 
 # Import MIDI Communication Monitor for enhanced tracking
 try:
@@ -46,12 +50,28 @@ class CommandResult:
 class CommandExecutor:
     """
     Esecutore comandi con verifica feedback
+
+    - execute_*(): modalità sincrona (attende la verifica)
+    - submit_*(): modalità asincrona, restituisce un Future[CommandResult];
+      l'invio MIDI avviene su un worker dedicato e la verifica sugli eventi
+      di feedback di Traktor (AcknowledgementTracker), senza sleep
     """
 
-    def __init__(self, traktor_controller: TraktorController, use_midi_monitor: bool = True):
+    def __init__(self, traktor_controller: TraktorController, use_midi_monitor: bool = True,
+                 history_size: int = 200):
         self.controller = traktor_controller
         self.last_command_result: Optional[CommandResult] = None
-        self.command_history: list = []
+
+        # Cronologia a dimensione fissa + contatori incrementali per il success rate
+        self.command_history: deque = deque(maxlen=history_size)
+        self._history_lock = threading.Lock()
+        self._history_successful = 0
+
+        # Modalità asincrona: un worker per gli invii (ordine preservato), verifica su feedback
+        self._send_executor: Optional[ThreadPoolExecutor] = None
+        self.ack_tracker = AcknowledgementTracker(on_resolved=self._on_command_resolved)
+        if hasattr(traktor_controller, 'add_status_listener'):
+            traktor_controller.add_status_listener(self._on_status_feedback)
 
         # Configurazione
         self.verification_delay = 0.5  # Secondi da aspettare prima di verificare
@@ -82,8 +102,9 @@ class CommandExecutor:
         logger.info(f"🎵 Executing: {command_name}")
 
         # Start MIDI monitor tracking if available
+        cmd_id = None
         if self.midi_monitor:
-            self.midi_monitor.track_command(
+            cmd_id = self.midi_monitor.track_command(
                 command_name=command_name,
                 deck_id=deck.value,
                 expected_state="loaded=True",
@@ -124,8 +145,8 @@ class CommandExecutor:
 
         if not success:
             # Mark MIDI monitor as failed
-            if self.midi_monitor:
-                self.midi_monitor.mark_failed(last_error or "Unknown error")
+            if cmd_id is not None:
+                self.midi_monitor.mark_failed(last_error or "Unknown error", command_id=cmd_id)
 
             result = CommandResult(
                 status=CommandStatus.FAILED,
@@ -140,8 +161,7 @@ class CommandExecutor:
             if self.on_command_failed:
                 self.on_command_failed(result)
 
-            self.last_command_result = result
-            self.command_history.append(result)
+            self._record_result(result)
             return result
 
         # Comando inviato con successo - ORA VERIFICHIAMO
@@ -157,13 +177,13 @@ class CommandExecutor:
         verified, state_after = self._verify_load_track(deck, state_before)
 
         # Update MIDI monitor
-        if self.midi_monitor:
+        if cmd_id is not None:
             if verified:
-                self.midi_monitor.mark_verified()
+                self.midi_monitor.mark_verified(cmd_id)
             else:
                 # Check for timeout
-                if not self.midi_monitor.check_timeout():
-                    self.midi_monitor.mark_failed("Verification failed - track not loaded")
+                if not self.midi_monitor.check_timeout(cmd_id):
+                    self.midi_monitor.mark_failed("Verification failed - track not loaded", command_id=cmd_id)
 
         result = CommandResult(
             status=CommandStatus.SUCCESS if verified else CommandStatus.FAILED,
@@ -182,8 +202,7 @@ class CommandExecutor:
         elif not verified and self.on_command_failed:
             self.on_command_failed(result)
 
-        self.last_command_result = result
-        self.command_history.append(result)
+        self._record_result(result)
 
         return result
 
@@ -195,8 +214,9 @@ class CommandExecutor:
         logger.info(f"▶️ Executing: {command_name}")
 
         # Start MIDI monitor tracking
+        cmd_id = None
         if self.midi_monitor:
-            self.midi_monitor.track_command(
+            cmd_id = self.midi_monitor.track_command(
                 command_name=command_name,
                 deck_id=deck.value,
                 expected_state="playing=True",
@@ -237,8 +257,8 @@ class CommandExecutor:
 
         if not success:
             # Mark MIDI monitor as failed
-            if self.midi_monitor:
-                self.midi_monitor.mark_failed(last_error or "Unknown error")
+            if cmd_id is not None:
+                self.midi_monitor.mark_failed(last_error or "Unknown error", command_id=cmd_id)
 
             result = CommandResult(
                 status=CommandStatus.FAILED,
@@ -253,8 +273,7 @@ class CommandExecutor:
             if self.on_command_failed:
                 self.on_command_failed(result)
 
-            self.last_command_result = result
-            self.command_history.append(result)
+            self._record_result(result)
             return result
 
         # Verifica esecuzione
@@ -268,12 +287,12 @@ class CommandExecutor:
         verified, state_after = self._verify_play_deck(deck, state_before)
 
         # Update MIDI monitor
-        if self.midi_monitor:
+        if cmd_id is not None:
             if verified:
-                self.midi_monitor.mark_verified()
+                self.midi_monitor.mark_verified(cmd_id)
             else:
-                if not self.midi_monitor.check_timeout():
-                    self.midi_monitor.mark_failed("Verification failed - deck not playing")
+                if not self.midi_monitor.check_timeout(cmd_id):
+                    self.midi_monitor.mark_failed("Verification failed - deck not playing", command_id=cmd_id)
 
         result = CommandResult(
             status=CommandStatus.SUCCESS if verified else CommandStatus.FAILED,
@@ -291,8 +310,7 @@ class CommandExecutor:
         elif not verified and self.on_command_failed:
             self.on_command_failed(result)
 
-        self.last_command_result = result
-        self.command_history.append(result)
+        self._record_result(result)
 
         return result
 
@@ -346,8 +364,7 @@ class CommandExecutor:
         elif not success and self.on_command_failed:
             self.on_command_failed(result)
 
-        self.last_command_result = result
-        self.command_history.append(result)
+        self._record_result(result)
 
         return result
 
@@ -361,6 +378,7 @@ class CommandExecutor:
                 'track_name': state.get('track_name'),
                 'track_id': state.get('track_id'),
                 'load_source_position': state.get('load_source_position'),
+                'load_count': state.get('load_count', 0),
                 'timestamp': time.time()
             }
         except Exception as e:
@@ -382,10 +400,7 @@ class CommandExecutor:
             track_id_before = state_before.get('track_id')
             track_id_after = state_after.get('track_id')
 
-            # Successo se:
-            # 1. Ora è loaded (anche se lo era prima, potrebbe essere nuova traccia)
-            # 2. Track ID è cambiato (nuova traccia)
-            verified = loaded_after and (track_id_after != track_id_before or track_id_after is not None)
+            verified = self._is_load_verified(state_before, state_after)
 
             logger.info(f"🔍 Verification: loaded_before={loaded_before}, loaded_after={loaded_after}")
             logger.info(f"🔍 Verification: track_id_before={track_id_before}, track_id_after={track_id_after}")
@@ -407,8 +422,7 @@ class CommandExecutor:
             playing_before = state_before.get('playing', False)
             playing_after = state_after.get('playing', False)
 
-            # Successo se ora sta suonando
-            verified = playing_after
+            verified = self._is_play_verified(state_before, state_after)
 
             logger.info(f"🔍 Verification: playing_before={playing_before}, playing_after={playing_after}")
             logger.info(f"🔍 Verification result: {'✅ VERIFIED' if verified else '❌ NOT VERIFIED'}")
@@ -419,26 +433,202 @@ class CommandExecutor:
             logger.error(f"❌ Error during verification: {e}")
             return False, {}
 
+    @staticmethod
+    def _is_load_verified(state_before: Dict, state_after: Dict) -> bool:
+        # Successo se:
+        # 1. Ora è loaded (anche se lo era prima, potrebbe essere nuova traccia)
+        # 2. Track ID è cambiato (nuova traccia)
+        track_id_after = state_after.get('track_id')
+        return bool(state_after.get('loaded', False) and
+                    (track_id_after != state_before.get('track_id') or track_id_after is not None))
+
+    @staticmethod
+    def _is_new_track_loaded(state_before: Dict, state_after: Dict) -> bool:
+        # Verifica asincrona: valutata anche subito dopo l'invio, quindi un deck
+        # già caricato conta solo se è stato registrato un nuovo load (load_count:
+        # track_name ha risoluzione di un secondo)
+        if not state_after.get('loaded', False):
+            return False
+        return state_after.get('load_count', 0) != state_before.get('load_count', 0)
+
+    @staticmethod
+    def _is_play_verified(state_before: Dict, state_after: Dict) -> bool:
+        # Successo se ora sta suonando
+        return bool(state_after.get('playing', False))
+
+    # ==========================================
+    # MODALITÀ ASINCRONA (Future + verifica su feedback)
+    # ==========================================
+
+    def submit_load_track(self, deck: DeckID, direction: str = "down") -> Future:
+        """Load track non bloccante: Future[CommandResult]"""
+        return self._submit(
+            f"Load Track to Deck {deck.value}", deck, "loaded=True",
+            send=lambda: self.controller.load_next_track_smart(deck, direction),
+            is_verified=self._is_new_track_loaded
+        )
+
+    def submit_play_deck(self, deck: DeckID) -> Future:
+        """Play deck non bloccante: Future[CommandResult]"""
+        return self._submit(
+            f"Play Deck {deck.value}", deck, "playing=True",
+            send=lambda: self.controller.play_deck(deck),
+            is_verified=self._is_play_verified
+        )
+
+    def submit_crossfader(self, position: float) -> Future:
+        """Crossfader non bloccante (nessuna verifica di stato)"""
+        return self._get_send_executor().submit(self.execute_crossfader, position)
+
+    def _get_send_executor(self) -> ThreadPoolExecutor:
+        if self._send_executor is None:
+            self._send_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="CommandSend")
+        return self._send_executor
+
+    def _submit(self, command_name: str, deck: DeckID, expected_state: str,
+                send: Callable[[], bool], is_verified: Callable[[Dict, Dict], bool]) -> Future:
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+        logger.info(f"📨 Submitting: {command_name}")
+
+        if self.on_command_start:
+            self.on_command_start(command_name)
+
+        def dispatch():
+            start_time = time.time()
+            state_before = self._capture_deck_state(deck)
+
+            # Retry solo su errore di invio: un reinvio non verificato caricherebbe
+            # un'altra traccia (load) o farebbe toggle (play)
+            success, last_error, retry_count = False, None, 0
+            while not success and retry_count <= self.max_retries:
+                try:
+                    if retry_count > 0:
+                        time.sleep(0.2)
+                    success = send()
+                    if not success:
+                        last_error = "Controller returned False"
+                except Exception as e:
+                    last_error = str(e)
+                retry_count += 1
+
+            if not success:
+                self._finish_async(future, CommandResult(
+                    status=CommandStatus.FAILED,
+                    command_name=command_name,
+                    execution_time_ms=(time.time() - start_time) * 1000,
+                    error=last_error,
+                    traktor_state_before=state_before,
+                    retry_count=retry_count - 1
+                ))
+                return
+
+            verify = lambda: is_verified(state_before, self._capture_deck_state(deck))
+            if self.midi_monitor:
+                # Stessa finestra del tracker dell'executor: nessun esito anticipato
+                self.midi_monitor.track_command(command_name, deck.value, expected_state,
+                                                timeout=self.verification_timeout, verify=verify,
+                                                retry_after=self.verification_timeout)
+
+            tracking = CommandTracking(
+                command_name=command_name,
+                deck_id=deck.value,
+                timestamp=start_time,
+                timeout_seconds=self.verification_timeout,
+                expected_state_change=expected_state,
+                verify=verify,
+                retry_after=self.verification_timeout,  # nessun reinvio: decide la deadline
+                params={'future': future, 'deck': deck, 'state_before': state_before,
+                        'retry_count': retry_count - 1}
+            )
+            self.ack_tracker.submit(tracking)
+            # Lo stato potrebbe essere già aggiornato
+            self.ack_tracker.process_feedback(deck.value)
+
+        self._get_send_executor().submit(dispatch)
+        return future
+
+    def _on_status_feedback(self, status_key: str, value: Any):
+        """Listener status Traktor (thread MIDI): verifica i comandi in volo"""
+        if self.ack_tracker.pending_count():
+            self.ack_tracker.process_feedback()
+
+    def _on_command_resolved(self, tracking: CommandTracking):
+        """Chiusura di un comando asincrono (feedback o deadline)"""
+        params = tracking.params
+        verified = tracking.status == AckStatus.VERIFIED
+        if verified:
+            status, error = CommandStatus.SUCCESS, None
+        elif tracking.status == AckStatus.TIMEOUT:
+            status, error = CommandStatus.TIMEOUT, f"Not verified within {tracking.timeout_seconds}s"
+        else:
+            status, error = CommandStatus.FAILED, tracking.error or "Verification failed"
+
+        self._finish_async(params['future'], CommandResult(
+            status=status,
+            command_name=tracking.command_name,
+            execution_time_ms=(tracking.resolved_at - tracking.timestamp) * 1000,
+            verified=verified,
+            error=error,
+            traktor_state_before=params['state_before'],
+            traktor_state_after=self._capture_deck_state(params['deck']),
+            retry_count=params['retry_count']
+        ))
+
+    def _finish_async(self, future: Future, result: CommandResult):
+        self._record_result(result)
+        try:
+            if result.verified and self.on_command_success:
+                self.on_command_success(result)
+            elif not result.verified and self.on_command_failed:
+                self.on_command_failed(result)
+        except Exception as e:
+            logger.warning(f"⚠️ Command callback error: {e}")
+        future.set_result(result)
+
+    def _record_result(self, result: CommandResult):
+        """Aggiunge alla cronologia (ring) aggiornando i contatori in O(1)"""
+        successful = result.status == CommandStatus.SUCCESS and result.verified
+        with self._history_lock:
+            if len(self.command_history) == self.command_history.maxlen:
+                evicted = self.command_history[0]
+                if evicted.status == CommandStatus.SUCCESS and evicted.verified:
+                    self._history_successful -= 1
+            self.command_history.append(result)
+            self._history_successful += successful
+            self.last_command_result = result
+
+    def shutdown(self):
+        """Ferma worker e tracker della modalità asincrona"""
+        if hasattr(self.controller, 'remove_status_listener'):
+            self.controller.remove_status_listener(self._on_status_feedback)
+        self.ack_tracker.stop()
+        if self._send_executor:
+            self._send_executor.shutdown(wait=False)
+            self._send_executor = None
+
     def get_last_result(self) -> Optional[CommandResult]:
         """Ottieni risultato ultimo comando"""
         return self.last_command_result
 
     def get_command_history(self, last_n: int = 10) -> list:
         """Ottieni cronologia comandi"""
-        return self.command_history[-last_n:]
+        with self._history_lock:
+            history = list(self.command_history)
+        return history[-last_n:]
 
     def get_success_rate(self) -> float:
-        """Calcola success rate comandi"""
-        if not self.command_history:
-            return 0.0
-
-        successful = sum(1 for cmd in self.command_history if cmd.status == CommandStatus.SUCCESS and cmd.verified)
-        return successful / len(self.command_history)
+        """Success rate sugli ultimi history_size comandi (contatori incrementali)"""
+        with self._history_lock:
+            total = len(self.command_history)
+            return self._history_successful / total if total else 0.0
 
     def reset_history(self):
         """Reset cronologia"""
-        self.command_history.clear()
-        self.last_command_result = None
+        with self._history_lock:
+            self.command_history.clear()
+            self._history_successful = 0
+            self.last_command_result = None
         if self.midi_monitor:
             self.midi_monitor.reset_stats()
 
@@ -18,11 +18,53 @@ import json
 from config import DJConfig, VENUE_TYPES, EVENT_TYPES, get_config, check_system_requirements
 from core.openrouter_client import OpenRouterClient, DJContext, get_openrouter_client
 from core.persistent_config import get_persistent_settings
-from traktor_control import TraktorController, get_traktor_controller, DeckID
+from traktor_control import TraktorController, get_traktor_controller, DeckID, TrackedState
 from music_library import MusicLibraryScanner, get_music_scanner
+from gui.workflow_scheduler import WorkflowScheduler, Workflow, WorkflowState, WaitFor
+from gui.status_feed import StatusFeed
+from dj_gui.utils.threading_utils import GUIUpdater
 
 logger = logging.getLogger(__name__)
 
+# complex_workflow -> (deck da caricare, mixing_mode, crossfader_target di default)
+MIXING_WORKFLOWS = {
+    "load_B_and_mix": ("B", "A_to_B", 127),
+    "load_A_and_mix": ("A", "B_to_A", 0),
+}
+
+_RULE = "━━━━━━━━━━━━━━━━━"
+
+# Pannello status: righe statiche o (etichetta, campo, formatter)
+STATUS_LAYOUT = [
+    "",
+    "🎛️ TRAKTOR STATUS",
+    _RULE,
+    ("Deck A BPM: ", 'deck_a_bpm', lambda v: f"{v:.1f}"),
+    ("Deck B BPM: ", 'deck_b_bpm', lambda v: f"{v:.1f}"),
+    ("Posizione A: ", 'deck_a_position', lambda v: f"{v:.2%}"),
+    ("Posizione B: ", 'deck_b_position', lambda v: f"{v:.2%}"),
+    ("Crossfader: ", 'crossfader_position', lambda v: f"{v}/127"),
+    "",
+    "📊 SESSIONE",
+    _RULE,
+    ("Tempo: ", 'uptime', lambda v: f"{v} min"),
+    ("Brani mixati: ", 'tracks_mixed', str),
+    ("Decisioni AI: ", 'ai_decisions', str),
+    ("Override manuali: ", 'manual_overrides', str),
+    "",
+    "🎵 CONTESTO DJ",
+    _RULE,
+    ("Venue: ", 'venue_type', str),
+    ("Evento: ", 'event_type', str),
+    ("Energia: ", 'energy_level', lambda v: f"{v}/10"),
+    ("Genere: ", 'current_genre', str),
+    ("AI Attivo: ", 'ai_enabled', lambda v: '✅' if v else '❌'),
+]
+
+STATUS_FORMATTERS = {item[1]: item[2] for item in STATUS_LAYOUT if isinstance(item, tuple)}
+TRAKTOR_STATUS_FIELDS = ('deck_a_bpm', 'deck_b_bpm', 'deck_a_position', 'deck_b_position', 'crossfader_position')
+SESSION_STATUS_FIELDS = ('tracks_mixed', 'ai_decisions', 'manual_overrides')
+
 class DJInterface:
     """Interfaccia DJ AI unificata"""
 
@@ -58,20 +100,39 @@ class DJInterface:
 
         # Threading
         self.ai_thread: Optional[threading.Thread] = None
-        self.update_thread: Optional[threading.Thread] = None
         self.running = True
 
-        # Statistiche
-        self.stats = {
+        # Status push-based: eventi tipizzati -> render diff una volta per frame
+        self.status_feed: Optional[StatusFeed] = None  # Creato all'avvio sessione
+        self._rendered_status: Dict[str, str] = {}
+        self._status_panel_built = False
+        self._session_clock_after_id = None
+
+        # Workflow multi-step (load/play/crossfade) fuori dal thread UI
+        self.workflows = WorkflowScheduler(on_update=self._on_workflow_update)
+        self._load_lock = threading.Lock()  # Navigazione browser Traktor: un load alla volta
+        self._workflow_render_pending = False
+        self.track_ready_delay = 2.0       # Attesa caricamento traccia in Traktor
+        self.deck_stabilize_delay = 1.0    # Attesa dopo play prima del crossfade
+        self.load_verify_timeout = 2.0
+        self.play_verify_timeout = 1.5
+        self.crossfade_steps = 5
+        self.crossfade_step_delay = 0.8    # 800ms between steps
+
+        # Statistiche (ogni modifica pubblica i campi sessione)
+        self.stats = TrackedState(self._publish_session_stats, {
             'session_start': 0.0,
             'tracks_mixed': 0,
             'ai_decisions': 0,
             'manual_overrides': 0
-        }
+        })
 
         self._create_interface()
         self._setup_bindings()
 
+        # Aggiornamenti GUI dai thread worker
+        self.gui_updater = GUIUpdater(self.root)
+
         # Controllo sistema all'avvio
         self.root.after(100, self._check_system)
 
@@ -365,6 +426,12 @@ class DJInterface:
                                                 font=('Arial', 9))
         self.connection_status_label.pack(side=tk.LEFT, padx=(20, 0))
 
+        # Workflow attivi (center)
+        self.workflow_status_var = tk.StringVar(value="🎛️ Workflow: --")
+        self.workflow_status_label = ttk.Label(status_content, textvariable=self.workflow_status_var,
+                                              font=('Arial', 9))
+        self.workflow_status_label.pack(side=tk.LEFT, padx=(20, 0))
+
         # Performance info (right)
         self.perf_status_var = tk.StringVar(value="⏱️ Latenza: -- ms")
         self.perf_status_label = ttk.Label(status_content, textvariable=self.perf_status_var,
@@ -559,8 +626,8 @@ class DJInterface:
             # Aggiorna GUI
             self.root.after(0, self._on_system_ready)
 
-            # Avvia loop aggiornamenti
-            self._start_update_loop()
+            # Avvia aggiornamenti status push-based
+            self.gui_updater.schedule_update(self._start_status_feed)
 
         except Exception as e:
             error_msg = str(e)
@@ -607,63 +674,113 @@ class DJInterface:
         self.start_button.config(text="🚀 AVVIA DJ AI", state=tk.NORMAL)
         messagebox.showerror("Errore Sistema", error)
 
-    def _start_update_loop(self):
-        """Avvia loop di aggiornamento"""
-        self.update_thread = threading.Thread(target=self._update_loop, daemon=True)
-        self.update_thread.start()
-
-    def _update_loop(self):
-        """Loop di aggiornamento continuo"""
-        while self.running and self.session_active:
-            try:
-                if self.traktor_controller:
-                    # Aggiorna status Traktor
-                    status = self.traktor_controller.get_status()
+    # ========================================
+    # STATUS PUSH-BASED (StatusFeed)
+    # ========================================
 
-                    # Aggiorna context
-                    self.dj_context.current_bpm = status.deck_a_bpm
-                    self.dj_context.time_in_set = int((time.time() - self.stats['session_start']) / 60)
+    def _start_status_feed(self):
+        """Sottoscrivi i feedback del controller e pubblica lo stato iniziale (thread UI)"""
+        if self.status_feed is None:
+            # Un render per tick del GUI updater (~60 FPS), solo se qualcosa è cambiato
+            self.status_feed = StatusFeed(lambda: self.gui_updater.schedule_update(self._render_status_frame))
 
-                    # Aggiorna GUI
-                    self.root.after(0, lambda: self._update_status_display(status))
+        if self.traktor_controller:
+            self.traktor_controller.add_status_listener(self._on_traktor_status)
+            status = self.traktor_controller.get_status()
+            self.dj_context.current_bpm = status.deck_a_bpm
+            self.status_feed.publish_many('traktor', {
+                field_name: getattr(status, field_name) for field_name in TRAKTOR_STATUS_FIELDS
+            })
+
+        self._publish_session_stats()
+        self._publish_context()
+        self._tick_session_clock()
+
+    def _stop_status_feed(self):
+        if self.traktor_controller:
+            self.traktor_controller.remove_status_listener(self._on_traktor_status)
+        if self._session_clock_after_id:
+            self.root.after_cancel(self._session_clock_after_id)
+            self._session_clock_after_id = None
+
+    def _on_traktor_status(self, status_key: str, value: Any):
+        """Feedback Traktor (thread MIDI): solo publish, nessun accesso a Tk"""
+        if status_key == 'deck_a_bpm':
+            self.dj_context.current_bpm = value
+        if status_key in STATUS_FORMATTERS and self.status_feed:
+            self.status_feed.publish('traktor', status_key, value)
+
+    def _publish_session_stats(self):
+        if self.status_feed:
+            self.status_feed.publish_many('session', {
+                field_name: self.stats[field_name] for field_name in SESSION_STATUS_FIELDS
+            })
+
+    def _publish_context(self):
+        """Pubblica il contesto DJ (dopo ogni modifica di dj_context / ai_enabled)"""
+        if self.status_feed:
+            self.status_feed.publish_many('context', {
+                'venue_type': self.dj_context.venue_type,
+                'event_type': self.dj_context.event_type,
+                'energy_level': self.dj_context.energy_level,
+                'current_genre': self.dj_context.current_genre,
+                'ai_enabled': self.ai_enabled,
+            })
+
+    def _tick_session_clock(self):
+        """Tempo sessione: un evento per minuto, programmato al cambio di minuto"""
+        self._session_clock_after_id = None
+        if not self.running or not self.session_active or not self.stats['session_start']:
+            return
 
-                time.sleep(1)
+        elapsed = time.time() - self.stats['session_start']
+        uptime = int(elapsed / 60)
+        self.dj_context.time_in_set = uptime
+        self.status_feed.publish('session', 'uptime', uptime)
 
-            except Exception as e:
-                logger.error(f"Errore update loop: {e}")
-                time.sleep(5)
-
-    def _update_status_display(self, status):
-        """Aggiorna display status"""
-        uptime = int((time.time() - self.stats['session_start']) / 60) if self.stats['session_start'] else 0
-
-        status_info = f"""
-🎛️ TRAKTOR STATUS
-━━━━━━━━━━━━━━━━━
-Deck A BPM: {status.deck_a_bpm:.1f}
-Deck B BPM: {status.deck_b_bpm:.1f}
-Posizione A: {status.deck_a_position:.2%}
-Posizione B: {status.deck_b_position:.2%}
-Crossfader: {status.crossfader_position}/127
-
-📊 SESSIONE
-━━━━━━━━━━━━━━━━━
-Tempo: {uptime} min
-Brani mixati: {self.stats['tracks_mixed']}
-Decisioni AI: {self.stats['ai_decisions']}
-Override manuali: {self.stats['manual_overrides']}
-
-🎵 CONTESTO DJ
-━━━━━━━━━━━━━━━━━
-Venue: {self.dj_context.venue_type}
-Evento: {self.dj_context.event_type}
-Energia: {self.dj_context.energy_level}/10
-Genere: {self.dj_context.current_genre}
-AI Attivo: {'✅' if self.ai_enabled else '❌'}
-"""
+        next_minute_ms = int((60 - elapsed % 60) * 1000) + 1
+        self._session_clock_after_id = self.root.after(next_minute_ms, self._tick_session_clock)
 
+    def _build_status_panel(self):
+        """Testo statico del pannello, una volta; ogni valore ha un tag 'status_<campo>'"""
         self.status_text.delete(1.0, tk.END)
-        self.status_text.insert(tk.END, status_info)
+        for item in STATUS_LAYOUT:
+            if isinstance(item, tuple):
+                label, field_name, _ = item
+                self.status_text.insert(tk.END, label)
+                self.status_text.insert(tk.END, "--", f"status_{field_name}")
+                self.status_text.insert(tk.END, "\n")
+            else:
+                self.status_text.insert(tk.END, f"{item}\n")
+        self._rendered_status.clear()
+        self._status_panel_built = True
+
+    def _render_status_frame(self):
+        """Frame: applica solo i campi il cui testo è cambiato dall'ultimo render"""
+        if not self.status_feed:
+            return
+        changes = self.status_feed.drain()
+        if not self._status_panel_built:
+            self._build_status_panel()
+
+        for change in changes:
+            formatter = STATUS_FORMATTERS.get(change.field)
+            if formatter is None:
+                continue
+            try:
+                text = formatter(change.value) or "--"
+            except (TypeError, ValueError):
+                text = str(change.value)
+            if self._rendered_status.get(change.field) == text:
+                continue
+
+            tag = f"status_{change.field}"
+            ranges = self.status_text.tag_ranges(tag)
+            if not ranges:
+                continue
+            self.status_text.delete(ranges[0], ranges[1])
+            self.status_text.insert(ranges[0], text, tag)
+            self._rendered_status[change.field] = text
 
     def _deck_control(self, action: str, deck: str):
         """Controllo deck manuale"""
@@ -693,6 +810,7 @@ AI Attivo: {'✅' if self.ai_enabled else '❌'}
         """Cambio energia"""
         energy = int(float(value))
         self.dj_context.energy_level = energy
+        self._publish_context()
 
         # Save to persistent settings
         if hasattr(self.persistent_settings, 'default_energy_level'):
@@ -809,10 +927,16 @@ AI Attivo: {'✅' if self.ai_enabled else '❌'}
 
         status = "ON" if self.ai_enabled else "OFF"
         self.ai_toggle_btn.config(text=f"🤖 AI: {status}")
+        self._publish_context()
         self._log_status(f"🤖 AI controllo: {status}")
 
     def _emergency_stop(self):
         """Emergency stop"""
+        # Nessun passo successivo dei workflow in corso (es. crossfade)
+        cancelled = self.workflows.cancel_all()
+        if cancelled:
+            self._log_status(f"⏹️ {cancelled} workflow cancellati")
+
         if self.traktor_controller:
             self.traktor_controller.emergency_stop()
 
@@ -866,6 +990,7 @@ AI Attivo: {'✅' if self.ai_enabled else '❌'}
             # Aggiorna contesto DJ con info attuali
             self.dj_context.time_in_set = time_in_set
             self.dj_context.energy_level = self.energy_var.get()
+            self._publish_context()
 
             # Query intelligente basata sul momento del set
             if time_in_set < 30:  # Primo 30 minuti - warm up
@@ -925,6 +1050,7 @@ AI Attivo: {'✅' if self.ai_enabled else '❌'}
                 new_energy = max(1, min(10, new_energy))
                 self.energy_var.set(new_energy)
                 self.dj_context.energy_level = new_energy
+                self._publish_context()
                 self._log_status(f"🎵 Auto-Mix: Energia aggiornata a {new_energy}/10")
 
             # Cambiamenti BPM suggeriti
@@ -942,19 +1068,16 @@ AI Attivo: {'✅' if self.ai_enabled else '❌'}
 
             # Caricamento tracce automatico
             if "load_track" in decision and self.traktor_controller:
-                from traktor_control import DeckID
                 deck_letter = decision["load_track"].upper()
                 if deck_letter in ["A", "B", "C", "D"]:
-                    deck = DeckID(deck_letter)
                     direction = decision.get("browse_direction", "down")
 
-                    # Carica nuova traccia nel deck specificato
-                    success = self.traktor_controller.load_next_track_smart(deck, direction)
-                    if success:
-                        self._log_status(f"🎵 Auto-Mix: Traccia caricata nel Deck {deck_letter}")
-                        self._add_chat_message("Auto-Mix AI", f"🎵 Nuova traccia caricata nel Deck {deck_letter}")
-                    else:
-                        self._log_status(f"❌ Auto-Mix: Errore caricamento Deck {deck_letter}")
+                    # Carica nuova traccia nel deck specificato (fuori dal thread UI)
+                    self.workflows.submit(
+                        f"Auto-Mix Load {deck_letter}",
+                        lambda workflow: self._load_steps(workflow, deck_letter, direction),
+                        key=f"deck_{deck_letter}"
+                    )
 
             # Controlli di volume e crossfader automatici
             if "crossfader_move" in decision and self.traktor_controller:
@@ -1095,331 +1218,374 @@ AI Attivo: {'✅' if self.ai_enabled else '❌'}
             import traceback
             traceback.print_exc()
 
+    # ========================================
+    # WORKFLOW A PASSI (WorkflowScheduler)
+    # ========================================
+
+    def _workflow_progress(self, workflow: Workflow, message: str):
+        """Log + progresso del workflow (renderizzato via GUI updater)"""
+        self._log_status(message)
+        workflow.report(message)
+
+    def _post_chat(self, sender: str, message: str):
+        """Messaggio chat da thread worker"""
+        self.gui_updater.schedule_update(self._add_chat_message, sender, message)
+
+    def _on_workflow_update(self, workflow: Workflow):
+        """Callback scheduler (thread worker/timer): coalescing del render"""
+        if workflow.state == WorkflowState.FAILED:
+            self._log_status(f"❌ Errore workflow {workflow.name}: {workflow.error}")
+        if not self._workflow_render_pending:
+            self._workflow_render_pending = True
+            self.gui_updater.schedule_update(self._render_workflow_status)
+
+    def _render_workflow_status(self):
+        """Aggiorna status bar con i workflow attivi (thread UI)"""
+        self._workflow_render_pending = False
+        active = self.workflows.get_stats()['active']
+        if not active:
+            text = "🎛️ Workflow: --"
+        elif len(active) == 1:
+            text = f"🎛️ {active[0]['name']}: {active[0]['status'] or active[0]['state']}"
+        else:
+            text = f"🎛️ {len(active)} workflow attivi: " + ", ".join(w['name'] for w in active)
+        self.workflow_status_var.set(text[:90])
+
     def _execute_load_and_play_workflow(self, decision: Dict[str, Any]):
-        """Esegui workflow load+play con timing corretto"""
-        try:
-            from traktor_control import DeckID
+        """Esegui workflow load+play con timing corretto (non bloccante)"""
+        deck_letter = decision["load_track"].upper()
+        if deck_letter not in ["A", "B", "C", "D"]:
+            self._log_status(f"❌ Invalid deck letter: {deck_letter}")
+            return
 
-            # Step 1: Load track
-            deck_letter = decision["load_track"].upper()
-            if deck_letter not in ["A", "B", "C", "D"]:
-                self._log_status(f"❌ Invalid deck letter: {deck_letter}")
-                return
+        play_deck_letter = decision.get("play_deck", deck_letter).upper()
+        direction = decision.get("browse_direction", "down")
+        self.workflows.submit(
+            f"Load+Play {deck_letter}",
+            lambda workflow: self._load_and_play_steps(workflow, deck_letter, play_deck_letter, direction),
+            key=f"deck_{deck_letter}"
+        )
 
-            deck = DeckID(deck_letter)
-            direction = decision.get("browse_direction", "down")
+    def _load_and_play_steps(self, workflow: Workflow, deck_letter: str, play_deck_letter: str, direction: str):
+        """Passi load+play: load -> attesa track ready -> play"""
+        deck = DeckID(deck_letter)
 
-            self._log_status(f"🎵 STEP 1: Loading track to Deck {deck_letter}...")
+        # Step 1: Load track
+        self._workflow_progress(workflow, f"🎵 STEP 1: Loading track to Deck {deck_letter}...")
+        with self._load_lock:
             load_success = self.traktor_controller.load_next_track_smart(deck, direction)
 
-            if not load_success:
-                self._log_status(f"❌ Load failed - aborting workflow")
-                return
-
-            self._log_status(f"✅ Track loaded to Deck {deck_letter}")
-            self._add_chat_message("Sistema", f"🎵 Traccia caricata nel Deck {deck_letter}")
+        if not load_success:
+            self._workflow_progress(workflow, f"❌ Load failed - aborting workflow")
+            return False
 
-            # Step 2: Wait for track to be ready
-            self._log_status(f"⏱️ STEP 2: Waiting for track to be ready (2s delay)...")
-            import time
-            time.sleep(2.0)  # Give Traktor time to load the track
+        self._log_status(f"✅ Track loaded to Deck {deck_letter}")
+        self._post_chat("Sistema", f"🎵 Traccia caricata nel Deck {deck_letter}")
 
-            # Step 3: Execute play command
-            play_deck_letter = deck_letter
-            if "play_deck" in decision:
-                play_deck_letter = decision["play_deck"].upper()
+        # Step 2: Wait for track to be ready
+        self._workflow_progress(workflow, f"⏱️ STEP 2: Waiting for track to be ready ({self.track_ready_delay:.0f}s delay)...")
+        yield self.track_ready_delay  # Give Traktor time to load the track
 
-            if play_deck_letter == deck_letter:
-                self._log_status(f"▶️ STEP 3: Playing loaded track in Deck {deck_letter}...")
-                play_success = self.traktor_controller.play_deck(deck)
+        # Step 3: Execute play command
+        if play_deck_letter != deck_letter:
+            self._workflow_progress(workflow, f"⚠️ Play target ({play_deck_letter}) != Load target ({deck_letter})")
+            return False
 
-                if play_success:
-                    self._log_status(f"🎉 WORKFLOW SUCCESS: Deck {deck_letter} loaded and playing!")
-                    self._add_chat_message("Sistema", f"🎉 Deck {deck_letter} caricato e in riproduzione!")
-                else:
-                    self._log_status(f"❌ Play failed after successful load")
-                    self._add_chat_message("Sistema", f"⚠️ Traccia caricata ma play fallito in Deck {deck_letter}")
-            else:
-                self._log_status(f"⚠️ Play target ({play_deck_letter}) != Load target ({deck_letter})")
+        self._workflow_progress(workflow, f"▶️ STEP 3: Playing loaded track in Deck {deck_letter}...")
+        play_success = self.traktor_controller.play_deck(deck)
 
-        except Exception as e:
-            self._log_status(f"❌ Errore workflow load+play: {e}")
-            import traceback
-            traceback.print_exc()
+        if play_success:
+            self._log_status(f"🎉 WORKFLOW SUCCESS: Deck {deck_letter} loaded and playing!")
+            self._post_chat("Sistema", f"🎉 Deck {deck_letter} caricato e in riproduzione!")
+        else:
+            self._log_status(f"❌ Play failed after successful load")
+            self._post_chat("Sistema", f"⚠️ Traccia caricata ma play fallito in Deck {deck_letter}")
+        return play_success
 
     def _execute_load_command(self, decision: Dict[str, Any]):
-        """Esegui solo comando load con MIDI monitoring"""
-        try:
-            from traktor_control import DeckID
-            deck_letter = decision["load_track"].upper()
-            self._log_status(f"🎵 AI wants to load track in Deck {deck_letter}")
-
-            if deck_letter in ["A", "B", "C", "D"]:
-                deck = DeckID(deck_letter)
-                direction = decision.get("browse_direction", "down")
-
-                # NUOVO: Track comando con MIDI monitor
-                if self.midi_monitor:
-                    self.midi_monitor.track_command(
-                        command_name=f"Load Track",
-                        deck_id=deck_letter,
-                        expected_state="loaded=True",
-                        timeout=2.0
-                    )
-
-                self._log_status(f"🎵 Loading track to Deck {deck_letter} via MIDI...")
-                success = self.traktor_controller.load_next_track_smart(deck, direction)
+        """Esegui solo comando load con MIDI monitoring (non bloccante)"""
+        deck_letter = decision["load_track"].upper()
+        self._log_status(f"🎵 AI wants to load track in Deck {deck_letter}")
 
-                if success:
-                    # Wait per Traktor processing
-                    time.sleep(0.5)
-
-                    # Verifica se track effettivamente caricata
-                    deck_state = self.traktor_controller.deck_states.get(deck, {})
-                    if deck_state.get('loaded'):
-                        if self.midi_monitor:
-                            self.midi_monitor.mark_verified()
-                        self._log_status(f"✅ Track loaded to Deck {deck_letter} successfully!")
-                        self._add_chat_message("Sistema", f"🎵 Traccia caricata nel Deck {deck_letter}")
-                    else:
-                        # Comando inviato ma verifica fallita
-                        self._log_status(f"⚠️ MIDI sent but track not loaded in Deck {deck_letter}")
-                        self._add_chat_message("Sistema", f"⚠️ Traccia non caricata (timeout)")
-                else:
-                    if self.midi_monitor:
-                        self.midi_monitor.mark_failed("MIDI send failed")
-                    self._log_status(f"❌ Failed to load track to Deck {deck_letter}")
-            else:
-                self._log_status(f"❌ Invalid deck letter: {deck_letter}")
-        except Exception as e:
-            if self.midi_monitor:
-                self.midi_monitor.mark_failed(str(e))
-            self._log_status(f"❌ Errore load command: {e}")
+        if deck_letter not in ["A", "B", "C", "D"]:
+            self._log_status(f"❌ Invalid deck letter: {deck_letter}")
+            return
 
-    def _execute_play_command(self, decision: Dict[str, Any]):
-        """Esegui solo comando play con MIDI monitoring"""
-        try:
-            from traktor_control import DeckID
+        direction = decision.get("browse_direction", "down")
+        self.workflows.submit(
+            f"Load {deck_letter}",
+            lambda workflow: self._load_steps(workflow, deck_letter, direction),
+            key=f"deck_{deck_letter}"
+        )
 
-            # Play specific deck
-            if "play_deck" in decision:
-                deck_letter = decision["play_deck"].upper()
-                self._log_status(f"▶️ AI wants to play Deck {deck_letter}")
+    def _load_steps(self, workflow: Workflow, deck_letter: str, direction: str):
+        """Passi load: invio MIDI -> attesa nuova traccia nel deck (o timeout)"""
+        deck = DeckID(deck_letter)
+
+        # Traccia nel deck prima del comando: la verifica attende che cambi
+        before = self._loaded_track(deck)
+
+        # NUOVO: Track comando con MIDI monitor
+        cmd_id = None
+        if self.midi_monitor:
+            cmd_id = self.midi_monitor.track_command(
+                command_name=f"Load Track",
+                deck_id=deck_letter,
+                expected_state="loaded=True",
+                timeout=self.load_verify_timeout
+            )
 
-                if deck_letter in ["A", "B", "C", "D"]:
-                    deck = DeckID(deck_letter)
+        self._workflow_progress(workflow, f"🎵 Loading track to Deck {deck_letter} via MIDI...")
+        try:
+            with self._load_lock:
+                success = self.traktor_controller.load_next_track_smart(deck, direction)
+        except Exception as e:
+            if cmd_id is not None:
+                self.midi_monitor.mark_failed(str(e), command_id=cmd_id)
+            raise
+
+        if not success:
+            if cmd_id is not None:
+                self.midi_monitor.mark_failed("MIDI send failed", command_id=cmd_id)
+            self._workflow_progress(workflow, f"❌ Failed to load track to Deck {deck_letter}")
+            return False
+
+        # Verifica se una nuova traccia è effettivamente caricata
+        workflow.report(f"⏱️ Verifying Deck {deck_letter} loaded...")
+        loaded = yield WaitFor(
+            lambda: self._deck_state(deck).get('loaded') and self._loaded_track(deck) != before,
+            timeout=self.load_verify_timeout
+        )
 
-                    # Check if deck has a track loaded (via internal state)
-                    if hasattr(self.traktor_controller, 'deck_states'):
-                        deck_state = self.traktor_controller.deck_states.get(deck, {})
-                        if not deck_state.get('loaded', True):  # Assume loaded if no state
-                            self._log_status(f"⚠️ Warning: Deck {deck_letter} may not have a track loaded")
+        if loaded:
+            if cmd_id is not None:
+                self.midi_monitor.mark_verified(command_id=cmd_id)
+            self._log_status(f"✅ Track loaded to Deck {deck_letter} successfully!")
+            self._post_chat("Sistema", f"🎵 Traccia caricata nel Deck {deck_letter}")
+        else:
+            # Comando inviato ma verifica fallita
+            self._resolve_unverified(cmd_id, "Verification failed - track not loaded")
+            self._log_status(f"⚠️ MIDI sent but track not loaded in Deck {deck_letter}")
+            self._post_chat("Sistema", f"⚠️ Traccia non caricata (timeout)")
+        return loaded
+
+    def _loaded_track(self, deck: DeckID) -> tuple:
+        # load_count distingue anche due load nello stesso secondo (track_name no)
+        state = self._deck_state(deck)
+        return state.get('load_count', 0), state.get('track_id'), state.get('track_name')
+
+    def _resolve_unverified(self, cmd_id: Optional[int], error: str):
+        """Verifica scaduta: chiudi il comando tracciato (timeout, altrimenti failed)"""
+        if cmd_id is not None and not self.midi_monitor.check_timeout(command_id=cmd_id):
+            self.midi_monitor.mark_failed(error, command_id=cmd_id)
 
-                    # NUOVO: Track comando con MIDI monitor
-                    if self.midi_monitor:
-                        self.midi_monitor.track_command(
-                            command_name=f"Play Deck",
-                            deck_id=deck_letter,
-                            expected_state="playing=True",
-                            timeout=1.5
-                        )
+    def _execute_play_command(self, decision: Dict[str, Any]):
+        """Esegui solo comando play con MIDI monitoring (non bloccante)"""
+        # Play specific deck
+        if "play_deck" in decision:
+            deck_letter = decision["play_deck"].upper()
+            self._log_status(f"▶️ AI wants to play Deck {deck_letter}")
 
-                    self._log_status(f"▶️ Playing Deck {deck_letter} via MIDI...")
-                    success = self.traktor_controller.play_deck(deck)
+            if deck_letter not in ["A", "B", "C", "D"]:
+                self._log_status(f"❌ Invalid deck letter: {deck_letter}")
+                return
 
-                    if success:
-                        # Wait per Traktor processing
-                        time.sleep(0.3)
-
-                        # Verifica se deck effettivamente playing
-                        deck_state = self.traktor_controller.deck_states.get(deck, {})
-                        if deck_state.get('playing'):
-                            if self.midi_monitor:
-                                self.midi_monitor.mark_verified()
-                            self._log_status(f"✅ Deck {deck_letter} playing successfully!")
-                            self._add_chat_message("Sistema", f"▶️ Deck {deck_letter} sta suonando")
-                        else:
-                            self._log_status(f"⚠️ MIDI sent but deck not playing")
-                            self._add_chat_message("Sistema", f"⚠️ Play non verificato")
-                    else:
-                        if self.midi_monitor:
-                            self.midi_monitor.mark_failed("MIDI send failed")
-                        self._log_status(f"❌ Failed to play Deck {deck_letter}")
-                else:
-                    self._log_status(f"❌ Invalid deck letter: {deck_letter}")
-
-            # Generic play command - for "play_track": true
-            elif decision.get("play_track"):
-                self._log_status(f"▶️ AI wants to play current track (default Deck A)")
-                deck = DeckID.A  # Default deck
-
-                if self.midi_monitor:
-                    self.midi_monitor.track_command(
-                        command_name=f"Play Deck",
-                        deck_id="A",
-                        expected_state="playing=True",
-                        timeout=1.5
-                    )
+        # Generic play command - for "play_track": true
+        elif decision.get("play_track"):
+            self._log_status(f"▶️ AI wants to play current track (default Deck A)")
+            deck_letter = "A"  # Default deck
+        else:
+            return
 
-                success = self.traktor_controller.play_deck(deck)
-
-                if success:
-                    time.sleep(0.3)
-                    deck_state = self.traktor_controller.deck_states.get(deck, {})
-                    if deck_state.get('playing'):
-                        if self.midi_monitor:
-                            self.midi_monitor.mark_verified()
-                        self._log_status(f"✅ Track playing successfully!")
-                        self._add_chat_message("Sistema", f"▶️ Traccia in riproduzione")
-                    else:
-                        self._log_status(f"⚠️ MIDI sent but not verified")
-                else:
-                    if self.midi_monitor:
-                        self.midi_monitor.mark_failed("MIDI send failed")
-                    self._log_status(f"❌ Failed to play track")
+        self.workflows.submit(
+            f"Play {deck_letter}",
+            lambda workflow: self._play_steps(workflow, deck_letter),
+            key=f"deck_{deck_letter}"
+        )
 
-        except Exception as e:
-            if self.midi_monitor:
-                self.midi_monitor.mark_failed(str(e))
-            self._log_status(f"❌ Errore play command: {e}")
+    def _play_steps(self, workflow: Workflow, deck_letter: str):
+        """Passi play: invio MIDI -> attesa deck playing (o timeout)"""
+        deck = DeckID(deck_letter)
+
+        # Check if deck has a track loaded (via internal state)
+        if not self._deck_state(deck).get('loaded', True):  # Assume loaded if no state
+            self._log_status(f"⚠️ Warning: Deck {deck_letter} may not have a track loaded")
+
+        # NUOVO: Track comando con MIDI monitor
+        cmd_id = None
+        if self.midi_monitor:
+            cmd_id = self.midi_monitor.track_command(
+                command_name=f"Play Deck",
+                deck_id=deck_letter,
+                expected_state="playing=True",
+                timeout=self.play_verify_timeout
+            )
 
-    def _execute_mixing_workflow(self, decision: Dict[str, Any]):
-        """Esegui workflow mixing complesso (es. load_B_and_mix)"""
+        self._workflow_progress(workflow, f"▶️ Playing Deck {deck_letter} via MIDI...")
         try:
-            from traktor_control import DeckID
-            import time
+            success = self.traktor_controller.play_deck(deck)
+        except Exception as e:
+            if cmd_id is not None:
+                self.midi_monitor.mark_failed(str(e), command_id=cmd_id)
+            raise
+
+        if not success:
+            if cmd_id is not None:
+                self.midi_monitor.mark_failed("MIDI send failed", command_id=cmd_id)
+            self._workflow_progress(workflow, f"❌ Failed to play Deck {deck_letter}")
+            return False
+
+        # Verifica se deck effettivamente playing
+        playing = yield WaitFor(lambda: self._deck_state(deck).get('playing'), timeout=self.play_verify_timeout)
+
+        if playing:
+            if cmd_id is not None:
+                self.midi_monitor.mark_verified(command_id=cmd_id)
+            self._log_status(f"✅ Deck {deck_letter} playing successfully!")
+            self._post_chat("Sistema", f"▶️ Deck {deck_letter} sta suonando")
+        else:
+            self._resolve_unverified(cmd_id, "Verification failed - deck not playing")
+            self._log_status(f"⚠️ MIDI sent but deck not playing")
+            self._post_chat("Sistema", f"⚠️ Play non verificato")
+        return playing
 
-            workflow_type = decision.get("complex_workflow")
-            self._log_status(f"🎛️ Starting complex mixing workflow: {workflow_type}")
+    def _deck_state(self, deck: DeckID) -> Dict[str, Any]:
+        return getattr(self.traktor_controller, 'deck_states', {}).get(deck, {})
 
-            if workflow_type == "load_B_and_mix":
-                # FASE 1: Load Track nel Deck B
-                self._log_status(f"🎵 STEP 1: Loading track to Deck B...")
-                load_success = self.traktor_controller.load_next_track_smart(DeckID.B, "down")
+    def _execute_mixing_workflow(self, decision: Dict[str, Any]):
+        """Esegui workflow mixing complesso (es. load_B_and_mix), non bloccante"""
+        workflow_type = decision.get("complex_workflow")
+        if workflow_type not in MIXING_WORKFLOWS:
+            self._log_status(f"⚠️ Unknown mixing workflow: {workflow_type}")
+            return
 
-                if not load_success:
-                    self._log_status(f"❌ Load B failed - aborting mixing workflow")
-                    return
+        self._log_status(f"🎛️ Starting complex mixing workflow: {workflow_type}")
+        self.workflows.submit(
+            f"Mix {workflow_type}",
+            lambda workflow: self._mixing_steps(workflow, workflow_type, decision),
+            key="crossfader"
+        )
 
-                self._log_status(f"✅ Track loaded to Deck B")
-                self._add_chat_message("Sistema", f"🎵 Traccia caricata nel Deck B per mixing")
+    def _mixing_steps(self, workflow: Workflow, workflow_type: str, decision: Dict[str, Any]):
+        """Passi mixing: load -> attesa -> play -> stabilizzazione -> crossfade"""
+        deck_letter, mixing_mode, default_target = MIXING_WORKFLOWS[workflow_type]
+        deck = DeckID(deck_letter)
 
-                # FASE 2: Wait per track ready
-                self._log_status(f"⏱️ STEP 2: Waiting for Deck B track ready (2s)...")
-                time.sleep(2.0)
+        # FASE 1: Load Track nel deck entrante
+        self._workflow_progress(workflow, f"🎵 STEP 1: Loading track to Deck {deck_letter}...")
+        with self._load_lock:
+            load_success = self.traktor_controller.load_next_track_smart(deck, "down")
 
-                # FASE 3: Start playing Deck B
-                self._log_status(f"▶️ STEP 3: Starting Deck B playback...")
-                play_success = self.traktor_controller.play_deck(DeckID.B)
+        if not load_success:
+            self._workflow_progress(workflow, f"❌ Load {deck_letter} failed - aborting mixing workflow")
+            return False
 
-                if not play_success:
-                    self._log_status(f"❌ Play B failed after load")
-                    return
+        self._log_status(f"✅ Track loaded to Deck {deck_letter}")
+        self._post_chat("Sistema", f"🎵 Traccia caricata nel Deck {deck_letter} per mixing")
 
-                self._log_status(f"✅ Deck B playing successfully")
+        # FASE 2: Wait per track ready
+        self._workflow_progress(workflow, f"⏱️ STEP 2: Waiting for Deck {deck_letter} track ready ({self.track_ready_delay:.0f}s)...")
+        yield self.track_ready_delay
 
-                # FASE 4: Begin crossfade transition
-                self._log_status(f"🎚️ STEP 4: Beginning crossfade transition A→B...")
-                time.sleep(1.0)  # Let deck B stabilize
+        # FASE 3: Start playing
+        self._workflow_progress(workflow, f"▶️ STEP 3: Starting Deck {deck_letter} playback...")
+        if not self.traktor_controller.play_deck(deck):
+            self._workflow_progress(workflow, f"❌ Play {deck_letter} failed after load")
+            return False
 
-                # Start gradual crossfade
-                self._execute_gradual_crossfade("A_to_B", decision.get("crossfader_target", 127))
+        self._log_status(f"✅ Deck {deck_letter} playing successfully")
 
-            elif workflow_type == "load_A_and_mix":
-                # Similar logic for A side
-                self._log_status(f"🎵 STEP 1: Loading track to Deck A...")
-                load_success = self.traktor_controller.load_next_track_smart(DeckID.A, "down")
+        # FASE 4: Begin crossfade transition
+        self._workflow_progress(workflow, f"🎚️ STEP 4: Beginning crossfade transition {mixing_mode.replace('_to_', '→')}...")
+        yield self.deck_stabilize_delay  # Let the deck stabilize
 
-                if load_success:
-                    self._log_status(f"✅ Track loaded to Deck A")
-                    time.sleep(2.0)
-                    self.traktor_controller.play_deck(DeckID.A)
-                    time.sleep(1.0)
-                    self._execute_gradual_crossfade("B_to_A", decision.get("crossfader_target", 0))
+        yield from self._crossfade_steps(workflow, mixing_mode, decision.get("crossfader_target", default_target))
 
-            self._log_status(f"🎉 MIXING WORKFLOW COMPLETED!")
-            self._add_chat_message("Sistema", f"🎛️ Mixing workflow completato con successo!")
-
-        except Exception as e:
-            self._log_status(f"❌ Errore mixing workflow: {e}")
-            import traceback
-            traceback.print_exc()
+        self._log_status(f"🎉 MIXING WORKFLOW COMPLETED!")
+        self._post_chat("Sistema", f"🎛️ Mixing workflow completato con successo!")
+        return True
 
     def _execute_simple_mixing(self, decision: Dict[str, Any]):
-        """Esegui semplice mixing tra deck già caricati"""
-        try:
-            mixing_mode = decision.get("mixing_mode")
-            crossfader_target = decision.get("crossfader_target")
-
-            self._log_status(f"🎚️ Starting simple mixing: {mixing_mode}")
+        """Esegui semplice mixing tra deck già caricati (non bloccante)"""
+        mixing_mode = decision.get("mixing_mode")
+        self._log_status(f"🎚️ Starting simple mixing: {mixing_mode}")
+        self.workflows.submit(
+            f"Mixing {mixing_mode}",
+            lambda workflow: self._simple_mixing_steps(workflow, decision),
+            key="crossfader"
+        )
 
-            if crossfader_target is not None:
-                # Execute gradual crossfade
-                self._execute_gradual_crossfade(mixing_mode, crossfader_target)
-            else:
-                # Immediate crossfader move
-                if "crossfader_move" in decision:
-                    position = decision["crossfader_move"] / 127.0
-                    success = self.traktor_controller.set_crossfader(position)
-                    self._log_status(f"🎛️ Crossfader moved to {position:.2f}: {'✅' if success else '❌'}")
+    def _simple_mixing_steps(self, workflow: Workflow, decision: Dict[str, Any]):
+        """Passi mixing semplice: crossfade graduale (o immediato) -> volumi"""
+        mixing_mode = decision.get("mixing_mode")
+        crossfader_target = decision.get("crossfader_target")
 
-            # Handle volume adjustments
-            if "volume_deck_a" in decision:
-                volume = decision["volume_deck_a"] / 127.0
-                success = self.traktor_controller.set_deck_volume(DeckID.A, volume)
-                self._log_status(f"🔊 Deck A volume: {volume:.2f} {'✅' if success else '❌'}")
+        if crossfader_target is not None:
+            # Execute gradual crossfade
+            yield from self._crossfade_steps(workflow, mixing_mode, crossfader_target)
+        else:
+            # Immediate crossfader move
+            if "crossfader_move" in decision:
+                position = decision["crossfader_move"] / 127.0
+                success = self.traktor_controller.set_crossfader(position)
+                self._log_status(f"🎛️ Crossfader moved to {position:.2f}: {'✅' if success else '❌'}")
 
-            if "volume_deck_b" in decision:
-                volume = decision["volume_deck_b"] / 127.0
-                success = self.traktor_controller.set_deck_volume(DeckID.B, volume)
-                self._log_status(f"🔊 Deck B volume: {volume:.2f} {'✅' if success else '❌'}")
+        # Handle volume adjustments
+        if "volume_deck_a" in decision:
+            volume = decision["volume_deck_a"] / 127.0
+            success = self.traktor_controller.set_deck_volume(DeckID.A, volume)
+            self._log_status(f"🔊 Deck A volume: {volume:.2f} {'✅' if success else '❌'}")
 
-            self._add_chat_message("Sistema", f"🎚️ Mixing eseguito: {mixing_mode}")
+        if "volume_deck_b" in decision:
+            volume = decision["volume_deck_b"] / 127.0
+            success = self.traktor_controller.set_deck_volume(DeckID.B, volume)
+            self._log_status(f"🔊 Deck B volume: {volume:.2f} {'✅' if success else '❌'}")
 
-        except Exception as e:
-            self._log_status(f"❌ Errore simple mixing: {e}")
+        self._post_chat("Sistema", f"🎚️ Mixing eseguito: {mixing_mode}")
+        return True
 
     def _execute_gradual_crossfade(self, mixing_mode: str, target_value: int):
-        """Esegui crossfade graduale per transizioni smooth"""
-        try:
-            import time
-            from traktor_control import DeckID
+        """Esegui crossfade graduale per transizioni smooth (non bloccante)"""
+        return self.workflows.submit(
+            f"Crossfade {mixing_mode}",
+            lambda workflow: self._crossfade_steps(workflow, mixing_mode, target_value),
+            key="crossfader"
+        )
 
-            self._log_status(f"🌀 Starting gradual crossfade: {mixing_mode} → {target_value}")
+    def _crossfade_steps(self, workflow: Workflow, mixing_mode: str, target_value: int):
+        """Passi crossfade: un movimento per passo, step_delay tra i passi"""
+        self._workflow_progress(workflow, f"🌀 Starting gradual crossfade: {mixing_mode} → {target_value}")
 
-            # Get current crossfader position (assume center if unknown)
-            start_position = 64  # Center position
-            target_position = target_value
+        # Get current crossfader position (assume center if unknown)
+        start_position = 64  # Center position
+        target_position = target_value
 
-            # Calculate steps for smooth transition
-            steps = 5
-            step_size = (target_position - start_position) / steps
-            step_delay = 0.8  # 800ms between steps
+        # Calculate steps for smooth transition
+        steps = self.crossfade_steps
+        step_size = (target_position - start_position) / steps
 
-            for i in range(steps + 1):
-                current_pos = int(start_position + (step_size * i))
-                position_float = current_pos / 127.0
+        for i in range(steps + 1):
+            current_pos = int(start_position + (step_size * i))
+            position_float = current_pos / 127.0
 
-                success = self.traktor_controller.set_crossfader(position_float)
-                self._log_status(f"🎚️ Crossfade step {i+1}/{steps+1}: {position_float:.2f} {'✅' if success else '❌'}")
+            success = self.traktor_controller.set_crossfader(position_float)
+            self._workflow_progress(workflow, f"🎚️ Crossfade step {i+1}/{steps+1}: {position_float:.2f} {'✅' if success else '❌'}")
 
-                if i < steps:  # Don't wait after last step
-                    time.sleep(step_delay)
+            if i < steps:  # Don't wait after last step
+                yield self.crossfade_step_delay
 
-            self._log_status(f"✅ Gradual crossfade completed: {target_position}/127")
+        self._log_status(f"✅ Gradual crossfade completed: {target_position}/127")
 
-            # Adjust volumes for better mix
-            if mixing_mode == "A_to_B":
-                # Boost B slightly, reduce A slightly
-                self.traktor_controller.set_deck_volume(DeckID.B, 0.85)
-                self.traktor_controller.set_deck_volume(DeckID.A, 0.75)
-            elif mixing_mode == "B_to_A":
-                # Boost A slightly, reduce B slightly
-                self.traktor_controller.set_deck_volume(DeckID.A, 0.85)
-                self.traktor_controller.set_deck_volume(DeckID.B, 0.75)
-
-        except Exception as e:
-            self._log_status(f"❌ Errore gradual crossfade: {e}")
+        # Adjust volumes for better mix
+        if mixing_mode == "A_to_B":
+            # Boost B slightly, reduce A slightly
+            self.traktor_controller.set_deck_volume(DeckID.B, 0.85)
+            self.traktor_controller.set_deck_volume(DeckID.A, 0.75)
+        elif mixing_mode == "B_to_A":
+            # Boost A slightly, reduce B slightly
+            self.traktor_controller.set_deck_volume(DeckID.A, 0.85)
+            self.traktor_controller.set_deck_volume(DeckID.B, 0.75)
+        return True
 
     def _add_chat_message(self, sender: str, message: str):
         """Aggiungi messaggio alla chat"""
@@ -1436,6 +1602,7 @@ AI Attivo: {'✅' if self.ai_enabled else '❌'}
         """Chiudi applicazione"""
         self.running = False
         self.session_active = False
+        self._stop_status_feed()
 
         # Save window size before closing
         try:
@@ -1450,6 +1617,9 @@ AI Attivo: {'✅' if self.ai_enabled else '❌'}
         except Exception as e:
             print(f"⚠️  Error saving window size: {e}")
 
+        self.workflows.shutdown()
+        self.gui_updater.shutdown()
+
         if self.traktor_controller:
             self.traktor_controller.disconnect()
 
@@ -1510,9 +1680,7 @@ AI Attivo: {'✅' if self.ai_enabled else '❌'}
 
             self.root.after(0, lambda: self.midi_last_command_var.set(command_text))
             self.root.after(0, lambda: self.midi_connection_label.config(foreground='#ffaa00'))  # Yellow
-
-            # Start timeout check thread
-            threading.Thread(target=self._check_command_timeout, daemon=True).start()
+            # Timeout: il tracker risolve il comando alla sua deadline (on_command_timeout)
 
         except Exception as e:
             logger.error(f"Error in _on_midi_command_sent callback: {e}")
@@ -1571,27 +1739,6 @@ AI Attivo: {'✅' if self.ai_enabled else '❌'}
         except Exception as e:
             logger.error(f"Error in _on_midi_command_failed callback: {e}")
 
-    def _check_command_timeout(self):
-        """Thread per check timeout comando"""
-        try:
-            if not self.midi_monitor:
-                return
-
-            # Wait e poi check timeout
-            time.sleep(0.5)  # Check ogni 0.5s per 2s
-
-            for _ in range(4):  # 4 checks = 2s total
-                if not self.midi_monitor.is_tracking():
-                    return  # Comando già completato
-
-                if self.midi_monitor.check_timeout():
-                    return  # Timeout rilevato
-
-                time.sleep(0.5)
-
-        except Exception as e:
-            logger.error(f"Error in timeout check thread: {e}")
-
     def _update_midi_stats(self):
         """Aggiorna statistiche MIDI display"""
         try:
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+📣 Status Feed
+Eventi tipizzati di cambiamento stato (Traktor, sessione, contesto AI) pubblicati
+dai produttori e consumati dalla GUI al massimo una volta per frame
+"""
+
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class StatusChange:
+    """Cambiamento di un campo di stato"""
+    source: str      # 'traktor', 'session', 'context'
+    field: str       # es. 'deck_a_bpm', 'ai_decisions', 'energy_level'
+    value: Any
+    timestamp: float = field(default_factory=time.time)
+
+class StatusFeed:
+    """
+    Publish/subscribe con coalescing per campo.
+
+    publish() è thread-safe e non blocca: registra l'ultimo valore del campo e,
+    al primo cambiamento dopo un render, chiede un frame con request_frame().
+    Il consumer (thread UI) chiama drain() nel frame e riceve un solo evento
+    per campo, anche se nel frattempo ne sono stati pubblicati molti.
+    """
+
+    def __init__(self, request_frame: Callable[[], None]):
+        self._request_frame = request_frame
+        self._pending: Dict[str, StatusChange] = {}
+        self._lock = threading.Lock()
+        self._frame_requested = False
+
+        self.stats = {
+            'published': 0,
+            'coalesced': 0,
+            'frames': 0
+        }
+
+    def publish(self, source: str, field_name: str, value: Any):
+        change = StatusChange(source, field_name, value)
+        with self._lock:
+            if field_name in self._pending:
+                self.stats['coalesced'] += 1
+            self._pending[field_name] = change
+            self.stats['published'] += 1
+            if self._frame_requested:
+                return
+            self._frame_requested = True
+
+        try:
+            self._request_frame()
+        except Exception as e:
+            logger.warning(f"⚠️ Status frame request failed: {e}")
+            with self._lock:
+                self._frame_requested = False
+
+    def publish_many(self, source: str, values: Dict[str, Any]):
+        for field_name, value in values.items():
+            self.publish(source, field_name, value)
+
+    def drain(self) -> List[StatusChange]:
+        """Eventi in attesa (uno per campo); il prossimo publish richiede un nuovo frame"""
+        with self._lock:
+            changes = list(self._pending.values())
+            self._pending.clear()
+            self._frame_requested = False
+            self.stats['frames'] += 1
+        return changes
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+⏱️ Workflow Scheduler
+Workflow multi-step (load, play, crossfade...) come macchine a stati a passi:
+un thread di timing schedula i passi, eseguiti su un pool di worker, senza
+time.sleep nel thread UI e con più workflow sovrapposti
+"""
+
+import time
+import heapq
+import logging
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional, Dict, Any, Callable, Generator, List
+
+logger = logging.getLogger(__name__)
+
+class WorkflowState(Enum):
+    """Stati workflow"""
+    PENDING = "pending"
+    RUNNING = "running"       # Passo in esecuzione su un worker
+    WAITING = "waiting"       # Attesa (delay o condizione) prima del passo successivo
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+@dataclass
+class WaitFor:
+    """Attesa di una condizione (es. deck playing), controllata ogni poll_interval"""
+    predicate: Callable[[], bool]
+    timeout: float
+    poll_interval: float = 0.05
+
+# Un passo yielda l'attesa successiva: secondi (float) oppure WaitFor
+WorkflowSteps = Generator[Any, Any, Any]
+
+class Workflow:
+    """
+    Workflow a passi: il generatore esegue un passo e yielda l'attesa prima
+    del successivo. Dopo un WaitFor riceve True (condizione verificata) o
+    False (timeout); il valore di ritorno è il risultato del workflow.
+    """
+
+    def __init__(self, name: str, key: Optional[str] = None):
+        self.workflow_id = 0
+        self.name = name
+        self.key = key
+        self.state = WorkflowState.PENDING
+        self.step = 0
+        self.status_message = ""
+        self.result: Any = None
+        self.error = ""
+        self.created_at = time.time()
+        self.finished_at = 0.0
+        self.done = threading.Event()
+
+        self._steps: Optional[WorkflowSteps] = None
+        self._wait: Optional[WaitFor] = None
+        self._wait_deadline = 0.0
+        self._cancel_requested = False
+        self._on_update: Optional[Callable[['Workflow'], None]] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.state in (WorkflowState.PENDING, WorkflowState.RUNNING, WorkflowState.WAITING)
+
+    def report(self, message: str):
+        """Aggiorna il messaggio di progresso (notificato alla GUI)"""
+        self.status_message = message
+        if self._on_update:
+            self._on_update(self)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.done.wait(timeout)
+
+class WorkflowScheduler:
+    """
+    Esegue workflow a passi senza bloccare il chiamante.
+
+    - submit() restituisce subito; il primo passo parte su un worker
+    - un solo thread di timing dorme fino alla prossima scadenza (delay o poll
+      di un WaitFor) e rimette in coda il passo successivo
+    - un workflow con la stessa `key` di uno attivo lo sostituisce (cancel)
+    I passi devono essere brevi; i predicati di WaitFor sono letture di stato.
+    """
+
+    def __init__(self, max_workers: int = 4,
+                 on_update: Optional[Callable[[Workflow], None]] = None):
+        self.on_update = on_update
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="DJ_Workflow")
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._timers: List[tuple] = []  # heap (due, seq, workflow)
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        self.active: Dict[int, Workflow] = {}
+        self._by_key: Dict[str, Workflow] = {}
+
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'max_concurrent': 0,
+            'max_lateness_ms': 0.0
+        }
+
+    def submit(self, name: str, steps_factory: Callable[[Workflow], WorkflowSteps],
+               key: Optional[str] = None) -> Workflow:
+        """Avvia un workflow: steps_factory(workflow) -> generatore dei passi"""
+        workflow = Workflow(name, key)
+        workflow._on_update = self._notify
+        workflow._steps = steps_factory(workflow)
+
+        with self._condition:
+            previous = self._by_key.get(key) if key is not None else None
+            workflow.workflow_id = next(self._ids)
+            self.active[workflow.workflow_id] = workflow
+            if key is not None:
+                self._by_key[key] = workflow
+            self.stats['submitted'] += 1
+            self.stats['max_concurrent'] = max(self.stats['max_concurrent'], len(self.active))
+            self._ensure_thread()
+
+        if previous is not None:
+            logger.info(f"⏭️ Workflow '{previous.name}' replaced by '{name}' ({key})")
+            self.cancel(previous)
+
+        self._dispatch(workflow, None)
+        return workflow
+
+    def cancel(self, workflow: Workflow) -> bool:
+        """Cancella un workflow (il passo in esecuzione termina, i successivi no)"""
+        with self._condition:
+            if not workflow.is_active:
+                return False
+            if workflow.state == WorkflowState.RUNNING:
+                # Chiuso dal worker al termine del passo corrente
+                workflow._cancel_requested = True
+                return True
+            self._finish_locked(workflow, WorkflowState.CANCELLED)
+
+        self._close(workflow)
+        self._notify(workflow)
+        return True
+
+    def cancel_all(self) -> int:
+        with self._condition:
+            workflows = list(self.active.values())
+        return sum(1 for workflow in workflows if self.cancel(workflow))
+
+    def shutdown(self):
+        self.cancel_all()
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            active = [
+                {'id': w.workflow_id, 'name': w.name, 'step': w.step,
+                 'state': w.state.value, 'status': w.status_message}
+                for w in self.active.values()
+            ]
+        return {**self.stats, 'active': active}
+
+    # ==========================================
+    # ESECUZIONE PASSI
+    # ==========================================
+
+    def _dispatch(self, workflow: Workflow, value: Any):
+        try:
+            self._executor.submit(self._run_step, workflow, value)
+        except RuntimeError:
+            # Scheduler chiuso
+            with self._condition:
+                if not workflow.is_active:
+                    return
+                self._finish_locked(workflow, WorkflowState.CANCELLED)
+            self._notify(workflow)
+
+    def _run_step(self, workflow: Workflow, value: Any):
+        with self._condition:
+            if not workflow.is_active:
+                return
+            workflow.state = WorkflowState.RUNNING
+            workflow.step += 1
+
+        try:
+            instruction = workflow._steps.send(value)
+        except StopIteration as stop:
+            self._finish(workflow, WorkflowState.COMPLETED, result=stop.value)
+            return
+        except Exception as e:
+            logger.error(f"❌ Workflow '{workflow.name}' failed at step {workflow.step}: {e}")
+            self._finish(workflow, WorkflowState.FAILED, error=str(e))
+            return
+
+        now = time.monotonic()
+        with self._condition:
+            if workflow._cancel_requested:
+                self._finish_locked(workflow, WorkflowState.CANCELLED)
+                cancelled = True
+            else:
+                cancelled = False
+                if isinstance(instruction, WaitFor):
+                    workflow._wait = instruction
+                    workflow._wait_deadline = now + instruction.timeout
+                    due = now
+                else:
+                    workflow._wait = None
+                    due = now + max(0.0, float(instruction or 0.0))
+                workflow.state = WorkflowState.WAITING
+                heapq.heappush(self._timers, (due, next(self._seq), workflow))
+                self._condition.notify()
+
+        if cancelled:
+            self._close(workflow)
+        self._notify(workflow)
+
+    def _finish(self, workflow: Workflow, state: WorkflowState, result: Any = None, error: str = ""):
+        with self._condition:
+            self._finish_locked(workflow, state, result, error)
+        self._notify(workflow)
+
+    def _finish_locked(self, workflow: Workflow, state: WorkflowState, result: Any = None, error: str = ""):
+        workflow.state = state
+        workflow.result = result
+        workflow.error = error
+        workflow.finished_at = time.time()
+        self.active.pop(workflow.workflow_id, None)
+        if workflow.key is not None and self._by_key.get(workflow.key) is workflow:
+            del self._by_key[workflow.key]
+        self.stats[state.value] += 1
+        workflow.done.set()
+
+    @staticmethod
+    def _close(workflow: Workflow):
+        try:
+            workflow._steps.close()
+        except Exception as e:
+            logger.debug(f"Workflow '{workflow.name}' close error: {e}")
+
+    def _notify(self, workflow: Workflow):
+        if self.on_update:
+            try:
+                self.on_update(workflow)
+            except Exception as e:
+                logger.warning(f"⚠️ Workflow update callback error: {e}")
+
+    # ==========================================
+    # TIMER (delay e WaitFor)
+    # ==========================================
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._timer_loop, name="WorkflowTiming", daemon=True)
+        self._thread.start()
+
+    def _timer_loop(self):
+        while True:
+            with self._condition:
+                while self._running and (not self._timers or self._timers[0][0] > time.monotonic()):
+                    timeout = self._timers[0][0] - time.monotonic() if self._timers else None
+                    self._condition.wait(timeout)
+                if not self._running:
+                    return
+
+                now = time.monotonic()
+                due: List[tuple] = []
+                while self._timers and self._timers[0][0] <= now:
+                    when, _, workflow = heapq.heappop(self._timers)
+                    if workflow.state == WorkflowState.WAITING:
+                        due.append((when, workflow))
+
+            for when, workflow in due:
+                self.stats['max_lateness_ms'] = max(self.stats['max_lateness_ms'], (now - when) * 1000)
+                wait = workflow._wait
+                if wait is None:
+                    self._dispatch(workflow, None)
+                    continue
+
+                try:
+                    satisfied = bool(wait.predicate())
+                except Exception as e:
+                    logger.debug(f"WaitFor predicate error in '{workflow.name}': {e}")
+                    satisfied = False
+
+                if satisfied or now >= workflow._wait_deadline:
+                    self._dispatch(workflow, satisfied)
+                else:
+                    with self._condition:
+                        heapq.heappush(self._timers, (now + wait.poll_interval, next(self._seq), workflow))
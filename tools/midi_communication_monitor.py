@@ -7,38 +7,20 @@ Monitoraggio semplice e pratico della comunicazione GUI-Traktor
 import time
 import logging
 from typing import Optional, Dict, Any, Callable
-from dataclasses import dataclass
-from enum import Enum
 
-logger = logging.getLogger(__name__)
+from command_ack_tracker import AcknowledgementTracker, CommandStatus, CommandTracking
 
-class CommandStatus(Enum):
-    """Stati comando semplificati"""
-    SENT = "sent"           # Comando inviato via MIDI
-    WAITING = "waiting"     # Attesa risposta Traktor
-    VERIFIED = "verified"   # State aggiornato come atteso
-    TIMEOUT = "timeout"     # Timeout - Traktor non ha risposto
-    FAILED = "failed"       # Errore invio MIDI
-
-@dataclass
-class CommandTracking:
-    """Tracking semplice di un comando"""
-    command_name: str
-    deck_id: Optional[str] = None
-    timestamp: float = 0.0
-    status: CommandStatus = CommandStatus.SENT
-    timeout_seconds: float = 2.0
-    expected_state_change: Optional[str] = None  # es. "loaded=True"
+logger = logging.getLogger(__name__)
 
 class MIDICommunicationMonitor:
     """
     Monitor leggero per comunicazione MIDI
-    Approccio pratico: delay + timeout detection
+    Più comandi in volo, correlati per command_id (vedi AcknowledgementTracker)
     """
 
     def __init__(self, traktor_controller):
         self.controller = traktor_controller
-        self.current_command: Optional[CommandTracking] = None
+        self.tracker = AcknowledgementTracker(on_resolved=self._on_command_resolved)
         self.command_history: list = []
         self.max_history = 50
 
@@ -56,8 +38,20 @@ class MIDICommunicationMonitor:
             'total_failed': 0
         }
 
+        # Feedback di status da Traktor -> verifica comandi in volo
+        if hasattr(traktor_controller, 'add_status_listener'):
+            traktor_controller.add_status_listener(self._on_status_feedback)
+
+    @property
+    def current_command(self) -> Optional[CommandTracking]:
+        """Comando in volo più recente (compatibilità con il tracking singolo)"""
+        return self.tracker.get()
+
     def track_command(self, command_name: str, deck_id: Optional[str] = None,
-                     expected_state: Optional[str] = None, timeout: float = 2.0):
+                     expected_state: Optional[str] = None, timeout: float = 2.0,
+                     verify: Optional[Callable[[], bool]] = None,
+                     resend: Optional[Callable[[], bool]] = None,
+                     retry_after: float = 0.5, max_attempts: int = 1) -> int:
         """
         Inizia tracking di un comando
 
@@ -66,93 +60,106 @@ class MIDICommunicationMonitor:
             deck_id: Deck interessato (A/B/C/D)
             expected_state: Cambio stato atteso (es. "loaded=True")
             timeout: Secondi max per considerare timeout
+            verify: Predicato di verifica automatica sui feedback di status
+            resend: Reinvio del comando se non confermato entro retry_after
+            max_attempts: Tentativi totali (invio iniziale incluso)
+
+        Returns:
+            int: id di correlazione del comando
         """
-        self.current_command = CommandTracking(
+        tracking = CommandTracking(
             command_name=command_name,
             deck_id=deck_id,
             timestamp=time.time(),
             status=CommandStatus.SENT,
             timeout_seconds=timeout,
-            expected_state_change=expected_state
+            expected_state_change=expected_state,
+            verify=verify,
+            resend=resend,
+            retry_after=retry_after,
+            max_attempts=max_attempts
         )
+        command_id = self.tracker.submit(tracking)
 
         self.stats['total_sent'] += 1
 
         if self.on_command_sent:
-            self.on_command_sent(self.current_command)
-
-        logger.info(f"📤 Tracking: {command_name} (deck: {deck_id}, timeout: {timeout}s)")
-
-    def mark_verified(self):
-        """Segna comando corrente come verificato"""
-        if not self.current_command:
-            return
-
-        self.current_command.status = CommandStatus.VERIFIED
-        self.stats['total_verified'] += 1
-
-        if self.on_command_verified:
-            self.on_command_verified(self.current_command)
-
-        logger.info(f"✅ Verified: {self.current_command.command_name}")
+            self.on_command_sent(tracking)
 
-        # Aggiungi a history e cleanup
-        self._archive_command()
+        logger.info(f"📤 Tracking #{command_id}: {command_name} (deck: {deck_id}, timeout: {timeout}s, "
+                    f"in flight: {self.tracker.pending_count()})")
+        return command_id
 
-    def mark_failed(self, error: str = ""):
-        """Segna comando corrente come fallito"""
-        if not self.current_command:
-            return
+    def mark_verified(self, command_id: int):
+        """Segna comando come verificato (id restituito da track_command)"""
+        self.tracker.resolve(command_id, CommandStatus.VERIFIED)
 
-        self.current_command.status = CommandStatus.FAILED
-        self.stats['total_failed'] += 1
+    def mark_failed(self, error: str = "", *, command_id: int):
+        """Segna comando come fallito (id restituito da track_command)"""
+        self.tracker.resolve(command_id, CommandStatus.FAILED, error)
 
-        if self.on_command_failed:
-            self.on_command_failed(self.current_command, error)
-
-        logger.warning(f"❌ Failed: {self.current_command.command_name} - {error}")
-
-        self._archive_command()
-
-    def check_timeout(self) -> bool:
+    def check_timeout(self, command_id: int) -> bool:
         """
-        Verifica se comando corrente è in timeout
+        Verifica se un comando è in timeout (id restituito da track_command)
 
         Returns:
             bool: True se in timeout
         """
-        if not self.current_command:
+        tracking = self.tracker.get(command_id)
+        if not tracking or not tracking.is_pending:
             return False
 
-        if self.current_command.status != CommandStatus.SENT:
-            return False
+        if time.time() > tracking.deadline:
+            self.tracker.resolve(tracking.command_id, CommandStatus.TIMEOUT)
+            return True
 
-        elapsed = time.time() - self.current_command.timestamp
+        return False
 
-        if elapsed > self.current_command.timeout_seconds:
-            self.current_command.status = CommandStatus.TIMEOUT
+    def wait_for(self, command_id: int, timeout: Optional[float] = None) -> Optional[CommandTracking]:
+        """Attendi la risoluzione di un comando tracciato con verify"""
+        tracking = self.tracker.get(command_id)
+        if tracking is None:
+            # Già risolto: cerca nella history
+            return next((t for t in reversed(self.command_history) if t.command_id == command_id), None)
+        self.tracker.wait(tracking, timeout)
+        return tracking
+
+    def _on_status_feedback(self, status_key: str, value: Any):
+        """Listener status Traktor (thread MIDI)"""
+        self.tracker.process_feedback()
+
+    def _on_command_resolved(self, tracking: CommandTracking):
+        """Aggiorna statistiche, callback GUI e history alla chiusura di un comando"""
+        elapsed = tracking.resolved_at - tracking.timestamp
+
+        if tracking.status == CommandStatus.VERIFIED:
+            self.stats['total_verified'] += 1
+            if self.on_command_verified:
+                self.on_command_verified(tracking)
+            logger.info(f"✅ Verified #{tracking.command_id}: {tracking.command_name} "
+                        f"({elapsed:.2f}s, {tracking.attempts} attempt(s))")
+
+        elif tracking.status == CommandStatus.TIMEOUT:
             self.stats['total_timeout'] += 1
-
             if self.on_command_timeout:
-                self.on_command_timeout(self.current_command)
+                self.on_command_timeout(tracking)
+            logger.warning(f"⏱️ Timeout #{tracking.command_id}: {tracking.command_name} ({elapsed:.1f}s)")
 
-            logger.warning(f"⏱️ Timeout: {self.current_command.command_name} ({elapsed:.1f}s)")
+        else:
+            self.stats['total_failed'] += 1
+            if self.on_command_failed:
+                self.on_command_failed(tracking, tracking.error)
+            logger.warning(f"❌ Failed #{tracking.command_id}: {tracking.command_name} - {tracking.error}")
 
-            self._archive_command()
-            return True
+        self._archive_command(tracking)
 
-        return False
-
-    def _archive_command(self):
+    def _archive_command(self, tracking: CommandTracking):
         """Archivia comando in history"""
-        if self.current_command:
-            self.command_history.append(self.current_command)
-
-            # Mantieni solo ultimi N comandi
-            if len(self.command_history) > self.max_history:
-                self.command_history = self.command_history[-self.max_history:]
+        self.command_history.append(tracking)
 
-            self.current_command = None
+        # Mantieni solo ultimi N comandi
+        if len(self.command_history) > self.max_history:
+            self.command_history = self.command_history[-self.max_history:]
 
     def get_success_rate(self) -> float:
         """Calcola success rate"""
@@ -171,7 +178,10 @@ class MIDICommunicationMonitor:
             'timeout': self.stats['total_timeout'],
             'failed': self.stats['total_failed'],
             'success_rate': self.get_success_rate(),
-            'current_tracking': self.current_command is not None
+            'current_tracking': self.tracker.pending_count() > 0,
+            'in_flight': self.tracker.pending_count(),
+            'retries': self.tracker.stats['retries'],
+            'max_in_flight': self.tracker.stats['max_in_flight']
         }
 
     def get_recent_history(self, count: int = 10) -> list:
@@ -179,8 +189,8 @@ class MIDICommunicationMonitor:
         return self.command_history[-count:]
 
     def is_tracking(self) -> bool:
-        """Verifica se sta trackando un comando"""
-        return self.current_command is not None
+        """Verifica se sta trackando almeno un comando"""
+        return self.tracker.pending_count() > 0
 
     def reset_stats(self):
         """Reset statistiche"""
@@ -191,7 +201,7 @@ class MIDICommunicationMonitor:
             'total_failed': 0
         }
         self.command_history.clear()
-        self.current_command = None
+        self.tracker.clear()
 
 if __name__ == "__main__":
     print("📡 MIDI Communication Monitor")
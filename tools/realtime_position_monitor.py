@@ -13,6 +13,10 @@ from dataclasses import dataclass, field
 from enum import Enum
 import queue
 import math
+import heapq
+import bisect
+import itertools
+from collections import deque
 
 # Audio analysis imports
 try:
@@ -74,6 +78,141 @@ class PositionState:
     in_breakdown: bool = False
     in_buildup: bool = False
 
+class OpportunityQueue:
+    """
+    Bounded delivery queue for mix opportunities.
+
+    When full the oldest undelivered opportunity is dropped (stale alerts are
+    worthless in a live set), so an undrained queue cannot grow without bound.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._items: deque = deque()
+        self._condition = threading.Condition()
+        self.put_count = 0
+        self.delivered_count = 0
+        self.dropped_count = 0
+
+    def put(self, opportunity: MixOpportunity):
+        with self._condition:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped_count += 1
+            self._items.append(opportunity)
+            self.put_count += 1
+            self._condition.notify()
+
+    def get(self, timeout: Optional[float] = None) -> MixOpportunity:
+        """Blocking get; raises queue.Empty on timeout (like queue.Queue)"""
+        with self._condition:
+            if not self._items and not self._condition.wait_for(lambda: self._items, timeout):
+                raise queue.Empty
+            self.delivered_count += 1
+            return self._items.popleft()
+
+    def get_nowait(self) -> MixOpportunity:
+        return self.get(timeout=0)
+
+    def clear(self) -> int:
+        with self._condition:
+            cleared = len(self._items)
+            self._items.clear()
+            return cleared
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'queued': len(self._items),
+            'maxsize': self.maxsize,
+            'put': self.put_count,
+            'delivered': self.delivered_count,
+            'dropped': self.dropped_count
+        }
+
+@dataclass
+class TimerEntry:
+    """A scheduled boundary on the timer wheel"""
+    deadline: float
+    tick: int
+    name: str
+    payload: Any = None
+
+class TimerWheel:
+    """
+    Hashed timer wheel for beat/phrase boundaries.
+
+    Scheduling is O(1); advancing only walks the slots between the last and
+    the current tick, so the owner can sleep until next_deadline() instead of
+    polling. Not thread-safe: use it from a single thread.
+    """
+
+    def __init__(self, resolution: float = 0.005, slots: int = 512):
+        self.resolution = resolution
+        self.slots = slots
+        self.wheel: List[List[TimerEntry]] = [[] for _ in range(slots)]
+        self.current_tick = int(time.time() / resolution)
+        self.pending = 0
+        self._next_deadline: Optional[float] = None
+
+    def schedule(self, deadline: float, name: str, payload: Any = None) -> TimerEntry:
+        """Schedule an event at an absolute time.time() deadline"""
+        tick = max(int(math.ceil(deadline / self.resolution)), self.current_tick + 1)
+        entry = TimerEntry(deadline=deadline, tick=tick, name=name, payload=payload)
+        self.wheel[tick % self.slots].append(entry)
+        self.pending += 1
+        if self._next_deadline is None or deadline < self._next_deadline:
+            self._next_deadline = deadline
+        return entry
+
+    def clear(self):
+        """Cancel all scheduled events"""
+        if self.pending:
+            for slot in self.wheel:
+                slot.clear()
+        self.pending = 0
+        self._next_deadline = None
+
+    def advance(self, now: float) -> List[TimerEntry]:
+        """Return (in deadline order) all events due at or before now"""
+        now_tick = int(now / self.resolution)
+        if now_tick <= self.current_tick:
+            return []
+
+        due = []
+        if self.pending:
+            # A full revolution covers every slot
+            span = min(now_tick - self.current_tick, self.slots)
+            for tick in range(now_tick - span + 1, now_tick + 1):
+                slot = self.wheel[tick % self.slots]
+                if not slot:
+                    continue
+                remaining = [entry for entry in slot if entry.tick > now_tick]
+                if len(remaining) != len(slot):
+                    due.extend(entry for entry in slot if entry.tick <= now_tick)
+                    slot[:] = remaining
+
+        self.current_tick = now_tick
+        if due:
+            self.pending -= len(due)
+            due.sort(key=lambda entry: entry.deadline)
+            self._next_deadline = min(
+                (entry.deadline for slot in self.wheel for entry in slot), default=None
+            )
+        return due
+
+    def next_deadline(self) -> Optional[float]:
+        """Firing time of the earliest scheduled event (None if empty)"""
+        if self._next_deadline is None:
+            return None
+        # Events fire on tick boundaries
+        return math.ceil(self._next_deadline / self.resolution) * self.resolution
+
 class RealTimePositionMonitor:
     """
     Advanced real-time monitoring system that provides:
@@ -85,14 +224,19 @@ class RealTimePositionMonitor:
     - Emergency situation detection
     """
 
-    def __init__(self, update_interval: float = 0.1):
+    def __init__(self, update_interval: float = 0.1, event_driven: bool = True, deck: str = 'A'):
         """
         Initialize the real-time monitor
 
         Args:
-            update_interval: How often to update position (seconds)
+            update_interval: How often to update position (seconds, polling mode)
+            event_driven: React to Traktor status feedback and scheduled
+                beat/phrase boundaries instead of polling every update_interval
+            deck: Traktor deck playing the monitored track (A/B/C/D)
         """
         self.update_interval = update_interval
+        self.event_driven = event_driven
+        self.deck = deck.upper()
 
         # Core components
         self.traktor_controller: Optional[TraktorController] = None
@@ -104,8 +248,13 @@ class RealTimePositionMonitor:
         self.last_update_time = 0.0
 
         # Mix opportunity detection
-        self.mix_opportunities = queue.Queue()
-        self.detected_opportunities: List[MixOpportunity] = []
+        self.mix_opportunities = OpportunityQueue(maxsize=64)
+        # Tracked opportunities: expiry min-heap + per-alert-type index sorted
+        # by track position, for O(log n) dedup and cleanup. Entries stay for
+        # 'duplicate_grace_period' after expiring so they still suppress repeats
+        self._expiry_heap: List[Tuple[float, int, MixOpportunity]] = []
+        self._opportunity_index: Dict[MixAlert, List[Tuple[float, int]]] = {}
+        self._opportunity_seq = itertools.count()
         self.opportunity_callbacks: List[Callable[[MixOpportunity], None]] = []
 
         # Configuration
@@ -114,9 +263,24 @@ class RealTimePositionMonitor:
             'emergency_threshold': 10.0,   # Seconds before track ends to trigger emergency
             'phrase_length_beats': 16,     # Typical phrase length
             'energy_change_threshold': 1.0, # Energy change threshold for alerts
-            'beat_tolerance': 0.1          # Beat timing tolerance in seconds
+            'beat_tolerance': 0.1,         # Beat timing tolerance in seconds
+            'status_poll_interval': 0.5,   # Fallback status read in event-driven mode
+            'analysis_interval': 5.0,      # Fallback audio analysis in event-driven mode
+            'duplicate_grace_period': 5.0  # Expired opportunities still count as duplicates
         }
 
+        # Event-driven mode: boundaries predicted from BPM + position
+        self.timer_wheel = TimerWheel()
+        self._wake_event = threading.Event()
+        self._analysis_event = threading.Event()
+        self._state_dirty = True  # Track / mix points changed, reschedule needed
+        self._anchor_position = 0.0  # Last reported position (seconds)
+        self._anchor_time = time.time()
+        self._last_reported: Optional[Tuple[float, float, bool]] = None  # (position, bpm, playing)
+        self._deck_playing = False  # Extrapolate position only while the deck plays
+        self._current_bpm = 128.0
+        self._last_status_read = 0.0
+
         # Threading
         self.monitor_thread: Optional[threading.Thread] = None
         self.analysis_thread: Optional[threading.Thread] = None
@@ -127,7 +291,9 @@ class RealTimePositionMonitor:
             'total_updates': 0,
             'mix_opportunities_detected': 0,
             'average_update_frequency': 0.0,
-            'position_accuracy': 0.95
+            'position_accuracy': 0.95,
+            'status_changes': 0,
+            'boundary_events': 0
         }
 
         logger.info("⏱️ Real-time Position Monitor initialized")
@@ -148,9 +314,13 @@ class RealTimePositionMonitor:
             self.is_monitoring = True
             self.stop_event.clear()
 
+            if self.event_driven and hasattr(self.traktor_controller, 'add_status_listener'):
+                self.traktor_controller.add_status_listener(self._on_status_feedback)
+
             # Start monitoring threads
             self.monitor_thread = threading.Thread(
-                target=self._monitoring_loop, daemon=True
+                target=self._event_loop if self.event_driven else self._monitoring_loop,
+                daemon=True
             )
             self.analysis_thread = threading.Thread(
                 target=self._analysis_loop, daemon=True
@@ -173,6 +343,11 @@ class RealTimePositionMonitor:
 
             self.is_monitoring = False
             self.stop_event.set()
+            self._wake_event.set()
+            self._analysis_event.set()
+
+            if self.traktor_controller and hasattr(self.traktor_controller, 'remove_status_listener'):
+                self.traktor_controller.remove_status_listener(self._on_status_feedback)
 
             # Wait for threads to finish
             if self.monitor_thread and self.monitor_thread.is_alive():
@@ -213,6 +388,157 @@ class RealTimePositionMonitor:
 
         logger.info("👁️ Position monitoring loop stopped")
 
+    def _event_loop(self):
+        """
+        Event-driven monitoring loop.
+
+        Sleeps until the next scheduled boundary, a status feedback or the
+        fallback status read; opportunities are only evaluated when the state
+        changed or a boundary fired.
+        """
+        logger.info("👁️ Position monitoring loop started (event-driven)")
+
+        while self.is_monitoring and not self.stop_event.is_set():
+            try:
+                now = time.time()
+                wake_at = self._last_status_read + self.config['status_poll_interval']
+                next_boundary = self.timer_wheel.next_deadline()
+                if next_boundary is not None:
+                    wake_at = min(wake_at, next_boundary)
+
+                if wake_at > now:
+                    self._wake_event.wait(wake_at - now)
+                self._wake_event.clear()
+                if self.stop_event.is_set():
+                    break
+
+                start_time = time.time()
+                changed = self._read_status_if_due(start_time)
+                due = self.timer_wheel.advance(start_time)
+
+                if not changed and not due:
+                    continue
+
+                self.metrics['boundary_events'] += len(due)
+                self._apply_position_state(self._predicted_position(start_time))
+                self._detect_mix_opportunities()
+
+                # Predict the next boundaries from the current position
+                self._schedule_boundaries(start_time)
+                self._update_metrics(start_time)
+
+            except Exception as e:
+                logger.error(f"❌ Monitoring loop error: {e}")
+                time.sleep(self.update_interval)
+
+        logger.info("👁️ Position monitoring loop stopped")
+
+    def _on_status_feedback(self, status_key: str, value: Any):
+        """Traktor status listener (MIDI thread): just wake the monitor"""
+        if 'position' in status_key or 'bpm' in status_key:
+            self._last_status_read = 0.0
+            self._wake_event.set()
+
+    def _read_status_if_due(self, now: float) -> bool:
+        """Read Traktor status when requested or due; True if position/BPM/track changed"""
+        changed = self._state_dirty
+        self._state_dirty = False
+
+        if now - self._last_status_read < self.config['status_poll_interval'] and not changed:
+            return False
+        self._last_status_read = now
+
+        status = self.traktor_controller.get_comprehensive_status() if self.traktor_controller else None
+        if not status:
+            return changed
+
+        reported = self._read_deck_status(status)
+        # Re-anchor the position prediction on every read
+        self._anchor_position, bpm, self._deck_playing = reported
+        self._anchor_time = now
+        if bpm > 0:
+            self._current_bpm = bpm
+        if reported != self._last_reported:
+            self._last_reported = reported
+            changed = True
+
+        self._update_energy_info(status)
+        if changed:
+            self.metrics['status_changes'] += 1
+        return changed
+
+    def _read_deck_status(self, status: Dict[str, Any]) -> Tuple[float, float, bool]:
+        """(position seconds, bpm, playing) of the monitored deck from the comprehensive status"""
+        traktor_status = status.get('traktor_status') or {}
+        key = self.deck.lower()
+        fraction = traktor_status.get(f'deck_{key}_position') or 0.0
+        bpm = traktor_status.get(f'deck_{key}_bpm') or 0.0
+
+        track = self.position_state.track
+        duration = getattr(track, 'duration', 0.0) if track else 0.0
+        position = fraction * duration if duration and duration > 0 else 0.0
+
+        playing = False
+        for deck, state in getattr(self.traktor_controller, 'deck_states', {}).items():
+            if str(getattr(deck, 'value', deck)).upper() == self.deck:
+                playing = bool(state.get('playing'))
+                break
+        return position, bpm, playing
+
+    def _predicted_position(self, now: float) -> float:
+        """Position extrapolated from the last reported position (only while playing)"""
+        if not self._deck_playing:
+            return self._anchor_position
+        return self._anchor_position + max(0.0, now - self._anchor_time)
+
+    def _schedule_boundaries(self, now: float):
+        """Schedule the next phrase, mix point and track-end boundaries"""
+        self.timer_wheel.clear()
+        if not self._deck_playing:
+            # Position is frozen: the next status read re-anchors and reschedules
+            return
+
+        position = self.position_state.position_seconds
+        seconds_per_beat = 60.0 / self._current_bpm if self._current_bpm > 0 else 0.0
+        phrase_length = self.config['phrase_length_beats']
+
+        def at_position(target: float) -> float:
+            return now + (target - position)
+
+        def next_beat_at_or_after(target: float) -> float:
+            if seconds_per_beat <= 0:
+                return target
+            return math.ceil(target / seconds_per_beat - 1e-6) * seconds_per_beat
+
+        if seconds_per_beat > 0:
+            # Phrase alert fires on the beat where beats_until_phrase reaches 2
+            current_beat = self.position_state.current_beat
+            alert_offset = phrase_length - 2
+            next_alert_beat = current_beat - (current_beat % phrase_length) + alert_offset
+            if next_alert_beat <= current_beat:
+                next_alert_beat += phrase_length
+            self.timer_wheel.schedule(at_position(next_alert_beat * seconds_per_beat), 'phrase_boundary')
+
+        next_mix = self.position_state.next_mix_point
+        if next_mix is not None and next_mix > position:
+            # Enter the 5-15s alert window on a beat, and re-evaluate once the point passes
+            window_start = next_beat_at_or_after(next_mix - 15.0)
+            if window_start > position:
+                self.timer_wheel.schedule(at_position(window_start), 'mix_window', next_mix)
+            self.timer_wheel.schedule(at_position(next_mix), 'mix_point_passed', next_mix)
+
+        track = self.position_state.track
+        duration = getattr(track, 'duration', 0.0) if track else 0.0
+        if duration and duration > 0:
+            for boundary, name in (
+                (duration - 60.0, 'mix_zone'),
+                (duration - 32.0, 'outro'),
+                (duration - self.config['emergency_threshold'], 'track_ending'),
+                (duration - 5.0, 'emergency'),
+            ):
+                if boundary > position:
+                    self.timer_wheel.schedule(at_position(boundary), name)
+
     def _analysis_loop(self):
         """Audio analysis loop for advanced mix point detection"""
         logger.info("🔬 Analysis loop started")
@@ -223,7 +549,12 @@ class RealTimePositionMonitor:
                     # Perform advanced audio analysis
                     self._analyze_current_audio()
 
-                time.sleep(0.5)  # Analysis every 500ms
+                if self.event_driven:
+                    # Re-analyse on track change, otherwise rarely
+                    self._analysis_event.wait(self.config['analysis_interval'])
+                    self._analysis_event.clear()
+                else:
+                    time.sleep(0.5)  # Analysis every 500ms
 
             except Exception as e:
                 logger.error(f"❌ Analysis loop error: {e}")
@@ -242,8 +573,23 @@ class RealTimePositionMonitor:
             if not status:
                 return
 
+            position, bpm, _ = self._read_deck_status(status)
+            if bpm > 0:
+                self._current_bpm = bpm
+
+            # Update energy information
+            self._update_energy_info(status)
+
+            self._apply_position_state(position)
+
+        except Exception as e:
+            logger.debug(f"Position state update failed: {e}")
+
+    def _apply_position_state(self, position_seconds: float):
+        """Derive percentage, beat, structural and mix point info from a position"""
+        try:
             # Update basic position info
-            self.position_state.position_seconds = status.get('position', 0.0)
+            self.position_state.position_seconds = position_seconds
 
             # Calculate percentage and remaining time
             if self.position_state.track and hasattr(self.position_state.track, 'duration'):
@@ -255,10 +601,7 @@ class RealTimePositionMonitor:
                         duration - self.position_state.position_seconds)
 
             # Update beat information
-            self._update_beat_info(status)
-
-            # Update energy information
-            self._update_energy_info(status)
+            self._update_beat_info({'bpm': self._current_bpm})
 
             # Update structural information
             self._update_structural_info()
@@ -269,7 +612,7 @@ class RealTimePositionMonitor:
             self.last_update_time = time.time()
 
         except Exception as e:
-            logger.debug(f"Position state update failed: {e}")
+            logger.debug(f"Position state apply failed: {e}")
 
     def _update_beat_info(self, status: Dict[str, Any]):
         """Update beat-level timing information"""
@@ -280,7 +623,7 @@ class RealTimePositionMonitor:
 
             # Calculate current beat based on position and BPM
             beats_per_second = current_bpm / 60.0
-            total_beats = int(self.position_state.position_seconds * beats_per_second)
+            total_beats = int(self.position_state.position_seconds * beats_per_second + 1e-6)
 
             self.position_state.current_beat = total_beats
             self.position_state.beats_until_phrase = (
@@ -457,11 +800,14 @@ class RealTimePositionMonitor:
                 )
                 opportunities.append(opportunity)
 
+            # Clean up expired opportunities (before dedup against them)
+            self._cleanup_expired_opportunities()
+
             # Queue new opportunities and notify callbacks
             for opportunity in opportunities:
                 if not self._is_duplicate_opportunity(opportunity):
                     self.mix_opportunities.put(opportunity)
-                    self.detected_opportunities.append(opportunity)
+                    self._track_opportunity(opportunity)
                     self.metrics['mix_opportunities_detected'] += 1
 
                     # Notify callbacks
@@ -471,39 +817,59 @@ class RealTimePositionMonitor:
                         except Exception as e:
                             logger.warning(f"⚠️ Opportunity callback failed: {e}")
 
-            # Clean up expired opportunities
-            self._cleanup_expired_opportunities()
-
         except Exception as e:
             logger.error(f"❌ Mix opportunity detection failed: {e}")
 
+    @property
+    def detected_opportunities(self) -> List[MixOpportunity]:
+        """Live (unexpired) opportunities, soonest expiry first"""
+        now = time.time()
+        return [opp for expires_at, _, opp in sorted(self._expiry_heap) if expires_at > now]
+
+    def _track_opportunity(self, opportunity: MixOpportunity):
+        """Add an opportunity to the expiry heap and the interval index"""
+        seq = next(self._opportunity_seq)
+        heapq.heappush(self._expiry_heap, (opportunity.expires_at, seq, opportunity))
+        bisect.insort(
+            self._opportunity_index.setdefault(opportunity.alert_type, []),
+            (opportunity.position_seconds, seq)
+        )
+
     def _is_duplicate_opportunity(self, new_opportunity: MixOpportunity) -> bool:
         """Check if this opportunity is a duplicate of recent ones"""
         try:
-            current_time = time.time()
-            recent_cutoff = current_time - 5.0  # Last 5 seconds
-
-            for existing in self.detected_opportunities:
-                if (existing.alert_type == new_opportunity.alert_type and
-                    abs(existing.position_seconds - new_opportunity.position_seconds) < 2.0 and
-                    existing.expires_at > recent_cutoff):
-                    return True
+            # Same alert type within 2s of track position (the index also holds
+            # opportunities expired less than duplicate_grace_period ago)
+            positions = self._opportunity_index.get(new_opportunity.alert_type)
+            if not positions:
+                return False
 
-            return False
+            start = bisect.bisect_right(positions, (new_opportunity.position_seconds - 2.0, math.inf))
+            return (start < len(positions) and
+                    positions[start][0] < new_opportunity.position_seconds + 2.0)
         except:
             return False
 
     def _cleanup_expired_opportunities(self):
-        """Remove expired opportunities"""
+        """Evict opportunities expired more than duplicate_grace_period ago"""
         try:
-            current_time = time.time()
-            self.detected_opportunities = [
-                opp for opp in self.detected_opportunities
-                if opp.expires_at > current_time
-            ]
+            cutoff = time.time() - self.config['duplicate_grace_period']
+            while self._expiry_heap and self._expiry_heap[0][0] <= cutoff:
+                _, seq, opportunity = heapq.heappop(self._expiry_heap)
+                positions = self._opportunity_index.get(opportunity.alert_type, [])
+                key = (opportunity.position_seconds, seq)
+                index = bisect.bisect_left(positions, key)
+                if index < len(positions) and positions[index] == key:
+                    del positions[index]
         except:
             pass
 
+    def _clear_opportunities(self):
+        """Drop all tracked and undelivered opportunities"""
+        self.mix_opportunities.clear()
+        self._expiry_heap.clear()
+        self._opportunity_index.clear()
+
     def _analyze_current_audio(self):
         """Perform advanced audio analysis for mix point detection"""
         try:
@@ -519,7 +885,10 @@ class RealTimePositionMonitor:
             if hasattr(features, 'optimal_mix_points') and features.optimal_mix_points:
                 if self.position_state.track:
                     # Update track with latest mix points
-                    self.position_state.track.optimal_mix_points = features.optimal_mix_points
+                    if getattr(self.position_state.track, 'optimal_mix_points', None) != features.optimal_mix_points:
+                        self.position_state.track.optimal_mix_points = features.optimal_mix_points
+                        self._state_dirty = True
+                        self._wake_event.set()
 
         except Exception as e:
             logger.debug(f"Audio analysis failed: {e}")
@@ -549,26 +918,33 @@ class RealTimePositionMonitor:
         except Exception as e:
             logger.debug(f"Metrics update failed: {e}")
 
-    def set_current_track(self, track: TrackInfo):
-        """Set the currently monitored track"""
+    def set_current_track(self, track: TrackInfo, deck: Optional[str] = None):
+        """Set the currently monitored track (and optionally the deck playing it)"""
         try:
             logger.info(f"🎵 Now monitoring: {track.title} - {track.artist}")
             self.position_state.track = track
+            if deck:
+                self.deck = deck.upper()
 
             # Reset position-dependent state
             self.position_state.position_seconds = 0.0
             self.position_state.position_percentage = 0.0
             self.position_state.current_beat = 0
             self.position_state.current_phrase = 0
+            self.position_state.next_mix_point = None
+            self.position_state.time_to_next_mix = None
+
+            # Restart position prediction from the top of the track
+            self._anchor_position = 0.0
+            self._anchor_time = time.time()
+            self._last_reported = None
+            self._deck_playing = False
+            self._state_dirty = True
+            self._wake_event.set()
+            self._analysis_event.set()
 
             # Clear old opportunities
-            while not self.mix_opportunities.empty():
-                try:
-                    self.mix_opportunities.get_nowait()
-                except queue.Empty:
-                    break
-
-            self.detected_opportunities.clear()
+            self._clear_opportunities()
 
         except Exception as e:
             logger.error(f"❌ Error setting current track: {e}")
@@ -620,5 +996,6 @@ class RealTimePositionMonitor:
             'metrics': self.metrics.copy(),
             'opportunities_in_queue': self.mix_opportunities.qsize(),
             'opportunities_detected_total': len(self.detected_opportunities),
+            'delivery_queue': self.mix_opportunities.get_stats(),
             'last_update_age': time.time() - self.last_update_time if self.last_update_time else 0
         }
\ No newline at end of file